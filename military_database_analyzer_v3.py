@@ -11,14 +11,16 @@ import argparse
 import sys
 from pathlib import Path
 import json
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Union, Iterable, Iterator, Tuple, TextIO
+from contextlib import ExitStack
 import logging
 
 from src.database_loader import DatabaseLoader
 from src.graph_builder import GraphBuilder
 from src.visualization_engine import VisualizationEngine
 from src.filter_system import FilterSystem
-from src.statistics_generator import StatisticsGenerator
+from src.statistics_generator import StatisticsGenerator, STATISTICS_VERSION
+from src.statistics_store import StatisticsStore
 
 # Configure logging
 logging.basicConfig(
@@ -67,10 +69,16 @@ class MilitaryDatabaseAnalyzer:
         self.filter_system = FilterSystem()
         self.statistics_generator = StatisticsGenerator()
         
+        # Generated statistics sections, reused while the database file is unchanged
+        self.statistics_store = StatisticsStore(self.output_dir / 'statistics_store.sqlite', STATISTICS_VERSION)
+        
         # Loaded databases
         self.databases = {}
         self.combined_graph = None
         
+        # Graphs built per database, reused until the database is reloaded
+        self.database_graphs = {}
+        
     def load_database(self, database_name: str) -> Dict:
         """Load a specific database by name."""
         if database_name not in self.DATABASE_CONFIGS:
@@ -96,6 +104,76 @@ class MilitaryDatabaseAnalyzer:
         logger.info(f"Loaded {len(self.databases)} databases successfully")
         return self.databases
     
+    def get_database_graph(self, database_name: str):
+        """Get the graph for a database, building it only if the database was (re)loaded since."""
+        if database_name not in self.databases:
+            self.load_database(database_name)
+        
+        database = self.databases[database_name]
+        cached = self.database_graphs.get(database_name)
+        if cached is not None and cached[0] is database:
+            return cached[1]
+        
+        graph = self.graph_builder.build_graph(database)
+        self.database_graphs[database_name] = (database, graph)
+        return graph
+    
+    def database_checksum(self, database_name: str) -> str:
+        """Get the checksum of a database's file."""
+        return self.loader.get_checksum(self.data_dir / self.DATABASE_CONFIGS[database_name])
+    
+    def get_statistics(self, database_name: str, graph=None, filters: Optional[Dict] = None,
+                       refresh: Iterable[str] = ()) -> Dict:
+        """Get statistics for a database's (filtered) graph, reusing stored sections while its file is unchanged."""
+        if graph is None:
+            graph = self.get_database_graph(database_name)
+            if filters:
+                graph = self.filter_system.apply_filters(graph, filters)
+        
+        return self.statistics_generator.stored_statistics(
+            graph, self.databases[database_name], self.statistics_store,
+            self.database_checksum(database_name), filters, refresh
+        )
+    
+    def stream_filter_database(self, database_name: str, filters: Dict, export_csv: bool = False,
+                               export_json: bool = False) -> Dict:
+        """Filter a database file while parsing it, without building a graph, exporting matches as they arrive."""
+        if database_name not in self.DATABASE_CONFIGS:
+            raise ValueError(f"Unknown database: {database_name}")
+        
+        file_path = self.data_dir / self.DATABASE_CONFIGS[database_name]
+        logger.info(f"Streaming {database_name} from {file_path} with filters {filters}")
+        
+        output_base = self.output_dir / f"{database_name}_filtered"
+        output_files = {}
+        
+        with ExitStack() as stack:
+            matches = self.filter_system.stream_filter(file_path, filters)
+            
+            if export_json:
+                output_files['json'] = f"{output_base}.json"
+                json_file = stack.enter_context(open(output_files['json'], 'w', encoding='utf-8'))
+                matches = self._write_json_array(matches, json_file)
+            
+            if export_csv:
+                output_files['csv'] = f"{output_base}.csv"
+                count = self.statistics_generator.export_nodes_to_csv(matches, output_files['csv'])
+            else:
+                count = sum(1 for _ in matches)
+        
+        logger.info(f"{database_name}: {count} entities matched {filters}")
+        return {'database': database_name, 'matches': count, 'output_files': output_files}
+    
+    @staticmethod
+    def _write_json_array(matches: Iterable[Tuple[str, Dict]], file: TextIO) -> Iterator[Tuple[str, Dict]]:
+        """Write the entity of each match to a JSON array while passing the matches on."""
+        file.write('[')
+        for position, (node, data) in enumerate(matches):
+            file.write(',\n' if position else '\n')
+            json.dump(data.get('data', {'id': node}), file, default=str)
+            yield node, data
+        file.write('\n]\n')
+    
     def build_combined_graph(self, databases: Optional[List[str]] = None):
         """Build a combined graph from multiple databases."""
         if databases is None:
@@ -124,15 +202,16 @@ class MilitaryDatabaseAnalyzer:
         
         database = self.databases[database_name]
         
-        # Build graph
-        graph = self.graph_builder.build_graph(database)
+        # Build graph (reused while the database is unchanged)
+        graph = self.get_database_graph(database_name)
         
         # Apply filters if specified
         if 'filters' in kwargs:
             graph = self.filter_system.apply_filters(graph, kwargs['filters'])
         
-        # Generate statistics
-        stats = self.statistics_generator.generate_statistics(graph, database)
+        # Generate statistics, or reuse those stored for the same file and filters
+        stats = self.get_statistics(database_name, graph, kwargs.get('filters'),
+                                    kwargs.get('refresh_statistics', ()))
         
         # Create visualization
         layout_type = kwargs.get('layout', 'spring')
@@ -251,6 +330,9 @@ Examples:
 
   # Export statistics to CSV
   python military_database_analyzer.py --database vehicles --export-csv --statistics
+
+  # Stream matching entities to CSV without building a graph
+  python military_database_analyzer.py --database china --stream --filter type vehicles --filter manufacturer norinco --export-csv
         """
     )
     
@@ -279,6 +361,9 @@ Examples:
     # Filtering options
     parser.add_argument('--filter', action='append', nargs=2, metavar=('KEY', 'VALUE'),
                        help='Apply filters (can be used multiple times)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Filter entities while reading the database files, without building a graph '
+                            '(attribute filters only; use with --export-csv/--export-json)')
     
     # Output options
     parser.add_argument('--output-dir', default='output',
@@ -324,6 +409,8 @@ Examples:
     if args.output_dir != 'output':
         analyzer.output_dir = Path(args.output_dir)
         analyzer.output_dir.mkdir(exist_ok=True)
+        analyzer.statistics_store = StatisticsStore(analyzer.output_dir / 'statistics_store.sqlite',
+                                                    STATISTICS_VERSION)
     
     try:
         # Handle web interface
@@ -332,6 +419,21 @@ Examples:
             launch_web_interface(analyzer)
             return
         
+        # Streaming filter runs read the files directly and never load or build graphs
+        if args.stream:
+            filters = dict(args.filter or [])
+            if args.all_databases:
+                database_names = list(analyzer.DATABASE_CONFIGS)
+            else:
+                database_names = args.databases or ([args.database] if args.database else ['combined'])
+            
+            for db_name in database_names:
+                analyzer.stream_filter_database(
+                    db_name, filters, export_csv=args.export_csv, export_json=args.export_json
+                )
+            logger.info("Streaming filter complete. Check the output directory for results.")
+            return
+        
         # Load databases
         if args.all_databases:
             analyzer.load_all_databases()
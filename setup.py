@@ -39,6 +39,7 @@ setup(
         "plotly>=5.15.0",
         "pandas>=1.5.0",
         "numpy>=1.20.0",
+        "scipy>=1.9.0",
         "python-dateutil>=2.8.0",
         "flask>=2.3.0",
         "dash>=2.14.0",
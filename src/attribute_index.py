@@ -0,0 +1,167 @@
+"""
+Attribute Index for IES4 Military Database Analysis Suite
+Inverted indexes from normalised node attribute values to node ids.
+"""
+
+import networkx as nx
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Set, Iterable, Sequence
+
+try:
+    from .graph_index import get_index
+    from .node_types import get_node_type_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+    from node_types import get_node_type_index
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_value(value) -> str:
+    """Normalise an attribute value for case-insensitive matching."""
+    if isinstance(value, str):
+        return value.lower()
+    return str(value).lower()
+
+
+class AttributeIndex:
+    """Inverted index (normalised value -> node ids) with sorted keys for prefix/suffix/substring search."""
+
+    def __init__(self, postings: Dict[str, Set[str]], scope: Sequence[str]):
+        """Initialize the index from postings and the nodes it covers."""
+        self.postings = postings
+        self.scope = scope
+        self.sorted_keys = sorted(postings)
+        self._reversed_keys = sorted((key[::-1], key) for key in postings)
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, fields: Iterable[str] = (), entity_fields: Iterable[str] = (),
+                   node_types: Iterable[str] = (), entity_names: bool = False) -> 'AttributeIndex':
+        """Build an index over node attributes, raw entity fields and/or entity names."""
+        fields = list(fields)
+        entity_fields = list(entity_fields)
+        node_types = tuple(node_types)
+
+        if node_types:
+            scope = get_node_type_index(graph).nodes_of_type(*node_types)
+        else:
+            scope = list(graph.nodes())
+
+        postings = {}
+        for node in scope:
+            data = graph.nodes[node]
+            for value in cls.extract_values(data, fields, entity_fields, entity_names):
+                postings.setdefault(normalize_value(value), set()).add(node)
+
+        logger.debug(f"Indexed {len(scope)} nodes into {len(postings)} attribute values")
+        return cls(postings, scope)
+
+    @staticmethod
+    def extract_values(data: Dict, fields: Iterable[str] = (), entity_fields: Iterable[str] = (),
+                       entity_names: bool = False) -> List:
+        """Collect the values of one node that should be indexed."""
+        values = [data[field] for field in fields if data.get(field) is not None]
+
+        entity_data = data.get('data', {})
+        values.extend(entity_data[field] for field in entity_fields if entity_data.get(field) is not None)
+
+        if entity_names:
+            for name_obj in entity_data.get('names', []):
+                if isinstance(name_obj, dict) and name_obj.get('value') is not None:
+                    values.append(name_obj['value'])
+
+        return values
+
+    def _union(self, keys: Iterable[str]) -> Set[str]:
+        """Union the postings of several keys."""
+        result = set()
+        for key in keys:
+            result.update(self.postings[key])
+        return result
+
+    def equals(self, value) -> Set[str]:
+        """Get nodes whose value equals the given value (case-insensitive)."""
+        return set(self.postings.get(normalize_value(value), ()))
+
+    def _prefix_keys(self, prefix: str) -> List[str]:
+        """Get the indexed values starting with a normalised prefix."""
+        keys = self.sorted_keys
+        position = bisect_left(keys, prefix)
+
+        matched = []
+        while position < len(keys) and keys[position].startswith(prefix):
+            matched.append(keys[position])
+            position += 1
+        return matched
+
+    def _suffix_keys(self, suffix: str) -> List[str]:
+        """Get the indexed values ending with a normalised suffix."""
+        reversed_suffix = suffix[::-1]
+        keys = self._reversed_keys
+        position = bisect_left(keys, (reversed_suffix,))
+
+        matched = []
+        while position < len(keys) and keys[position][0].startswith(reversed_suffix):
+            matched.append(keys[position][1])
+            position += 1
+        return matched
+
+    def _substring_keys(self, substring: str) -> List[str]:
+        """Get the indexed values containing a normalised substring."""
+        return [key for key in self.sorted_keys if substring in key]
+
+    def startswith(self, prefix) -> Set[str]:
+        """Get nodes with a value starting with the given prefix."""
+        prefix = normalize_value(prefix)
+        if not prefix:
+            return set(self.scope)
+        return self._union(self._prefix_keys(prefix))
+
+    def endswith(self, suffix) -> Set[str]:
+        """Get nodes with a value ending with the given suffix."""
+        suffix = normalize_value(suffix)
+        if not suffix:
+            return set(self.scope)
+        return self._union(self._suffix_keys(suffix))
+
+    def contains(self, substring) -> Set[str]:
+        """Get nodes with a value containing the given substring."""
+        substring = normalize_value(substring)
+        if not substring:
+            # An empty substring matches every node in scope, as a plain 'in' test would
+            return set(self.scope)
+        return self._union(self._substring_keys(substring))
+
+    def estimate(self, operation: str, value) -> int:
+        """Estimate the nodes an equals/startswith/endswith/contains lookup matches, without building the set.
+
+        Sums the posting-list lengths of the matching values, so a node with
+        several matching values is counted once for each.
+        """
+        value = normalize_value(value)
+        if operation == 'equals':
+            return len(self.postings.get(value, ()))
+        if not value:
+            return len(self.scope)
+
+        find_keys = {'startswith': self._prefix_keys, 'endswith': self._suffix_keys,
+                     'contains': self._substring_keys}[operation]
+        postings = self.postings
+        return sum(len(postings[key]) for key in find_keys(value))
+
+    def value_counts(self) -> Dict[str, int]:
+        """Get the number of nodes for each indexed value."""
+        return {key: len(nodes) for key, nodes in self.postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+
+def get_attribute_index(graph: nx.Graph, name: str, fields: Iterable[str] = (), entity_fields: Iterable[str] = (),
+                        node_types: Iterable[str] = (), entity_names: bool = False) -> AttributeIndex:
+    """Get a named attribute index for a graph, building it on first use."""
+    return get_index(
+        graph, f'attribute_index:{name}',
+        lambda g: AttributeIndex.from_graph(g, fields, entity_fields, node_types, entity_names)
+    )
@@ -0,0 +1,320 @@
+"""
+Community Detection for IES4 Military Database Analysis Suite
+Label propagation and Louvain modularity optimisation over a CSR adjacency
+matrix, with seeded node orders so results are reproducible.
+"""
+
+import logging
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from collections import Counter
+from typing import Dict, List, Set, Tuple, Iterable, Optional, Union, Any
+
+try:
+    from .graph_index import get_index, graph_version
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index, graph_version
+
+logger = logging.getLogger(__name__)
+
+COMMUNITY_INDEX = 'community_index'
+
+# Node attribute holding each node's community id
+COMMUNITY_ATTRIBUTE = 'community'
+
+# Graph attribute holding the graph version that the community node attributes describe
+COMMUNITY_VERSION = 'community_version'
+
+
+def csr_adjacency(graph: nx.Graph, weight: Optional[str] = None) -> Tuple[List[Any], sp.csr_array]:
+    """Get (nodes, symmetric CSR adjacency matrix) for a graph, unweighted unless weight names an edge attribute."""
+    nodes = list(graph.nodes)
+    return nodes, nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, dtype=float, format='csr')
+
+
+def modularity(matrix: sp.csr_array, labels: np.ndarray, resolution: float = 1.0) -> float:
+    """Newman modularity of a partition of a symmetric adjacency matrix."""
+    total = matrix.sum()
+    if total == 0:
+        return 0.0
+
+    coo = matrix.tocoo()
+    internal = np.bincount(labels[coo.row], weights=coo.data * (labels[coo.row] == labels[coo.col]),
+                           minlength=labels.max() + 1)
+    degree_totals = np.bincount(labels, weights=np.asarray(matrix.sum(axis=1)).ravel(), minlength=labels.max() + 1)
+    return float(internal.sum() / total - resolution * np.square(degree_totals / total).sum())
+
+
+def label_propagation(matrix: sp.csr_array, rng: np.random.Generator, max_iter: int = 100) -> np.ndarray:
+    """Asynchronous label propagation: each node, in a shuffled order, takes its neighbours' heaviest label.
+
+    A node keeps its label when that label is among the heaviest; other ties
+    are broken with rng, so a seeded generator gives reproducible labels.
+    """
+    n = matrix.shape[0]
+    # Python lists index far faster than numpy arrays one element at a time
+    indptr, indices, data = matrix.indptr.tolist(), matrix.indices.tolist(), matrix.data.tolist()
+    labels = list(range(n))
+
+    for iteration in range(max_iter):
+        changed = 0
+        for node in rng.permutation(n).tolist():
+            weights = {}
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[position]
+                if neighbor != node:
+                    label = labels[neighbor]
+                    weights[label] = weights.get(label, 0.0) + data[position]
+            if not weights:
+                continue
+
+            heaviest = max(weights.values())
+            candidates = sorted(label for label, weight in weights.items() if weight == heaviest)
+            if labels[node] in candidates:
+                continue
+            labels[node] = candidates[rng.integers(len(candidates))] if len(candidates) > 1 else candidates[0]
+            changed += 1
+
+        if not changed:
+            logger.debug(f"Label propagation converged after {iteration + 1} sweeps")
+            break
+
+    return np.array(labels, dtype=np.int64)
+
+
+def _local_moves(matrix: sp.csr_array, resolution: float, rng: np.random.Generator, tol: float,
+                 max_passes: int) -> Tuple[np.ndarray, bool]:
+    """Louvain phase one: move nodes to the neighbouring community with the best modularity gain.
+
+    Returns (community of each node, whether any node moved).
+    """
+    n = matrix.shape[0]
+    indptr, indices, data = matrix.indptr.tolist(), matrix.indices.tolist(), matrix.data.tolist()
+    degrees = np.asarray(matrix.sum(axis=1)).ravel().tolist()
+    total = sum(degrees)
+
+    communities = list(range(n))
+    community_degrees = list(degrees)
+    moved = False
+    if not total:
+        # No edges: every node stays in its own community
+        return np.array(communities, dtype=np.int64), moved
+
+    for _ in range(max_passes):
+        moves = 0
+        for node in rng.permutation(n).tolist():
+            current = communities[node]
+            degree = degrees[node]
+
+            # Edge weight from the node into each neighbouring community
+            links = {}
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[position]
+                if neighbor != node:
+                    community = communities[neighbor]
+                    links[community] = links.get(community, 0.0) + data[position]
+
+            community_degrees[current] -= degree
+            scale = resolution * degree / total
+            best, best_gain = current, links.get(current, 0.0) - scale * community_degrees[current]
+            for community, weight in links.items():
+                gain = weight - scale * community_degrees[community]
+                if gain > best_gain + tol:
+                    best, best_gain = community, gain
+
+            community_degrees[best] += degree
+            if best != current:
+                communities[node] = best
+                moves += 1
+
+        moved = moved or moves > 0
+        if not moves:
+            break
+
+    return np.array(communities, dtype=np.int64), moved
+
+
+def louvain(matrix: sp.csr_array, rng: np.random.Generator, resolution: float = 1.0, tol: float = 1e-12,
+            max_levels: int = 20, max_passes: int = 100) -> np.ndarray:
+    """Louvain modularity optimisation: local moves, then aggregation of communities into nodes, repeated."""
+    labels = np.arange(matrix.shape[0])
+    level_matrix = matrix
+
+    for level in range(max_levels):
+        communities, moved = _local_moves(level_matrix, resolution, rng, tol, max_passes)
+        if not moved:
+            break
+
+        # Aggregate: community c becomes node c of the next level, with P^T A P as adjacency
+        _, communities = np.unique(communities, return_inverse=True)
+        k = communities.max() + 1
+        membership = sp.csr_array((np.ones(len(communities)), (np.arange(len(communities)), communities)),
+                                  shape=(len(communities), k))
+        level_matrix = (membership.T @ level_matrix @ membership).tocsr()
+        labels = communities[labels]
+        logger.debug(f"Louvain level {level + 1}: {k} communities")
+
+    return labels
+
+
+class CommunityDetector:
+    """Finds communities with label propagation or Louvain.
+
+    With an integer seed the node visiting order and tie-breaking are
+    reproducible, so the same graph always gets the same partition; seed
+    None draws a fresh order each time.
+    """
+
+    METHODS = ('louvain', 'label_propagation')
+
+    def __init__(self, method: str = 'louvain', resolution: float = 1.0, seed: Optional[int] = 42,
+                 max_iter: int = 100, weight: Optional[str] = None):
+        """Initialize the detector."""
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown community detection method: {method}")
+        self.method = method
+        self.resolution = resolution
+        self.seed = seed
+        self.max_iter = max_iter
+        self.weight = weight
+
+    def detect(self, graph: nx.Graph) -> Tuple[Dict[Any, int], float]:
+        """Get (community id of each node, modularity).
+
+        Ids are numbered by decreasing community size, ties in graph order of
+        the communities' first nodes, so community 0 is the largest.
+        """
+        nodes, matrix = csr_adjacency(graph, self.weight)
+        if not nodes:
+            return {}, 0.0
+
+        rng = np.random.default_rng(self.seed)
+        if self.method == 'louvain':
+            labels = louvain(matrix, rng, self.resolution, max_passes=self.max_iter)
+        else:
+            labels = label_propagation(matrix, rng, self.max_iter)
+
+        # Renumber by size, then first appearance
+        _, first, inverse, sizes = np.unique(labels, return_index=True, return_inverse=True, return_counts=True)
+        order = np.lexsort((first, -sizes))
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        labels = ranks[inverse]
+
+        score = modularity(matrix, labels, self.resolution)
+        logger.info(f"Found {len(order)} communities with {self.method} (modularity {score:.4f})")
+        return dict(zip(nodes, labels.tolist())), score
+
+
+class CommunityIndex:
+    """Community membership of every node, with per-community lookups and summaries."""
+
+    def __init__(self, membership: Dict[Any, int], modularity_score: float, method: str):
+        """Initialize the index from node -> community id."""
+        self.membership = membership
+        self.modularity = modularity_score
+        self.method = method
+        self.members = {}
+        for node, community in membership.items():
+            self.members.setdefault(community, []).append(node)
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, detector: Optional[CommunityDetector] = None) -> 'CommunityIndex':
+        """Detect communities and store each node's id in its community attribute.
+
+        Without an explicit detector, the ids already stored are kept when
+        they describe the current version of the graph: that of the last
+        detection, or of a filtered copy marked by inherit_communities. Any
+        other graph, including one changed since, is analysed again.
+        """
+        if detector is None and graph.number_of_nodes() and graph.graph.get(COMMUNITY_VERSION) == graph_version(graph):
+            existing = nx.get_node_attributes(graph, COMMUNITY_ATTRIBUTE)
+            if len(existing) == graph.number_of_nodes():
+                nodes, matrix = csr_adjacency(graph)
+                labels = np.fromiter((existing[node] for node in nodes), dtype=np.int64, count=len(nodes))
+                return cls(existing, modularity(matrix, labels), graph.graph.get('community_method', 'unknown'))
+
+        detector = detector or CommunityDetector()
+        membership, score = detector.detect(graph)
+        nx.set_node_attributes(graph, membership, COMMUNITY_ATTRIBUTE)
+        graph.graph['community_method'] = detector.method
+        graph.graph[COMMUNITY_VERSION] = graph_version(graph)
+        return cls(membership, score, detector.method)
+
+    def __len__(self) -> int:
+        """Get the number of communities."""
+        return len(self.members)
+
+    def community_of(self, node: Any) -> Optional[int]:
+        """Get a node's community id."""
+        return self.membership.get(node)
+
+    def nodes_in(self, communities: Iterable[int]) -> Set[Any]:
+        """Get the nodes of the given communities."""
+        return {node for community in communities for node in self.members.get(community, ())}
+
+    def count_in(self, communities: Iterable[int]) -> int:
+        """Count the nodes of the given communities."""
+        return sum(len(self.members.get(community, ())) for community in set(communities))
+
+    def summaries(self, graph: nx.Graph, top_n: int = 10) -> Dict[str, Any]:
+        """Summarise the partition and its largest communities: size, internal edges, types, countries and hub."""
+        internal_edges = Counter()
+        for u, v in graph.edges():
+            community = self.membership[u]
+            if community == self.membership[v]:
+                internal_edges[community] += 1
+
+        sizes = sorted((len(members) for members in self.members.values()), reverse=True)
+        largest = []
+        for community in sorted(self.members, key=lambda community: (-len(self.members[community]), community))[:top_n]:
+            members = self.members[community]
+            countries = Counter()
+            for node in members:
+                data = graph.nodes[node]
+                country = data.get('owner') or data.get('country') or data.get('nationality')
+                if country:
+                    countries[country] += 1
+            hub = max(members, key=graph.degree)
+
+            largest.append({
+                'community': community,
+                'size': len(members),
+                'internal_edges': internal_edges[community],
+                'node_types': dict(Counter(graph.nodes[node].get('type', 'unknown') for node in members)),
+                'top_countries': countries.most_common(3),
+                'hub': hub,
+                'hub_label': graph.nodes[hub].get('label', hub)
+            })
+
+        return {
+            'method': self.method,
+            'community_count': len(self.members),
+            'modularity': self.modularity,
+            'singleton_communities': sum(1 for size in sizes if size == 1),
+            'size_distribution': dict(Counter(sizes)),
+            'largest_communities': largest
+        }
+
+
+def get_community_index(graph: nx.Graph) -> CommunityIndex:
+    """Get the community index for a graph, detecting communities (and setting node attributes) if needed."""
+    return get_index(graph, COMMUNITY_INDEX, CommunityIndex.from_graph)
+
+
+def inherit_communities(graph: nx.Graph, filtered: nx.Graph):
+    """Mark a filtered copy of a graph as keeping the graph's community ids, if those are current."""
+    if graph.graph.get(COMMUNITY_VERSION) == graph_version(graph):
+        filtered.graph[COMMUNITY_VERSION] = graph_version(filtered)
+    else:
+        filtered.graph.pop(COMMUNITY_VERSION, None)
+
+
+def parse_communities(value: Union[int, str, Iterable[Any]]) -> List[int]:
+    """Parse community ids from an id, a comma-separated string or a list."""
+    if isinstance(value, str):
+        value = [part for part in value.split(',') if part.strip()]
+    elif not isinstance(value, (list, tuple, set, frozenset)):
+        value = [value]
+    return [int(str(part).strip()) for part in value]
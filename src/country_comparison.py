@@ -0,0 +1,146 @@
+"""
+Country Comparison for IES4 Military Database Analysis Suite
+Assigns every node to the compared countries it belongs to in a single pass and
+accumulates all per-country comparison structures at once.
+"""
+
+import networkx as nx
+import logging
+from collections import defaultdict, Counter
+from typing import Dict, List, Iterator, Any
+
+try:
+    from .node_types import NODE_TYPES, ORGANIZATION_TYPES, get_node_type_index
+    from .equipment_categories import KeywordMatcher
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from node_types import NODE_TYPES, ORGANIZATION_TYPES, get_node_type_index
+    from equipment_categories import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def mask_positions(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits of a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CountryMatcher:
+    """Bitmask of the countries whose name occurs, case-insensitively, in a field value.
+
+    Country names are compiled into one Aho-Corasick automaton, and results
+    are cached per distinct value, since owner and country fields repeat
+    heavily. Bit i stands for countries[i].
+    """
+
+    def __init__(self, countries: List[str]):
+        """Build the matcher for a list of country names."""
+        self.countries = list(countries)
+        keyword_masks = defaultdict(int)
+        # An empty name occurs in every value, including missing ones
+        self.match_all = 0
+        for position, country in enumerate(self.countries):
+            keyword = country.lower()
+            if keyword:
+                keyword_masks[keyword] |= 1 << position
+            else:
+                self.match_all |= 1 << position
+
+        self.matcher = KeywordMatcher(keyword_masks)
+        self._cache = {}
+
+    def match(self, value: Any) -> int:
+        """Get the mask of countries occurring in a field value (missing and non-text values match none)."""
+        if not isinstance(value, str) or not value:
+            return self.match_all
+
+        mask = self._cache.get(value)
+        if mask is None:
+            mask = self.matcher.match(value.lower()) | self.match_all
+            self._cache[value] = mask
+        return mask
+
+
+class CountryComparison:
+    """Single-pass per-country asset statistics, technology timelines and asset type counts.
+
+    A node belongs to a country for its asset statistics when the country's
+    name occurs in its owner, country or nationality (or, for country nodes,
+    its label). Timelines and asset types only consider owner and country.
+    """
+
+    def __init__(self, countries: List[str]):
+        """Initialize the comparison for a list of country names."""
+        self.countries = list(countries)
+        self.matcher = CountryMatcher(self.countries)
+
+    def compare(self, graph: nx.Graph) -> Dict[str, Dict[str, Any]]:
+        """Compute the 'countries', 'technology_timeline' and 'asset_types' comparison sections."""
+        stats = [self._new_country_stats() for _ in self.countries]
+        timelines = [defaultdict(int) for _ in self.countries]
+        asset_types = [Counter() for _ in self.countries]
+
+        country_code = NODE_TYPES.lookup('country')
+        vehicle_code = NODE_TYPES.lookup('vehicle')
+        area_code = NODE_TYPES.lookup('area')
+        person_code = NODE_TYPES.lookup('person')
+        organization_codes = set(NODE_TYPES.codes(ORGANIZATION_TYPES))
+        match = self.matcher.match
+
+        type_codes = get_node_type_index(graph).codes
+        for (node, data), type_code in zip(graph.nodes(data=True), type_codes.tolist()):
+            ownership = match(data.get('owner')) | match(data.get('country'))
+            membership = ownership | match(data.get('nationality'))
+            if type_code == country_code:
+                membership |= match(data.get('label'))
+            if not membership:
+                continue
+
+            year = data.get('year')
+            for position in mask_positions(membership):
+                country_stats = stats[position]
+                country_stats['total_assets'] += 1
+
+                if type_code == vehicle_code:
+                    country_stats['vehicles'] += 1
+                    country_stats['vehicle_types'][data.get('vehicle_type', 'unknown')] += 1
+                    country_stats['manufacturers'][data.get('manufacturer', 'unknown')] += 1
+                elif type_code in organization_codes:
+                    country_stats['organizations'] += 1
+                    country_stats['organization_types'][data.get('organization_type', 'unknown')] += 1
+                elif type_code == area_code:
+                    country_stats['areas'] += 1
+                elif type_code == person_code:
+                    country_stats['people'] += 1
+
+                if year:
+                    country_stats['timeline'][year] += 1
+
+            timeline_node = type_code == vehicle_code or type_code in organization_codes
+            for position in mask_positions(ownership):
+                asset_types[position][data.get('type', 'unknown')] += 1
+                if timeline_node and year:
+                    timelines[position][year] += 1
+
+        return {
+            'countries': dict(zip(self.countries, stats)),
+            'technology_timeline': {country: dict(timeline) for country, timeline in zip(self.countries, timelines)},
+            'asset_types': {country: dict(types) for country, types in zip(self.countries, asset_types)}
+        }
+
+    @staticmethod
+    def _new_country_stats() -> Dict[str, Any]:
+        """Get an empty per-country statistics record."""
+        return {
+            'total_assets': 0,
+            'vehicles': 0,
+            'organizations': 0,
+            'areas': 0,
+            'people': 0,
+            'vehicle_types': Counter(),
+            'organization_types': Counter(),
+            'manufacturers': Counter(),
+            'timeline': defaultdict(int)
+        }
@@ -238,6 +238,12 @@ class DatabaseLoader:
         is_valid = len(issues) == 0
         return is_valid, issues
     
+    def get_checksum(self, file_path: Path) -> str:
+        """Get the checksum of a file, reusing the tracked one while its modification time is unchanged."""
+        file_path = Path(file_path)
+        self._has_file_changed(file_path)
+        return self.file_checksums.get(str(file_path)) or self._calculate_file_checksum(file_path)
+    
     def clear_cache(self):
         """Clear all cached file information to force fresh loads."""
         logger.info("Clearing database loader cache")
@@ -0,0 +1,224 @@
+"""
+Equipment Categories for IES4 Military Database Analysis Suite
+Classifies nodes into military equipment categories with a single-pass keyword matcher.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+from collections import deque
+from typing import Dict, List, Iterable, Optional
+
+try:
+    from .graph_index import get_graph_cache
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_graph_cache
+
+logger = logging.getLogger(__name__)
+
+EQUIPMENT_INDEX = 'equipment_category_index'
+
+# Military equipment categories and their keywords
+EQUIPMENT_CATEGORIES = {
+    'aircraft_unmanned': ['unmanned aircraft', 'aircraft', 'drone', 'uav', 'unmanned aerial vehicle'],
+    'communication_electronics': ['communication equipment', 'electronic system', 'computer system',
+                                  'sensor', 'sensor system', 'equipment', 'electronic_system',
+                                  'radar', 'radio', 'electronics'],
+    'weapons_defense': ['artillery', 'missile', 'defense system', 'weapon', 'ammunition',
+                        'gun', 'cannon', 'launcher', 'rocket', 'bomb'],
+    'vehicles': ['armored vehicle', 'vehicle', 'car', 'motorcycle', 'truck', 'bus', 'van',
+                 'bicycle', 'tank', 'apc', 'armored'],
+    'naval_assets': ['naval vessel', 'vessel', 'boat', 'watercraft', 'ship', 'submarine',
+                     'destroyer', 'frigate', 'carrier'],
+    'transportation': ['train', 'railway', 'locomotive', 'transport'],
+    'administrative': ['organization', 'other', 'command', 'headquarters', 'base'],
+    'geographic': ['country', 'area', 'coordinates', 'location', 'region', 'territory']
+}
+
+# Node attributes that only count towards one category
+CATEGORY_FIELDS = {
+    'vehicle_type': 'vehicles',
+    'organization_type': 'administrative',
+    'area_type': 'geographic'
+}
+
+# Raw entity fields searched for every category
+ENTITY_TEXT_FIELDS = ['description', 'title', 'model', 'make', 'classification']
+
+# Separates fields so that no keyword match spans two of them
+FIELD_SEPARATOR = '\x1f'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton reporting the OR of the bitmasks of all keywords found in a text."""
+
+    def __init__(self, keyword_masks: Dict[str, int]):
+        """Build the automaton from a keyword -> bitmask mapping."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [0]
+
+        # Trie of all keywords
+        for keyword, mask in keyword_masks.items():
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(0)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] |= mask
+
+        # Failure links in breadth-first order, merging the outputs of suffix states
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def match(self, text: str) -> int:
+        """Get the combined bitmask of every keyword occurring in text."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        state = 0
+        mask = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            mask |= output[state]
+        return mask
+
+
+class EquipmentClassifier:
+    """Classifies node data into equipment category bitmasks."""
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None):
+        """Build the keyword matcher for the given categories."""
+        self.categories = {name: list(keywords) for name, keywords in (categories or EQUIPMENT_CATEGORIES).items()}
+        if len(self.categories) > 64:
+            raise ValueError("At most 64 equipment categories are supported")
+        self.bits = {category: 1 << position for position, category in enumerate(self.categories)}
+
+        keyword_masks = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                keyword_masks[keyword] = keyword_masks.get(keyword, 0) | self.bits[category]
+        self.matcher = KeywordMatcher(keyword_masks)
+
+        self.field_bits = {
+            field: self.bits[category] for field, category in CATEGORY_FIELDS.items() if category in self.bits
+        }
+
+    def classify(self, data: Dict) -> int:
+        """Get the category bitmask for one node's data."""
+        mask = self.matcher.match(FIELD_SEPARATOR.join(self._text_fields(data)))
+
+        # Category-specific attributes only count towards their own category
+        for field, bit in self.field_bits.items():
+            value = data.get(field)
+            if value and not mask & bit:
+                mask |= self.matcher.match(str(value).lower()) & bit
+
+        return mask
+
+    def category_names(self, mask: int) -> List[str]:
+        """Get the names of the categories set in a bitmask."""
+        return [category for category, bit in self.bits.items() if mask & bit]
+
+    @staticmethod
+    def _text_fields(data: Dict) -> Iterable[str]:
+        """Yield the lowercased text fields searched for every category."""
+        for value in (data.get('type'), data.get('label')):
+            if value:
+                yield str(value).lower()
+
+        entity_data = data.get('data', {})
+        for name_obj in entity_data.get('names', []):
+            if isinstance(name_obj, dict) and name_obj.get('value'):
+                yield str(name_obj['value']).lower()
+
+        for field in ENTITY_TEXT_FIELDS:
+            if entity_data.get(field):
+                yield str(entity_data[field]).lower()
+
+
+class EquipmentCategoryIndex:
+    """Per-node equipment category bitmasks aligned with graph node order."""
+
+    def __init__(self, classifier: EquipmentClassifier, nodes: List[str], masks: np.ndarray):
+        """Initialize the index from a classifier and per-node masks."""
+        self.classifier = classifier
+        self.categories = classifier.categories
+        self.bits = classifier.bits
+        self.nodes = nodes
+        self.masks = masks
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph,
+                   categories: Optional[Dict[str, List[str]]] = None) -> 'EquipmentCategoryIndex':
+        """Classify every node of a graph into the given categories."""
+        classifier = EquipmentClassifier(categories)
+
+        nodes = []
+        masks = np.zeros(len(graph), dtype=np.uint64)
+        for position, (node, data) in enumerate(graph.nodes(data=True)):
+            nodes.append(node)
+            masks[position] = classifier.classify(data)
+
+        logger.debug(f"Classified {len(nodes)} nodes into {len(classifier.categories)} equipment categories")
+        return cls(classifier, nodes, masks)
+
+    def category_mask(self, categories: Iterable[str]) -> int:
+        """Combine the bits of the named categories, ignoring unknown names."""
+        mask = 0
+        for category in categories:
+            mask |= self.bits.get(category, 0)
+        return mask
+
+    def nodes_in(self, categories: Iterable[str]) -> List[str]:
+        """Get nodes belonging to any of the given categories, in graph order."""
+        mask = self.category_mask(categories)
+        if not mask:
+            return []
+        nodes = self.nodes
+        return [nodes[position] for position in np.flatnonzero(self.masks & np.uint64(mask))]
+
+    def count(self, categories: Iterable[str]) -> int:
+        """Count nodes belonging to any of the given categories."""
+        mask = self.category_mask(categories)
+        if not mask:
+            return 0
+        return int(np.count_nonzero(self.masks & np.uint64(mask)))
+
+    def counts(self) -> Dict[str, int]:
+        """Count nodes in each category."""
+        return {
+            category: int(np.count_nonzero(self.masks & np.uint64(bit)))
+            for category, bit in self.bits.items()
+        }
+
+
+def get_equipment_category_index(graph: nx.Graph,
+                                 categories: Optional[Dict[str, List[str]]] = None) -> EquipmentCategoryIndex:
+    """Get the equipment category index for a graph, rebuilding it if the categories differ."""
+    categories = categories or EQUIPMENT_CATEGORIES
+    cache = get_graph_cache(graph)
+
+    index = cache.get(EQUIPMENT_INDEX)
+    if index is None or index.categories != categories:
+        index = EquipmentCategoryIndex.from_graph(graph, categories)
+        cache[EQUIPMENT_INDEX] = index
+
+    return index
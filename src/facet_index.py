@@ -0,0 +1,310 @@
+"""
+Facet Index for IES4 Military Database Analysis Suite
+Facet value counts for filter suggestions, maintained incrementally as graphs change.
+"""
+
+import networkx as nx
+import logging
+import weakref
+from collections import defaultdict
+from typing import Dict, List, Set, Iterable, Optional
+
+try:
+    from .graph_index import GraphChangeSet, graph_version
+    from .node_types import NODE_TYPES, ORGANIZATION_TYPES
+    from .equipment_categories import EquipmentClassifier
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import GraphChangeSet, graph_version
+    from node_types import NODE_TYPES, ORGANIZATION_TYPES
+    from equipment_categories import EquipmentClassifier
+
+logger = logging.getLogger(__name__)
+
+FACETS = [
+    'countries', 'types', 'years', 'manufacturers', 'vehicle_types',
+    'organization_types', 'area_types', 'relationships', 'equipment_categories'
+]
+
+# The filter each facet's values are offered for; counts use the filter's own matching rules
+FACET_FILTERS = {
+    'countries': 'country',
+    'types': 'type',
+    'years': 'year',
+    'manufacturers': 'manufacturer',
+    'vehicle_types': 'vehicle_type',
+    'organization_types': 'organization_type',
+    'area_types': 'area_type',
+    'relationships': 'relationship',
+    'equipment_categories': 'equipment_category'
+}
+
+# Node attributes that associate an entity with a country node
+COUNTRY_FIELDS = ['country', 'owner', 'nationality']
+
+# Facet indexes are kept across graph versions and brought up to date by change sets or sync()
+_facet_indexes = weakref.WeakKeyDictionary()
+
+
+class FacetIndex:
+    """Facet values and the nodes their filters match, updated in place from graph change sets.
+
+    A facet offers the values its nodes carry, and counts for each value the
+    nodes that the facet's filter matches, so selecting a value returns as
+    many nodes as were advertised. Relationship postings are kept from edges;
+    the other facets are matched with the filter system's streaming predicates,
+    which apply the same rules as the index-backed filters one node at a time.
+    """
+
+    def __init__(self, filter_system):
+        """Initialize an empty facet index for a filter system."""
+        self.filter_system = filter_system
+        self.categories = {name: list(keywords) for name, keywords in filter_system.equipment_categories.items()}
+        self.classifier = EquipmentClassifier(self.categories)
+        # facet -> value -> set of nodes carrying the value
+        self.postings = {facet: defaultdict(set) for facet in FACETS}
+        # node -> facet -> set of values (every facet except relationships)
+        self.node_values = {}
+        # node -> neighbour -> relationship
+        self.node_edges = defaultdict(dict)
+        # facet -> value -> set of nodes matched by the facet's filter for the value
+        self.matches = {facet: {} for facet in FACETS}
+        self.matches['relationships'] = self.postings['relationships']
+        # node -> set of (facet, value) whose filter matches it (every facet except relationships)
+        self.node_matches = defaultdict(set)
+        self._predicates = {}
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, filter_system) -> 'FacetIndex':
+        """Build a facet index over every node and edge of a graph."""
+        index = cls(filter_system)
+        for node in graph.nodes():
+            index._add_values(graph, node)
+        for source, target, relationship in graph.edges(data='relationship', default='unknown'):
+            index.add_edge(source, target, relationship)
+
+        # Match every value at once with the index-backed filters
+        for facet, filter_name in FACET_FILTERS.items():
+            if facet == 'relationships':
+                continue
+            filter_func = filter_system.available_filters[filter_name]
+            for value in index.postings[facet]:
+                index._set_matches(facet, value, filter_func(graph, value))
+
+        logger.debug(f"Indexed facets for {len(index.node_values)} nodes")
+        return index
+
+    def _extract_values(self, graph: nx.Graph, node: str) -> Dict[str, Set[str]]:
+        """Get the facet values of one node."""
+        data = graph.nodes[node]
+        values = defaultdict(set)
+
+        if data.get('type'):
+            values['types'].add(data['type'])
+        if data.get('year'):
+            values['years'].add(str(data['year']))
+        if data.get('manufacturer'):
+            values['manufacturers'].add(data['manufacturer'])
+
+        # Type-specific facets
+        entity_type = NODE_TYPES.canonical(data.get('type', ''))
+        if entity_type == 'vehicle' and data.get('vehicle_type'):
+            values['vehicle_types'].add(data['vehicle_type'])
+        elif entity_type in ORGANIZATION_TYPES and data.get('organization_type'):
+            values['organization_types'].add(data['organization_type'])
+        elif entity_type == 'area' and data.get('area_type'):
+            values['area_types'].add(data['area_type'])
+
+        # Countries are faceted by label, both for country nodes and the entities that reference them
+        if entity_type == 'country':
+            if data.get('label'):
+                values['countries'].add(data['label'])
+        else:
+            for field in COUNTRY_FIELDS:
+                country = data.get(field)
+                if isinstance(country, str) and country in graph:
+                    country_data = graph.nodes[country]
+                    if NODE_TYPES.canonical(country_data.get('type', '')) == 'country' and country_data.get('label'):
+                        values['countries'].add(country_data['label'])
+
+        values['equipment_categories'].update(self.classifier.category_names(self.classifier.classify(data)))
+        return values
+
+    def _predicate(self, facet: str, value: str):
+        """Get the streaming predicate of a facet's filter for a value."""
+        predicate = self._predicates.get((facet, value))
+        if predicate is None:
+            predicate = self.filter_system.streaming.compile({FACET_FILTERS[facet]: value})[0]
+            self._predicates[(facet, value)] = predicate
+        return predicate
+
+    def _set_matches(self, facet: str, value: str, nodes: Iterable[str]):
+        """Record the nodes a facet's filter matches for a value."""
+        matched = set(nodes)
+        self.matches[facet][value] = matched
+        for node in matched:
+            self.node_matches[node].add((facet, value))
+
+    def _add_values(self, graph: nx.Graph, node: str) -> List[tuple]:
+        """Record the facet values a node carries; returns the (facet, value) pairs new to the index."""
+        values = self._extract_values(graph, node)
+        self.node_values[node] = values
+
+        new_values = []
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                if value not in self.postings[facet]:
+                    new_values.append((facet, value))
+                self.postings[facet][value].add(node)
+        return new_values
+
+    def add_node(self, graph: nx.Graph, node: str):
+        """Index a node's facet values and the filter matches it falls into (its edges are added separately)."""
+        if node in self.node_values:
+            self._remove_values(node)
+
+        new_values = self._add_values(graph, node)
+
+        # Existing values only need this node checked; new values are matched across the graph
+        data = graph.nodes[node]
+        for facet, value_matches in self.matches.items():
+            if facet == 'relationships':
+                continue
+            for value, matched in value_matches.items():
+                if self._predicate(facet, value)(node, data):
+                    matched.add(node)
+                    self.node_matches[node].add((facet, value))
+
+        for facet, value in new_values:
+            predicate = self._predicate(facet, value)
+            self._set_matches(facet, value, (other for other, other_data in graph.nodes(data=True)
+                                             if predicate(other, other_data)))
+
+    def _remove_values(self, node: str):
+        """Remove a node's facet values and filter matches, dropping values no node carries any more."""
+        for facet, value in self.node_matches.pop(node, ()):
+            self.matches[facet][value].discard(node)
+
+        for facet, facet_values in self.node_values.pop(node, {}).items():
+            postings = self.postings[facet]
+            for value in facet_values:
+                postings[value].discard(node)
+                if not postings[value]:
+                    del postings[value]
+                    for matched in self.matches[facet].pop(value, ()):
+                        self.node_matches[matched].discard((facet, value))
+
+    def update_node(self, graph: nx.Graph, node: str):
+        """Re-index a node whose attributes changed."""
+        self.add_node(graph, node)
+
+    def remove_node(self, node: str):
+        """Remove a node and its edges from the index."""
+        for neighbour in list(self.node_edges.get(node, {})):
+            self.remove_edge(node, neighbour)
+        self.node_edges.pop(node, None)
+        self._remove_values(node)
+
+    def add_edge(self, source: str, target: str, relationship: str):
+        """Index the relationship of an edge for both of its endpoints."""
+        if self.node_edges[source].get(target) is not None:
+            self.remove_edge(source, target)
+
+        self.node_edges[source][target] = relationship
+        self.node_edges[target][source] = relationship
+        postings = self.postings['relationships'][relationship]
+        postings.add(source)
+        postings.add(target)
+
+    def remove_edge(self, source: str, target: str):
+        """Remove an edge, dropping endpoints that no longer have its relationship."""
+        relationship = self.node_edges[source].pop(target, None)
+        self.node_edges[target].pop(source, None)
+        if relationship is None:
+            return
+
+        postings = self.postings['relationships']
+        for node in (source, target):
+            if relationship not in self.node_edges[node].values():
+                postings[relationship].discard(node)
+        if not postings[relationship]:
+            del postings[relationship]
+
+    def apply(self, graph: nx.Graph, changes: GraphChangeSet):
+        """Update the index with a change set already made to the graph, touching only the changed nodes.
+
+        Added nodes that are already indexed are re-indexed, so attribute
+        edits are applied by listing the node as added.
+        """
+        for source, target in changes.removed_edges:
+            self.remove_edge(source, target)
+        for node in changes.removed_nodes:
+            self.remove_node(node)
+        for node in changes.added_nodes:
+            self.add_node(graph, node)
+        for source, target in changes.added_edges:
+            self.add_edge(source, target, graph.edges[source, target].get('relationship', 'unknown'))
+
+        logger.debug(f"Facet index applied {changes}")
+
+    def sync(self, graph: nx.Graph):
+        """Bring the index up to date with a graph edited without a change set.
+
+        Nodes and edges are compared by membership in O(N + E); attribute
+        edits of existing nodes are not detected and must be applied with
+        update_node() or a change set.
+        """
+        edges = self.node_edges
+        changes = GraphChangeSet(
+            added_nodes=[node for node in graph.nodes if node not in self.node_values],
+            removed_nodes=[node for node in self.node_values if node not in graph],
+            added_edges=[(u, v) for u, v in graph.edges if v not in edges.get(u, ())],
+            removed_edges=[(u, v) for u, neighbours in edges.items() for v in neighbours
+                           if not graph.has_edge(u, v)]
+        )
+        self.apply(graph, changes)
+
+    def values(self, facet: str) -> List[str]:
+        """Get the values of a facet, sorted."""
+        return sorted(value for value in self.postings[facet] if value)
+
+    def counts(self, nodes: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+        """Count the nodes each facet value's filter matches, optionally restricted to a set of nodes."""
+        if nodes is not None and not isinstance(nodes, (set, frozenset)):
+            nodes = set(nodes)
+
+        counts = {}
+        for facet, value_matches in self.matches.items():
+            facet_counts = {}
+            for value, matched in value_matches.items():
+                count = len(matched) if nodes is None else len(matched & nodes)
+                if value and count:
+                    facet_counts[value] = count
+            counts[facet] = facet_counts
+        return counts
+
+
+def get_facet_index(graph: nx.Graph, filter_system) -> FacetIndex:
+    """Get the facet index for a graph, bringing it up to date if the graph has changed.
+
+    Graphs changed through apply_graph_changes() already have their index
+    updated from the change set; other edits fall back to sync().
+    """
+    version = graph_version(graph)
+    entry = _facet_indexes.get(graph)
+
+    if entry is None or entry['index'].categories != filter_system.equipment_categories:
+        entry = {'version': version, 'index': FacetIndex.from_graph(graph, filter_system)}
+        _facet_indexes[graph] = entry
+    elif entry['version'] != version:
+        entry['index'].sync(graph)
+        entry['version'] = version
+
+    return entry['index']
+
+
+def apply_facet_changes(graph: nx.Graph, changes: GraphChangeSet):
+    """Update a graph's facet index, if it has one, with a change set already recorded as a new version."""
+    entry = _facet_indexes.get(graph)
+    if entry is not None:
+        entry['index'].apply(graph, changes)
+        entry['version'] = graph_version(graph)
@@ -0,0 +1,121 @@
+"""
+Filter Cache for IES4 Military Database Analysis Suite
+Memory-bounded LRU cache of filter results keyed by graph version and filter spec.
+"""
+
+import networkx as nx
+import json
+import logging
+import sys
+from collections import OrderedDict
+from numbers import Number
+from typing import Dict, Any, FrozenSet, Optional, Tuple
+
+try:
+    from .graph_index import graph_key
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import graph_key
+
+logger = logging.getLogger(__name__)
+
+# Keys whose list values are sets of alternatives, so their order never changes the result:
+# set-valued filters, and the conditions of expression groups (NOT negates their conjunction)
+UNORDERED_KEYS = frozenset({'type', 'types', 'equipment_category', 'community', 'conditions'})
+
+
+def canonical_filter_spec(filters: Any) -> str:
+    """Serialise a filter spec so equivalent specs produce the same key.
+
+    Dict keys are sorted, the lists of UNORDERED_KEYS and sets are sorted,
+    and numbers are compared as text, since every filter parses '3' and 3
+    alike. Other lists, such as bbox and near coordinates, keep their order.
+    """
+    def sort_key(item):
+        return json.dumps(item, sort_keys=True, default=str)
+
+    def canonical(value, unordered=False):
+        if isinstance(value, dict):
+            return {str(key): canonical(item, key in UNORDERED_KEYS) for key, item in value.items()}
+        if isinstance(value, (set, frozenset)):
+            return sorted((canonical(item) for item in value), key=sort_key)
+        if isinstance(value, (list, tuple)):
+            items = [canonical(item) for item in value]
+            return sorted(items, key=sort_key) if unordered else items
+        if isinstance(value, Number) and not isinstance(value, bool):
+            return str(value)
+        return value
+
+    return json.dumps(canonical(filters), sort_keys=True, default=str)
+
+
+class FilterResultCache:
+    """LRU cache of matching node sets, evicting least recently used entries beyond a memory budget."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entries: int = 1024):
+        """Initialize the cache with a memory budget and an entry limit."""
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (node set, size in bytes)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, graph: nx.Graph, filters: Dict[str, Any]) -> Tuple:
+        """Build the cache key for a filter spec applied to a graph."""
+        return graph_key(graph) + (canonical_filter_spec(filters),)
+
+    def get(self, key: Tuple) -> Optional[FrozenSet[str]]:
+        """Get a cached result, marking it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Tuple, nodes) -> FrozenSet[str]:
+        """Store a result and evict old entries until the cache fits its budget."""
+        nodes = frozenset(nodes)
+        # Node ids are shared with the graph, so only the set and the key count against the budget
+        size = sys.getsizeof(nodes) + sys.getsizeof(key[-1])
+
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+
+        if size > self.max_bytes:
+            logger.debug(f"Filter result of {size} bytes exceeds the cache budget; not cached")
+            return nodes
+
+        self._entries[key] = (nodes, size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+        return nodes
+
+    def clear(self):
+        """Remove all cached results."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and memory metrics."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
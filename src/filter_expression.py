@@ -0,0 +1,134 @@
+"""
+Filter Expressions for IES4 Military Database Analysis Suite
+Evaluates nested AND/OR/NOT filter trees as NumPy boolean bitsets over a dense node index.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+from typing import Dict, List, Iterable, Any, Optional
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+BITSET_INDEX = 'bitset_index'
+
+LOGIC_OPERATORS = ('AND', 'OR', 'NOT')
+
+
+class NodeBitsetIndex:
+    """Dense node positions so that node sets can be combined as NumPy boolean arrays."""
+
+    def __init__(self, nodes: List[str]):
+        """Initialize the index from nodes in graph order."""
+        self.nodes = nodes
+        self.positions = {node: position for position, node in enumerate(nodes)}
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'NodeBitsetIndex':
+        """Build the index from the node order of a graph."""
+        return cls(list(graph.nodes()))
+
+    def empty(self) -> np.ndarray:
+        """Get a bitset with no nodes set."""
+        return np.zeros(len(self.nodes), dtype=bool)
+
+    def full(self) -> np.ndarray:
+        """Get a bitset with every node set."""
+        return np.ones(len(self.nodes), dtype=bool)
+
+    def to_bitset(self, nodes: Iterable[str]) -> np.ndarray:
+        """Convert a collection of nodes to a bitset, ignoring nodes not in the graph."""
+        positions = self.positions
+        bits = self.empty()
+        bits[np.fromiter((positions[node] for node in nodes if node in positions), dtype=np.intp)] = True
+        return bits
+
+    def to_nodes(self, bits: np.ndarray) -> List[str]:
+        """Convert a bitset back to nodes, in graph order."""
+        nodes = self.nodes
+        return [nodes[position] for position in np.flatnonzero(bits)]
+
+
+def get_bitset_index(graph: nx.Graph) -> NodeBitsetIndex:
+    """Get the dense node index for a graph, building it if needed."""
+    return get_index(graph, BITSET_INDEX, NodeBitsetIndex.from_graph)
+
+
+class FilterExpressionEngine:
+    """Evaluates nested filter expressions for a FilterSystem.
+
+    An expression is either a leaf {'filter': {...}} whose filters are ANDed
+    together, or a group {'logic': 'AND' | 'OR' | 'NOT', 'conditions': [...]}
+    whose conditions are themselves expressions. NOT negates the AND of its
+    conditions, and any expression may also carry 'not': True. Conditions with
+    neither 'filter' nor 'conditions' are skipped, as are groups left empty.
+    """
+
+    def __init__(self, filter_system):
+        """Initialize the engine for a filter system."""
+        self.filter_system = filter_system
+
+    def evaluate(self, graph: nx.Graph, expression: Dict[str, Any]) -> np.ndarray:
+        """Evaluate an expression to a bitset aligned with get_bitset_index(graph)."""
+        bitset_index = get_bitset_index(graph)
+        bits = self._evaluate(bitset_index, graph, expression)
+        return bitset_index.empty() if bits is None else bits
+
+    def select_nodes(self, graph: nx.Graph, expression: Dict[str, Any]) -> List[str]:
+        """Get the nodes matching an expression, in graph order."""
+        return get_bitset_index(graph).to_nodes(self.evaluate(graph, expression))
+
+    def _evaluate(self, bitset_index: NodeBitsetIndex, graph: nx.Graph,
+                  expression: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Recursively evaluate one expression node, returning None if it is skipped."""
+        if 'logic' in expression or 'conditions' in expression:
+            bits = self._evaluate_group(bitset_index, graph, expression)
+        elif 'filter' in expression:
+            bits = self._evaluate_leaf(bitset_index, graph, expression['filter'])
+        else:
+            logger.warning(f"Skipping filter expression without 'filter' or 'conditions': {expression}")
+            return None
+
+        if bits is not None and expression.get('not', False):
+            bits = ~bits
+        return bits
+
+    def _evaluate_leaf(self, bitset_index: NodeBitsetIndex, graph: nx.Graph, filters: Dict[str, Any]) -> np.ndarray:
+        """Evaluate a conjunctive filter dict, which matches nothing if it names no known filter."""
+        if not any(name in self.filter_system.available_filters for name in filters):
+            return bitset_index.empty()
+        return bitset_index.to_bitset(self.filter_system.match_nodes(graph, filters))
+
+    def _evaluate_group(self, bitset_index: NodeBitsetIndex, graph: nx.Graph,
+                        expression: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Combine the conditions of a group, stopping early once the result is settled."""
+        logic = str(expression.get('logic', 'AND')).upper()
+        if logic not in LOGIC_OPERATORS:
+            logger.warning(f"Unknown filter logic {logic!r}, using AND")
+            logic = 'AND'
+
+        bits = None
+        for condition in expression.get('conditions', []):
+            condition_bits = self._evaluate(bitset_index, graph, condition)
+            if condition_bits is None:
+                continue
+
+            if bits is None:
+                bits = condition_bits.copy()
+            elif logic == 'OR':
+                bits |= condition_bits
+            else:
+                bits &= condition_bits
+
+            # Stop once further conditions cannot change the result
+            if (logic == 'OR' and bits.all()) or (logic != 'OR' and not bits.any()):
+                break
+
+        if bits is not None and logic == 'NOT':
+            bits = ~bits
+        return bits
@@ -5,10 +5,43 @@ Handles filtering and searching of graph data based on various criteria.
 
 import networkx as nx
 import logging
-from typing import Dict, List, Set, Any, Optional, Union
+from typing import Dict, List, Set, FrozenSet, Tuple, Iterable, Iterator, Any, Optional, Union
+from pathlib import Path
 from datetime import datetime
 import re
 from collections import defaultdict
+from functools import partial
+
+try:
+    from .graph_index import get_relationship_index
+    from .node_types import NODE_TYPES, ORGANIZATION_TYPES, get_node_type_index
+    from .attribute_index import get_attribute_index
+    from .text_index import get_text_index, combine_node_sets
+    from .query_planner import FilterPlanner
+    from .numeric_index import get_year_index, get_degree_index, parse_ranges
+    from .filter_cache import FilterResultCache
+    from .equipment_categories import EQUIPMENT_CATEGORIES, get_equipment_category_index
+    from .filter_expression import FilterExpressionEngine
+    from .facet_index import get_facet_index
+    from .name_index import get_name_index
+    from .spatial_index import get_spatial_index, near_box, parse_bbox, parse_near
+    from .streaming_filter import StreamingFilter
+    from .community_detection import get_community_index, inherit_communities, parse_communities
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_relationship_index
+    from node_types import NODE_TYPES, ORGANIZATION_TYPES, get_node_type_index
+    from attribute_index import get_attribute_index
+    from text_index import get_text_index, combine_node_sets
+    from query_planner import FilterPlanner
+    from numeric_index import get_year_index, get_degree_index, parse_ranges
+    from filter_cache import FilterResultCache
+    from equipment_categories import EQUIPMENT_CATEGORIES, get_equipment_category_index
+    from filter_expression import FilterExpressionEngine
+    from facet_index import get_facet_index
+    from name_index import get_name_index
+    from spatial_index import get_spatial_index, near_box, parse_bbox, parse_near
+    from streaming_filter import StreamingFilter
+    from community_detection import get_community_index, inherit_communities, parse_communities
 
 logger = logging.getLogger(__name__)
 
@@ -29,100 +62,146 @@ class FilterSystem:
             'area_type': self._filter_by_area_type,
             'relationship': self._filter_by_relationship,
             'keyword': self._filter_by_keyword,
+            'fuzzy_name': self._filter_by_fuzzy_name,
             'has_connection': self._filter_by_connection,
             'degree_min': self._filter_by_min_degree,
             'degree_max': self._filter_by_max_degree,
+            # Detected communities, by id or by a member node
+            'community': self._filter_by_community,
+            # Geographic filters over area coordinates
+            'bbox': self._filter_by_bbox,
+            'within_area': self._filter_by_within_area,
+            'near': self._filter_by_near,
             # Enhanced military equipment category filters
             'equipment_category': self._filter_by_equipment_category
         }
         
-        # Define military equipment categories and their keywords
+        self.planner = FilterPlanner(self)
+        self.expressions = FilterExpressionEngine(self)
+        self.streaming = StreamingFilter(self)
+        
+        # Matching node sets for recently used filter specs
+        self.result_cache = FilterResultCache()
+        
+        # Military equipment categories and their keywords
         self.equipment_categories = {
-            'aircraft_unmanned': ['unmanned aircraft', 'aircraft', 'drone', 'uav', 'unmanned aerial vehicle'],
-            'communication_electronics': ['communication equipment', 'electronic system', 'computer system', 
-                                        'sensor', 'sensor system', 'equipment', 'electronic_system', 
-                                        'radar', 'radio', 'electronics'],
-            'weapons_defense': ['artillery', 'missile', 'defense system', 'weapon', 'ammunition', 
-                              'gun', 'cannon', 'launcher', 'rocket', 'bomb'],
-            'vehicles': ['armored vehicle', 'vehicle', 'car', 'motorcycle', 'truck', 'bus', 'van', 
-                        'bicycle', 'tank', 'apc', 'armored'],
-            'naval_assets': ['naval vessel', 'vessel', 'boat', 'watercraft', 'ship', 'submarine', 
-                           'destroyer', 'frigate', 'carrier'],
-            'transportation': ['train', 'railway', 'locomotive', 'transport'],
-            'administrative': ['organization', 'other', 'command', 'headquarters', 'base'],
-            'geographic': ['country', 'area', 'coordinates', 'location', 'region', 'territory']
+            category: list(keywords) for category, keywords in EQUIPMENT_CATEGORIES.items()
         }
+        
+        # Inverted attribute indexes backing the equality and substring filters
+        self.indexed_attributes = {
+            'country': {'fields': ['country']},
+            'owner': {'fields': ['owner']},
+            'nationality': {'fields': ['nationality']},
+            'manufacturer': {'fields': ['manufacturer'], 'entity_fields': ['make']},
+            'vehicle_type': {'fields': ['vehicle_type'], 'node_types': ['vehicle']},
+            'organization_type': {'fields': ['organization_type'], 'node_types': list(ORGANIZATION_TYPES)},
+            'area_type': {'fields': ['area_type'], 'node_types': ['area']},
+            'country_name': {'entity_names': True, 'node_types': ['country']}
+        }
+        
+        # Attribute filters as (indexed attribute, match operation) pairs whose matches are unioned
+        self.attribute_filters = {
+            'country': [('country', 'equals'), ('owner', 'endswith'), ('nationality', 'endswith'),
+                        ('country_name', 'contains')],
+            'manufacturer': [('manufacturer', 'contains')],
+            'owner': [('owner', 'contains')],
+            'vehicle_type': [('vehicle_type', 'contains')],
+            'organization_type': [('organization_type', 'contains')],
+            'area_type': [('area_type', 'contains')]
+        }
+        
+        # Result size estimates from index statistics, used to order filters without running them;
+        # the planner assumes filters without one match every node
+        self.filter_estimators = {
+            'type': self._estimate_type,
+            'year': self._estimate_year,
+            'year_range': self._estimate_year_range,
+            'relationship': self._estimate_relationship,
+            'keyword': self._estimate_keyword,
+            'fuzzy_name': self._estimate_fuzzy_name,
+            'has_connection': self._estimate_connection,
+            'degree_min': self._estimate_min_degree,
+            'degree_max': self._estimate_max_degree,
+            'community': self._estimate_community,
+            'bbox': self._estimate_bbox,
+            'within_area': self._estimate_within_area,
+            'near': self._estimate_near,
+            'equipment_category': self._estimate_equipment_category
+        }
+        self.filter_estimators.update({
+            name: partial(self._estimate_attribute_filter, name) for name in self.attribute_filters
+        })
+    
+    def _attribute_index(self, graph: nx.Graph, name: str):
+        """Get the inverted index for one of the indexed attributes."""
+        return get_attribute_index(graph, name, **self.indexed_attributes[name])
+    
+    def _match_attribute_filter(self, graph: nx.Graph, filter_name: str, value: Any) -> Set[str]:
+        """Union the index lookups that make up an attribute filter."""
+        valid_nodes = set()
+        for attribute, operation in self.attribute_filters[filter_name]:
+            valid_nodes |= getattr(self._attribute_index(graph, attribute), operation)(value)
+        return valid_nodes
     
     def apply_filters(self, graph: nx.Graph, filters: Dict[str, Any]) -> nx.Graph:
         """Apply multiple filters to a graph and return the filtered subgraph."""
         logger.info(f"Applying {len(filters)} filters to graph with {len(graph.nodes())} nodes")
         
         if not filters:
-            return graph.copy()
-        
-        # Start with all nodes
-        valid_nodes = set(graph.nodes())
-        
-        # Apply each filter
-        for filter_name, filter_value in filters.items():
-            if filter_name in self.available_filters:
-                logger.debug(f"Applying filter: {filter_name} = {filter_value}")
-                filter_func = self.available_filters[filter_name]
-                filtered_nodes = filter_func(graph, filter_value)
-                valid_nodes = valid_nodes.intersection(filtered_nodes)
-                logger.debug(f"Nodes after {filter_name}: {len(valid_nodes)}")
-            else:
-                logger.warning(f"Unknown filter: {filter_name}")
+            return self._filtered_copy(graph)
+        
+        valid_nodes = self.match_nodes(graph, filters)
         
         # Create subgraph with valid nodes
-        filtered_graph = graph.subgraph(valid_nodes).copy()
+        filtered_graph = self._filtered_copy(graph, valid_nodes)
         logger.info(f"Filtered graph: {len(filtered_graph.nodes())} nodes, {len(filtered_graph.edges())} edges")
         
         return filtered_graph
     
-    def _filter_by_country(self, graph: nx.Graph, country: str) -> Set[str]:
-        """Filter nodes by country association."""
-        valid_nodes = set()
-        country_lower = country.lower()
+    def _filtered_copy(self, graph: nx.Graph, nodes: Optional[Iterable[str]] = None) -> nx.Graph:
+        """Copy a graph, or the subgraph of some of its nodes, keeping its detected communities."""
+        filtered_graph = graph.copy() if nodes is None else graph.subgraph(nodes).copy()
+        inherit_communities(graph, filtered_graph)
+        return filtered_graph
+    
+    def match_nodes(self, graph: nx.Graph, filters: Dict[str, Any]) -> FrozenSet[str]:
+        """Get the nodes matching all filters, reusing cached results for repeated specs."""
+        key = self.result_cache.make_key(graph, filters)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Filter cache hit: {len(cached)} nodes")
+            return cached
+        
+        # Run the filters most selective first, each on the surviving candidates
+        valid_nodes, report = self.planner.execute(graph, filters)
+        logger.debug(f"Filter plan: {[step['filter'] for step in report['plan']]} "
+                     f"in {report['total_time_ms']:.2f}ms")
+        
+        return self.result_cache.put(key, valid_nodes)
+    
+    def stream_filter(self, file_path: Union[str, Path], filters: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (node id, attributes) for entities of a database file matching attribute filters, without a graph.
         
-        for node, data in graph.nodes(data=True):
-            # Check direct country field
-            if data.get('country', '').lower() == country_lower:
-                valid_nodes.add(node)
-                continue
-            
-            # Check owner field (for vehicles)
-            if data.get('owner', '').lower().endswith(country_lower):
-                valid_nodes.add(node)
-                continue
-            
-            # Check nationality (for people)
-            if data.get('nationality', '').lower().endswith(country_lower):
-                valid_nodes.add(node)
-                continue
-            
-            # Check if it's a country node itself
-            if data.get('type') == 'country':
-                entity_data = data.get('data', {})
-                if 'names' in entity_data:
-                    for name_obj in entity_data['names']:
-                        if isinstance(name_obj, dict):
-                            name_value = name_obj.get('value', '').lower()
-                            if country_lower in name_value:
-                                valid_nodes.add(node)
-                                break
+        Raises ValueError for filters that need edges or other nodes.
+        """
+        return self.streaming.stream(file_path, filters)
+    
+    def explain(self, graph: nx.Graph, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a filter set and report the chosen plan, per-step candidate counts and timings."""
+        return self.planner.execute(graph, filters)[1]
+    
+    def _filter_by_country(self, graph: nx.Graph, country: str) -> Set[str]:
+        """Filter nodes by country association.
         
-        return valid_nodes
+        Matches the country field exactly, owner and nationality references
+        ending with the country, and country nodes whose names mention it.
+        """
+        return self._match_attribute_filter(graph, 'country', country)
     
     def _filter_by_type(self, graph: nx.Graph, entity_type: str) -> Set[str]:
-        """Filter nodes by entity type."""
-        valid_nodes = set()
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == entity_type:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        """Filter nodes by entity type (any alias, e.g. 'vehicle' or 'vehicles')."""
+        return set(get_node_type_index(graph).nodes_of_type(entity_type))
     
     def _filter_by_year(self, graph: nx.Graph, year: Union[int, str]) -> Set[str]:
         """Filter nodes by specific year."""
@@ -132,164 +211,68 @@ class FilterSystem:
             logger.warning(f"Invalid year format: {year}")
             return set()
         
-        valid_nodes = set()
-        
-        for node, data in graph.nodes(data=True):
-            node_year = data.get('year')
-            if node_year == target_year:
-                valid_nodes.add(node)
-                continue
-            
-            # Check entity data for year fields
-            entity_data = data.get('data', {})
-            if entity_data.get('year') == target_year:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        return get_year_index(graph).equals(target_year)
     
-    def _filter_by_year_range(self, graph: nx.Graph, year_range: str) -> Set[str]:
-        """Filter nodes by year range (e.g., '1990-2000')."""
+    def _filter_by_year_range(self, graph: nx.Graph, year_range: Union[str, List[str]]) -> Set[str]:
+        """Filter nodes by year range (e.g., '1990-2000', open-ended '1990-' or '1960-1970,1990-')."""
         try:
-            start_year, end_year = map(int, year_range.split('-'))
+            ranges = parse_ranges(year_range)
         except (ValueError, TypeError):
             logger.warning(f"Invalid year range format: {year_range}")
             return set()
         
-        valid_nodes = set()
-        
-        for node, data in graph.nodes(data=True):
-            node_year = data.get('year')
-            if node_year and start_year <= node_year <= end_year:
-                valid_nodes.add(node)
-                continue
-            
-            # Check entity data
-            entity_data = data.get('data', {})
-            entity_year = entity_data.get('year')
-            if entity_year and start_year <= entity_year <= end_year:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        return get_year_index(graph).in_ranges(ranges)
     
     def _filter_by_manufacturer(self, graph: nx.Graph, manufacturer: str) -> Set[str]:
-        """Filter nodes by manufacturer."""
-        valid_nodes = set()
-        manufacturer_lower = manufacturer.lower()
-        
-        for node, data in graph.nodes(data=True):
-            # Check manufacturer field
-            node_manufacturer = data.get('manufacturer', '').lower()
-            if manufacturer_lower in node_manufacturer:
-                valid_nodes.add(node)
-                continue
-            
-            # Check entity data
-            entity_data = data.get('data', {})
-            entity_manufacturer = entity_data.get('make', '').lower()
-            if manufacturer_lower in entity_manufacturer:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        """Filter nodes by manufacturer (node manufacturer or entity make)."""
+        return self._match_attribute_filter(graph, 'manufacturer', manufacturer)
     
     def _filter_by_owner(self, graph: nx.Graph, owner: str) -> Set[str]:
         """Filter nodes by owner."""
-        valid_nodes = set()
-        owner_lower = owner.lower()
-        
-        for node, data in graph.nodes(data=True):
-            node_owner = data.get('owner', '').lower()
-            if owner_lower in node_owner:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        return self._match_attribute_filter(graph, 'owner', owner)
     
     def _filter_by_vehicle_type(self, graph: nx.Graph, vehicle_type: str) -> Set[str]:
         """Filter nodes by vehicle type."""
-        valid_nodes = set()
-        vehicle_type_lower = vehicle_type.lower()
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'vehicle':
-                node_vtype = data.get('vehicle_type', '').lower()
-                if vehicle_type_lower in node_vtype:
-                    valid_nodes.add(node)
-        
-        return valid_nodes
+        return self._match_attribute_filter(graph, 'vehicle_type', vehicle_type)
     
     def _filter_by_organization_type(self, graph: nx.Graph, org_type: str) -> Set[str]:
         """Filter nodes by organization type."""
-        valid_nodes = set()
-        org_type_lower = org_type.lower()
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'militaryOrganization':
-                node_org_type = data.get('organization_type', '').lower()
-                if org_type_lower in node_org_type:
-                    valid_nodes.add(node)
-        
-        return valid_nodes
+        return self._match_attribute_filter(graph, 'organization_type', org_type)
     
     def _filter_by_area_type(self, graph: nx.Graph, area_type: str) -> Set[str]:
         """Filter nodes by area type."""
-        valid_nodes = set()
-        area_type_lower = area_type.lower()
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'area':
-                node_area_type = data.get('area_type', '').lower()
-                if area_type_lower in node_area_type:
-                    valid_nodes.add(node)
-        
-        return valid_nodes
+        return self._match_attribute_filter(graph, 'area_type', area_type)
     
     def _filter_by_relationship(self, graph: nx.Graph, relationship: str) -> Set[str]:
         """Filter nodes that have a specific type of relationship."""
-        valid_nodes = set()
-        
-        for source, target, edge_data in graph.edges(data=True):
-            if edge_data.get('relationship') == relationship:
-                valid_nodes.add(source)
-                valid_nodes.add(target)
-        
-        return valid_nodes
+        return get_relationship_index(graph).nodes(relationship)
     
     def _filter_by_keyword(self, graph: nx.Graph, keyword: str) -> Set[str]:
-        """Filter nodes by keyword search in labels and descriptions."""
-        valid_nodes = set()
-        keyword_lower = keyword.lower()
-        
-        for node, data in graph.nodes(data=True):
-            # Search in label
-            label = data.get('label', '').lower()
-            if keyword_lower in label:
-                valid_nodes.add(node)
-                continue
-            
-            # Search in node ID
-            if keyword_lower in node.lower():
-                valid_nodes.add(node)
-                continue
-            
-            # Search in entity data
-            entity_data = data.get('data', {})
-            
-            # Search in names
-            if 'names' in entity_data:
-                for name_obj in entity_data.get('names', []):
-                    if isinstance(name_obj, dict):
-                        name_value = name_obj.get('value', '').lower()
-                        if keyword_lower in name_value:
-                            valid_nodes.add(node)
-                            break
-            
-            # Search in other text fields
-            for field in ['description', 'title', 'model', 'make']:
-                field_value = entity_data.get(field, '').lower()
-                if keyword_lower in field_value:
-                    valid_nodes.add(node)
-                    break
+        """Filter nodes by keyword search in labels, ids, names and descriptions."""
+        return get_text_index(graph).substring(str(keyword))
+    
+    def _filter_by_fuzzy_name(self, graph: nx.Graph, name: str) -> Set[str]:
+        """Filter nodes whose name is within a small edit distance of name, across transliterations.
         
-        return valid_nodes
+        A suffix such as 'Odessa~2' sets the edit distance explicitly.
+        """
+        query = self._parse_fuzzy_name(name)
+        if query is None:
+            return set()
+        return get_name_index(graph).matches(*query)
+    
+    @staticmethod
+    def _parse_fuzzy_name(name: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Split a fuzzy name filter into (name, edit distance or None), or None if the distance is invalid."""
+        name = str(name)
+        if '~' not in name:
+            return name, None
+        name, _, distance = name.rpartition('~')
+        try:
+            return name, int(distance)
+        except ValueError:
+            logger.warning(f"Invalid fuzzy name distance: {distance}")
+            return None
     
     def _filter_by_connection(self, graph: nx.Graph, target_node: str) -> Set[str]:
         """Filter nodes that are connected to a specific target node."""
@@ -310,13 +293,7 @@ class FilterSystem:
             logger.warning(f"Invalid minimum degree: {min_degree}")
             return set()
         
-        valid_nodes = set()
-        
-        for node in graph.nodes():
-            if graph.degree(node) >= min_deg:
-                valid_nodes.add(node)
-        
-        return valid_nodes
+        return get_degree_index(graph).between(low=min_deg)
     
     def _filter_by_max_degree(self, graph: nx.Graph, max_degree: Union[int, str]) -> Set[str]:
         """Filter nodes with maximum degree (number of connections)."""
@@ -326,13 +303,46 @@ class FilterSystem:
             logger.warning(f"Invalid maximum degree: {max_degree}")
             return set()
         
-        valid_nodes = set()
+        return get_degree_index(graph).between(high=max_deg)
+    
+    def _filter_by_community(self, graph: nx.Graph, community: Union[int, str, List[Any]]) -> Set[str]:
+        """Filter nodes by community: ids ('3', '3,5' or a list), or a node id for that node's community."""
+        community_index = get_community_index(graph)
         
-        for node in graph.nodes():
-            if graph.degree(node) <= max_deg:
-                valid_nodes.add(node)
+        if isinstance(community, str) and community in graph:
+            return community_index.nodes_in([community_index.community_of(community)])
         
-        return valid_nodes
+        try:
+            communities = parse_communities(community)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid community: {community}")
+            return set()
+        
+        return community_index.nodes_in(communities)
+    
+    def _filter_by_bbox(self, graph: nx.Graph, bbox: Union[str, List[float]]) -> Set[str]:
+        """Filter nodes whose coordinates intersect a bounding box ('min_lon,min_lat,max_lon,max_lat')."""
+        try:
+            box = parse_bbox(bbox)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid bounding box: {bbox}")
+            return set()
+        
+        return get_spatial_index(graph).in_bbox(box)
+    
+    def _filter_by_within_area(self, graph: nx.Graph, area: str) -> Set[str]:
+        """Filter nodes inside an area's polygon, given by area id or name."""
+        return get_spatial_index(graph).within_area(str(area))
+    
+    def _filter_by_near(self, graph: nx.Graph, near: Union[str, Dict[str, float], List[float]]) -> Set[str]:
+        """Filter nodes within a distance of a point ('lat,lon,km')."""
+        try:
+            lat, lon, km = parse_near(near)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid proximity filter: {near}")
+            return set()
+        
+        return get_spatial_index(graph).near(lat, lon, km)
     
     def _filter_by_equipment_category(self, graph: nx.Graph, categories: Union[str, List[str]]) -> Set[str]:
         """Filter nodes by military equipment categories.
@@ -344,206 +354,213 @@ class FilterSystem:
         Returns:
             Set of node IDs that match the specified equipment categories
         """
-        valid_nodes = set()
-        
         # Handle single category as string
         if isinstance(categories, str):
             categories = [categories]
         
-        # Collect all keywords for selected categories
-        category_keywords = set()
-        for category in categories:
-            if category in self.equipment_categories:
-                category_keywords.update(self.equipment_categories[category])
-        
-        if not category_keywords:
+        known_categories = [category for category in categories if category in self.equipment_categories]
+        if not known_categories:
             logger.warning(f"No keywords found for categories: {categories}")
-            return valid_nodes
+            return set()
         
-        # Search nodes for category keywords
-        for node, data in graph.nodes(data=True):
-            node_matched = False
-            
-            # Check entity type directly
-            entity_type = data.get('type', '').lower()
-            for keyword in category_keywords:
-                if keyword.lower() in entity_type:
-                    valid_nodes.add(node)
-                    node_matched = True
-                    break
-            
-            if node_matched:
-                continue
-            
-            # Check vehicle type for vehicle-related categories
-            if 'vehicle' in categories or 'vehicles' in categories:
-                vehicle_type = data.get('vehicle_type', '').lower()
-                for keyword in category_keywords:
-                    if keyword.lower() in vehicle_type:
-                        valid_nodes.add(node)
-                        node_matched = True
-                        break
-            
-            if node_matched:
-                continue
-            
-            # Check organization type for administrative categories
-            if 'administrative' in categories:
-                org_type = data.get('organization_type', '').lower()
-                for keyword in category_keywords:
-                    if keyword.lower() in org_type:
-                        valid_nodes.add(node)
-                        node_matched = True
-                        break
-            
-            if node_matched:
-                continue
-                
-            # Check area type for geographic categories
-            if 'geographic' in categories:
-                area_type = data.get('area_type', '').lower()
-                for keyword in category_keywords:
-                    if keyword.lower() in area_type:
-                        valid_nodes.add(node)
-                        node_matched = True
-                        break
-            
-            if node_matched:
-                continue
-            
-            # Check in label and description
-            label = data.get('label', '').lower()
-            for keyword in category_keywords:
-                if keyword.lower() in label:
-                    valid_nodes.add(node)
-                    node_matched = True
-                    break
-            
-            if node_matched:
-                continue
-            
-            # Check in entity data fields
-            entity_data = data.get('data', {})
-            
-            # Search in names
-            if 'names' in entity_data:
-                for name_obj in entity_data.get('names', []):
-                    if isinstance(name_obj, dict):
-                        name_value = name_obj.get('value', '').lower()
-                        for keyword in category_keywords:
-                            if keyword.lower() in name_value:
-                                valid_nodes.add(node)
-                                node_matched = True
-                                break
-                    if node_matched:
-                        break
-            
-            if node_matched:
-                continue
-            
-            # Search in other descriptive fields
-            for field in ['description', 'title', 'model', 'make', 'classification']:
-                field_value = entity_data.get(field, '').lower()
-                for keyword in category_keywords:
-                    if keyword.lower() in field_value:
-                        valid_nodes.add(node)
-                        node_matched = True
-                        break
-                if node_matched:
-                    break
+        # Nodes are classified once per graph; the filter is a bitmask test
+        category_index = get_equipment_category_index(graph, self.equipment_categories)
+        valid_nodes = set(category_index.nodes_in(known_categories))
         
         logger.debug(f"Equipment category filter for {categories}: {len(valid_nodes)} nodes found")
         return valid_nodes
     
+    def _estimate_attribute_filter(self, filter_name: str, graph: nx.Graph, value: Any) -> int:
+        """Estimate an attribute filter from the posting-list lengths of its index lookups."""
+        return sum(self._attribute_index(graph, attribute).estimate(operation, value)
+                   for attribute, operation in self.attribute_filters[filter_name])
+    
+    def _estimate_type(self, graph: nx.Graph, entity_type: str) -> int:
+        """Estimate the type filter from per-type node counts."""
+        return get_node_type_index(graph).count(entity_type)
+    
+    def _estimate_year(self, graph: nx.Graph, year: Union[int, str]) -> int:
+        """Estimate the year filter from the year index span."""
+        try:
+            target_year = int(year)
+        except (ValueError, TypeError):
+            return 0
+        return get_year_index(graph).count_between(target_year, target_year)
+    
+    def _estimate_year_range(self, graph: nx.Graph, year_range: Union[str, List[str]]) -> int:
+        """Estimate the year range filter from the year index spans."""
+        try:
+            ranges = parse_ranges(year_range)
+        except (ValueError, TypeError):
+            return 0
+        return get_year_index(graph).count_in_ranges(ranges)
+    
+    def _estimate_relationship(self, graph: nx.Graph, relationship: str) -> int:
+        """Estimate the relationship filter from the relationship index."""
+        return get_relationship_index(graph).node_count(relationship)
+    
+    def _estimate_keyword(self, graph: nx.Graph, keyword: str) -> int:
+        """Estimate the keyword filter from trigram posting-list lengths."""
+        return get_text_index(graph).estimate_substring(str(keyword))
+    
+    def _estimate_fuzzy_name(self, graph: nx.Graph, name: str) -> int:
+        """Estimate the fuzzy name filter from the name index's key length buckets."""
+        query = self._parse_fuzzy_name(name)
+        return 0 if query is None else get_name_index(graph).estimate(*query)
+    
+    def _estimate_connection(self, graph: nx.Graph, target_node: str) -> int:
+        """Estimate the connection filter from the target node's degree."""
+        return graph.degree(target_node) + 1 if target_node in graph else 0
+    
+    def _estimate_min_degree(self, graph: nx.Graph, min_degree: Union[int, str]) -> int:
+        """Estimate the minimum degree filter from the degree index span."""
+        try:
+            return get_degree_index(graph).count_between(low=int(min_degree))
+        except (ValueError, TypeError):
+            return 0
+    
+    def _estimate_max_degree(self, graph: nx.Graph, max_degree: Union[int, str]) -> int:
+        """Estimate the maximum degree filter from the degree index span."""
+        try:
+            return get_degree_index(graph).count_between(high=int(max_degree))
+        except (ValueError, TypeError):
+            return 0
+    
+    def _estimate_community(self, graph: nx.Graph, community: Union[int, str, List[Any]]) -> int:
+        """Estimate the community filter from community sizes."""
+        community_index = get_community_index(graph)
+        if isinstance(community, str) and community in graph:
+            return community_index.count_in([community_index.community_of(community)])
+        try:
+            return community_index.count_in(parse_communities(community))
+        except (ValueError, TypeError):
+            return 0
+    
+    def _estimate_bbox(self, graph: nx.Graph, bbox: Union[str, List[float]]) -> int:
+        """Estimate the bounding box filter from the spatial index's bounding-box candidates."""
+        try:
+            return get_spatial_index(graph).estimate(parse_bbox(bbox))
+        except (ValueError, TypeError):
+            return 0
+    
+    def _estimate_within_area(self, graph: nx.Graph, area: str) -> int:
+        """Estimate the area filter from the spatial index's candidates in the area's bounds."""
+        return get_spatial_index(graph).estimate_within_area(str(area))
+    
+    def _estimate_near(self, graph: nx.Graph, near: Union[str, Dict[str, float], List[float]]) -> int:
+        """Estimate the proximity filter from the spatial index's candidates around the point."""
+        try:
+            return get_spatial_index(graph).estimate(near_box(*parse_near(near)))
+        except (ValueError, TypeError):
+            return 0
+    
+    def _estimate_equipment_category(self, graph: nx.Graph, categories: Union[str, List[str]]) -> int:
+        """Estimate the equipment category filter from the category bitmasks."""
+        if isinstance(categories, str):
+            categories = [categories]
+        known_categories = [category for category in categories if category in self.equipment_categories]
+        if not known_categories:
+            return 0
+        return get_equipment_category_index(graph, self.equipment_categories).count(known_categories)
+    
     def search_entities(self, graph: nx.Graph, search_terms: List[str], 
                        search_type: str = 'any') -> Set[str]:
         """Search for entities using multiple search terms."""
         if not search_terms:
             return set(graph.nodes())
         
-        result_sets = []
-        
-        for term in search_terms:
-            term_results = self._filter_by_keyword(graph, term)
-            result_sets.append(term_results)
-        
-        # Combine results based on search type
-        if search_type == 'all':
-            # Intersection - entities must match all terms
-            result = result_sets[0]
-            for term_set in result_sets[1:]:
-                result = result.intersection(term_set)
-        else:  # search_type == 'any'
-            # Union - entities can match any term
-            result = set()
-            for term_set in result_sets:
-                result = result.union(term_set)
+        text_index = get_text_index(graph)
+        result_sets = [text_index.substring(str(term)) for term in search_terms]
         
-        return result
+        # Combine results based on search type: 'all' intersects, 'any' unions
+        return combine_node_sets(result_sets, 'AND' if search_type == 'all' else 'OR')
+    
+    def rank_entities(self, graph: nx.Graph, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Rank entities for a free-text query with BM25 and return one page of scored results."""
+        total, ranked = get_text_index(graph).rank(query, limit=limit, offset=offset)
+        
+        results = []
+        for node, score in ranked:
+            data = graph.nodes[node]
+            results.append({
+                'id': node,
+                'label': data.get('label', node),
+                'type': data.get('type', 'unknown'),
+                'score': round(score, 4)
+            })
+        
+        return {'query': query, 'total': total, 'offset': offset, 'limit': limit, 'results': results}
+    
+    def find_similar_names(self, graph: nx.Graph, query: str, limit: int = 10,
+                           max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Find entities whose names are closest to a possibly misspelt or transliterated query."""
+        similar = []
+        for node, distance, name in get_name_index(graph).closest(query, limit=limit, max_distance=max_distance):
+            data = graph.nodes[node]
+            similar.append({
+                'id': node,
+                'label': data.get('label', node),
+                'type': data.get('type', 'unknown'),
+                'matched_name': name,
+                'distance': distance
+            })
+        
+        return similar
+    
+    def suggest_entities(self, graph: nx.Graph, query: str, limit: int = 10) -> List[Dict[str, str]]:
+        """Suggest entities for a search-as-you-type box using prefix matching on all query words."""
+        matches = get_text_index(graph).search(query.split(), operator='AND', prefix=True)
+        
+        suggestions = []
+        for node in sorted(matches)[:limit]:
+            data = graph.nodes[node]
+            suggestions.append({
+                'id': node,
+                'label': data.get('label', node),
+                'type': data.get('type', 'unknown')
+            })
+        
+        return suggestions
     
     def get_filter_suggestions(self, graph: nx.Graph) -> Dict[str, List[str]]:
         """Get suggestions for filter values based on graph content."""
+        facet_index = get_facet_index(graph, self)
+        
         suggestions = {
-            'countries': set(),
-            'types': set(),
-            'years': set(),
-            'manufacturers': set(),
-            'vehicle_types': set(),
-            'organization_types': set(),
-            'area_types': set(),
-            'relationships': set(),
-            'equipment_categories': set()
+            'countries': facet_index.values('countries'),
+            'types': facet_index.values('types'),
+            'years': facet_index.values('years'),
+            'manufacturers': facet_index.values('manufacturers'),
+            'vehicle_types': facet_index.values('vehicle_types'),
+            'organization_types': facet_index.values('organization_types'),
+            'area_types': facet_index.values('area_types'),
+            'relationships': [
+                relationship for relationship in facet_index.values('relationships')
+                if relationship != 'unknown'
+            ],
+            # Every equipment category is offered, even those with no matching nodes
+            'equipment_categories': sorted(self.equipment_categories)
         }
         
-        # Add available equipment categories
-        suggestions['equipment_categories'].update(self.equipment_categories.keys())
-        
-        # Collect unique values from nodes
-        for node, data in graph.nodes(data=True):
-            # Entity types
-            suggestions['types'].add(data.get('type', ''))
-            
-            # Years
-            year = data.get('year')
-            if year:
-                suggestions['years'].add(str(year))
-            
-            # Manufacturers
-            manufacturer = data.get('manufacturer')
-            if manufacturer:
-                suggestions['manufacturers'].add(manufacturer)
-            
-            # Type-specific suggestions
-            entity_type = data.get('type')
-            if entity_type == 'vehicle':
-                vtype = data.get('vehicle_type')
-                if vtype:
-                    suggestions['vehicle_types'].add(vtype)
-            elif entity_type == 'militaryOrganization':
-                org_type = data.get('organization_type')
-                if org_type:
-                    suggestions['organization_types'].add(org_type)
-            elif entity_type == 'area':
-                area_type = data.get('area_type')
-                if area_type:
-                    suggestions['area_types'].add(area_type)
-            elif entity_type == 'country':
-                suggestions['countries'].add(data.get('label', ''))
-        
-        # Collect relationship types from edges
-        for source, target, edge_data in graph.edges(data=True):
-            relationship = edge_data.get('relationship')
-            if relationship:
-                suggestions['relationships'].add(relationship)
-        
-        # Convert sets to sorted lists and clean up
-        return {
-            key: sorted([item for item in values if item])
-            for key, values in suggestions.items()
-        }
+        return suggestions
+    
+    def get_facet_counts(self, graph: nx.Graph, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, int]]:
+        """Count nodes per filter suggestion value, restricted to the nodes matching filters if given."""
+        facet_index = get_facet_index(graph, self)
+        matching_nodes = self.match_nodes(graph, filters) if filters else None
+        
+        counts = facet_index.counts(matching_nodes)
+        counts['relationships'].pop('unknown', None)
+        return counts
     
     def create_advanced_filter(self, graph: nx.Graph, filter_config: Dict) -> nx.Graph:
-        """Create an advanced filter with complex logic."""
+        """Create an advanced filter with complex logic.
+        
+        A config with 'logic' is a (possibly nested) AND/OR/NOT expression, for example
+        {'logic': 'OR', 'conditions': [{'filter': {'type': 'vehicle'}},
+        {'logic': 'NOT', 'conditions': [{'filter': {'keyword': 'uk'}}]}]}.
+        Anything else is treated as a plain filter dict.
+        """
         # Support for complex filter expressions
         if 'logic' in filter_config:
             return self._apply_logical_filter(graph, filter_config)
@@ -551,52 +568,17 @@ class FilterSystem:
             return self.apply_filters(graph, filter_config)
     
     def _apply_logical_filter(self, graph: nx.Graph, filter_config: Dict) -> nx.Graph:
-        """Apply filters with logical operators (AND, OR, NOT)."""
-        logic = filter_config.get('logic', 'AND')
-        conditions = filter_config.get('conditions', [])
-        
-        if not conditions:
-            return graph.copy()
-        
-        result_sets = []
-        
-        for condition in conditions:
-            if 'filter' in condition:
-                filtered_nodes = set()
-                for filter_name, filter_value in condition['filter'].items():
-                    if filter_name in self.available_filters:
-                        filter_func = self.available_filters[filter_name]
-                        nodes = filter_func(graph, filter_value)
-                        if not filtered_nodes:
-                            filtered_nodes = nodes
-                        else:
-                            filtered_nodes = filtered_nodes.intersection(nodes)
-                
-                # Apply NOT if specified
-                if condition.get('not', False):
-                    all_nodes = set(graph.nodes())
-                    filtered_nodes = all_nodes - filtered_nodes
-                
-                result_sets.append(filtered_nodes)
-        
-        # Combine results based on logic
-        if logic == 'AND':
-            final_nodes = result_sets[0] if result_sets else set()
-            for node_set in result_sets[1:]:
-                final_nodes = final_nodes.intersection(node_set)
-        elif logic == 'OR':
-            final_nodes = set()
-            for node_set in result_sets:
-                final_nodes = final_nodes.union(node_set)
-        else:  # Default to AND
-            final_nodes = result_sets[0] if result_sets else set()
-            for node_set in result_sets[1:]:
-                final_nodes = final_nodes.intersection(node_set)
-        
-        return graph.subgraph(final_nodes).copy()
-    
-    def get_equipment_category_info(self) -> Dict[str, Dict[str, Any]]:
-        """Get information about available equipment categories for UI display."""
+        """Apply a nested AND/OR/NOT filter expression and return the filtered subgraph."""
+        if not filter_config.get('conditions'):
+            return self._filtered_copy(graph)
+        
+        return self._filtered_copy(graph, self.expressions.select_nodes(graph, filter_config))
+    
+    def get_equipment_category_info(self, graph: Optional[nx.Graph] = None) -> Dict[str, Dict[str, Any]]:
+        """Get information about available equipment categories for UI display.
+        
+        When a graph is given, each category also reports its node count.
+        """
         category_info = {
             'aircraft_unmanned': {
                 'label': 'Aircraft & Unmanned Systems',
@@ -639,4 +621,10 @@ class FilterSystem:
                 'keywords': self.equipment_categories['geographic']
             }
         }
+        
+        if graph is not None:
+            counts = get_equipment_category_index(graph, self.equipment_categories).counts()
+            for category, info in category_info.items():
+                info['count'] = counts.get(category, 0)
+        
         return category_info
\ No newline at end of file
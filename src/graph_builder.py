@@ -9,6 +9,19 @@ from typing import Dict, List, Set, Tuple, Optional, Any
 from collections import defaultdict
 import re
 
+try:
+    from .graph_index import RelationshipIndex, RELATIONSHIP_INDEX, set_index
+    from .node_types import NODE_TYPES, NodeTypeIndex, NODE_TYPE_INDEX
+    from .equipment_categories import EquipmentCategoryIndex, EQUIPMENT_INDEX
+    from .node_table import NodeTable, NODE_TABLE
+    from .betweenness import BetweennessEstimator
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import RelationshipIndex, RELATIONSHIP_INDEX, set_index
+    from node_types import NODE_TYPES, NodeTypeIndex, NODE_TYPE_INDEX
+    from equipment_categories import EquipmentCategoryIndex, EQUIPMENT_INDEX
+    from node_table import NodeTable, NODE_TABLE
+    from betweenness import BetweennessEstimator
+
 logger = logging.getLogger(__name__)
 
 class GraphBuilder:
@@ -50,6 +63,9 @@ class GraphBuilder:
             'organization': '#FECA57',      # Yellow
             'organizations': '#FECA57'      # Yellow (alias)
         }
+        
+        # Sampled betweenness for connectivity analysis
+        self.betweenness_estimator = BetweennessEstimator(top_n=10)
     
     def build_graph(self, database: Dict, include_metadata: bool = True) -> nx.Graph:
         """Build a NetworkX graph from a database."""
@@ -87,16 +103,30 @@ class GraphBuilder:
         if include_metadata:
             self._add_graph_metadata(graph, database)
         
+        # Index edges by relationship type, nodes by type code and equipment category
+        set_index(graph, RELATIONSHIP_INDEX, RelationshipIndex.from_graph(graph))
+        set_index(graph, NODE_TYPE_INDEX, NodeTypeIndex.from_graph(graph))
+        set_index(graph, EQUIPMENT_INDEX, EquipmentCategoryIndex.from_graph(graph))
+        
+        # Columnar node table for vectorised statistics
+        set_index(graph, NODE_TABLE, NodeTable.from_graph(graph))
+        
         logger.info(f"Built graph with {len(graph.nodes)} nodes and {len(graph.edges)} edges")
         return graph
     
     def _add_node(self, graph: nx.Graph, node_id: str, entity: Dict, entity_type: str, include_metadata: bool):
         """Add a node to the graph with appropriate attributes."""
+        graph.add_node(node_id, **self.node_attributes(entity, entity_type, include_metadata))
+    
+    def node_attributes(self, entity: Dict, entity_type: str, include_metadata: bool = True) -> Dict[str, Any]:
+        """Build the attributes a node gets for an entity."""
         # Basic attributes
+        type_code = NODE_TYPES.code(entity_type)
         attributes = {
             'type': entity_type,
+            'type_code': type_code,
             'label': self._extract_primary_name(entity),
-            'color': self.node_colors.get(entity_type, '#808080')
+            'color': self.node_colors.get(NODE_TYPES.name(type_code), '#808080')
         }
         
         # Add key entity information
@@ -106,7 +136,7 @@ class GraphBuilder:
         # Add searchable attributes
         attributes.update(self._extract_searchable_attributes(entity, entity_type))
         
-        graph.add_node(node_id, **attributes)
+        return attributes
     
     def _extract_primary_name(self, entity: Dict) -> str:
         """Extract the primary name from an entity."""
@@ -134,6 +164,7 @@ class GraphBuilder:
     def _extract_searchable_attributes(self, entity: Dict, entity_type: str) -> Dict:
         """Extract attributes that can be used for searching and filtering."""
         attributes = {}
+        node_type = NODE_TYPES.canonical(entity_type)
         
         # Common attributes
         if 'year' in entity:
@@ -150,19 +181,19 @@ class GraphBuilder:
             attributes['nationality'] = entity['nationality']
         
         # Type-specific attributes
-        if entity_type == 'vehicle':
+        if node_type == 'vehicle':
             if 'vehicleType' in entity:
                 attributes['vehicle_type'] = entity['vehicleType']
             if 'fuelType' in entity:
                 attributes['fuel_type'] = entity['fuelType']
         
-        elif entity_type in ['person', 'people']:
+        elif node_type == 'person':
             if 'personTypes' in entity:
                 attributes['person_types'] = entity['personTypes']
             if 'birthDate' in entity:
                 attributes['birth_date'] = entity['birthDate']
         
-        elif entity_type in ['militaryOrganization', 'militaryUnit']:
+        elif node_type in ['militaryOrganization', 'militaryUnit']:
             if 'organizationType' in entity:
                 attributes['organization_type'] = entity['organizationType']
             if 'unitType' in entity:
@@ -170,13 +201,13 @@ class GraphBuilder:
             if 'personnelStrength' in entity:
                 attributes['personnel_strength'] = entity['personnelStrength']
         
-        elif entity_type == 'area':
+        elif node_type == 'area':
             if 'areaType' in entity:
                 attributes['area_type'] = entity['areaType']
             if 'administrativeLevel' in entity:
                 attributes['admin_level'] = entity['administrativeLevel']
         
-        elif entity_type in ['aircraft']:
+        elif node_type == 'aircraft':
             if 'aircraftType' in entity:
                 attributes['aircraft_type'] = entity['aircraftType']
             if 'manufacturer' in entity:
@@ -184,7 +215,7 @@ class GraphBuilder:
             if 'operator' in entity:
                 attributes['operator'] = entity['operator']
         
-        elif entity_type in ['weapon', 'weapons']:
+        elif node_type == 'weapon':
             if 'weaponType' in entity:
                 attributes['weapon_type'] = entity['weaponType']
             if 'caliber' in entity:
@@ -448,7 +479,7 @@ class GraphBuilder:
         # Centrality measures for top nodes
         if len(graph.nodes) > 0:
             degree_centrality = nx.degree_centrality(graph)
-            betweenness_centrality = nx.betweenness_centrality(graph, k=min(100, len(graph.nodes)))
+            betweenness_centrality, sampling = self.betweenness_estimator.compute(graph)
             
             # Top nodes by centrality
             top_degree = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -456,5 +487,6 @@ class GraphBuilder:
             
             analysis['top_degree_centrality'] = top_degree
             analysis['top_betweenness_centrality'] = top_betweenness
+            analysis['betweenness_sampling'] = sampling
         
         return analysis
\ No newline at end of file
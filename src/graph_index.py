@@ -0,0 +1,226 @@
+"""
+Graph Index for IES4 Military Database Analysis Suite
+Maintains secondary indexes over NetworkX graphs so that filters, statistics
+and visualizations can avoid repeated full node and edge scans.
+"""
+
+import networkx as nx
+import logging
+import weakref
+from itertools import count
+from typing import Dict, List, Set, Tuple, Any, Callable, Iterable, Optional
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+RELATIONSHIP_INDEX = 'relationship_index'
+
+# Per-graph index storage. Keyed weakly so indexes are released with their graph
+# and never leak into copies made with graph.subgraph(...).copy().
+_graph_caches = weakref.WeakKeyDictionary()
+
+# Unique token per graph object. Unlike id(graph), tokens are never reused after
+# a graph is garbage collected, so they are safe to use in long-lived cache keys.
+_graph_tokens = weakref.WeakKeyDictionary()
+_token_counter = count(1)
+
+
+class GraphChangeSet:
+    """Nodes and edges that were added to or removed from a graph in place.
+
+    Added nodes and edges are read from the graph, so a change set is applied
+    after the graph has been edited. Removed nodes take their edges with them.
+    """
+
+    def __init__(self, added_nodes: Iterable[str] = (), removed_nodes: Iterable[str] = (),
+                 added_edges: Iterable[Tuple[str, str]] = (), removed_edges: Iterable[Tuple[str, str]] = ()):
+        """Initialize the change set."""
+        self.added_nodes = list(added_nodes)
+        self.removed_nodes = list(removed_nodes)
+        self.added_edges = list(added_edges)
+        self.removed_edges = list(removed_edges)
+
+    def __bool__(self) -> bool:
+        """Check whether the change set changes anything."""
+        return bool(self.added_nodes or self.removed_nodes or self.added_edges or self.removed_edges)
+
+    def __repr__(self) -> str:
+        return (f"GraphChangeSet(+{len(self.added_nodes)}/-{len(self.removed_nodes)} nodes, "
+                f"+{len(self.added_edges)}/-{len(self.removed_edges)} edges)")
+
+
+def graph_version(graph: nx.Graph) -> Tuple[int, int]:
+    """Return a cheap token identifying the current state of a graph.
+
+    Changing the number of nodes changes the token automatically. Counting
+    edges is O(N) in NetworkX, so code that edits edges in place, or adds and
+    removes the same number of nodes, must call mark_graph_changed() afterwards.
+    """
+    return (graph.graph.get('version', 0), len(graph))
+
+
+def graph_key(graph: nx.Graph) -> Tuple[int, int, int]:
+    """Return a key identifying both a graph object and its current state."""
+    token = _graph_tokens.get(graph)
+    if token is None:
+        token = next(_token_counter)
+        _graph_tokens[graph] = token
+    return (token,) + graph_version(graph)
+
+
+def mark_graph_changed(graph: nx.Graph):
+    """Invalidate all indexes for a graph after an in-place modification."""
+    graph.graph['version'] = graph.graph.get('version', 0) + 1
+
+
+def get_graph_cache(graph: nx.Graph) -> Dict[str, Any]:
+    """Get the index cache for a graph, discarding it if the graph has changed."""
+    version = graph_version(graph)
+    entry = _graph_caches.get(graph)
+
+    if entry is None or entry['version'] != version:
+        entry = {'version': version, 'indexes': {}}
+        _graph_caches[graph] = entry
+
+    return entry['indexes']
+
+
+def get_index(graph: nx.Graph, name: str, factory: Callable[[nx.Graph], Any]) -> Any:
+    """Get a named index for a graph, building it with factory on first use."""
+    cache = get_graph_cache(graph)
+
+    index = cache.get(name)
+    if index is None:
+        logger.debug(f"Building {name} for graph with {graph.number_of_nodes()} nodes")
+        index = factory(graph)
+        cache[name] = index
+
+    return index
+
+
+def set_index(graph: nx.Graph, name: str, index: Any):
+    """Register a prebuilt index for the current version of a graph."""
+    get_graph_cache(graph)[name] = index
+
+
+class RelationshipIndex:
+    """Relationship-type to edge-list index with per-node, per-relationship adjacency."""
+
+    def __init__(self):
+        """Initialize an empty relationship index."""
+        # relationship -> {edge key: (source, target)} in insertion order
+        self._edges = defaultdict(dict)
+        # node -> relationship -> set of neighbours
+        self._adjacency = defaultdict(lambda: defaultdict(set))
+        # relationship -> {node: number of incident edges}
+        self._incident = defaultdict(dict)
+        # edge key -> relationship
+        self._edge_types = {}
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'RelationshipIndex':
+        """Build an index from the relationship attribute of every edge."""
+        index = cls()
+        for source, target, relationship in graph.edges(data='relationship', default='unknown'):
+            index.add_edge(source, target, relationship)
+        return index
+
+    def add_edge(self, source: str, target: str, relationship: str):
+        """Add an edge, replacing any relationship previously recorded for it."""
+        key = frozenset((source, target))
+        previous = self._edge_types.get(key)
+
+        if previous == relationship:
+            return
+        if previous is not None:
+            self.remove_edge(source, target)
+
+        self._edge_types[key] = relationship
+        self._edges[relationship][key] = (source, target)
+        self._adjacency[source][relationship].add(target)
+        self._adjacency[target][relationship].add(source)
+
+        incident = self._incident[relationship]
+        for node in (source, target):
+            incident[node] = incident.get(node, 0) + 1
+
+    def remove_edge(self, source: str, target: str):
+        """Remove an edge from the index if present."""
+        key = frozenset((source, target))
+        relationship = self._edge_types.pop(key, None)
+        if relationship is None:
+            return
+
+        del self._edges[relationship][key]
+        if not self._edges[relationship]:
+            del self._edges[relationship]
+
+        incident = self._incident[relationship]
+        for node, other in ((source, target), (target, source)):
+            node_adjacency = self._adjacency.get(node)
+            if node_adjacency is not None and relationship in node_adjacency:
+                node_adjacency[relationship].discard(other)
+                if not node_adjacency[relationship]:
+                    del node_adjacency[relationship]
+                if not node_adjacency:
+                    del self._adjacency[node]
+
+            incident[node] -= 1
+            if incident[node] == 0:
+                del incident[node]
+
+        if not incident:
+            del self._incident[relationship]
+
+    def remove_node(self, node: str):
+        """Remove a node and all of its indexed edges."""
+        for neighbours in list(self._adjacency.get(node, {}).values()):
+            for neighbour in list(neighbours):
+                self.remove_edge(node, neighbour)
+
+    def relationship_types(self) -> List[str]:
+        """Get all relationship types present in the index."""
+        return list(self._edges.keys())
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of edges for each relationship type."""
+        return {relationship: len(edges) for relationship, edges in self._edges.items()}
+
+    def edges(self, relationship: str) -> List[Tuple[str, str]]:
+        """Get all edges with the given relationship type."""
+        return list(self._edges.get(relationship, {}).values())
+
+    def edge_groups(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Get edges grouped by relationship type."""
+        return {relationship: list(edges.values()) for relationship, edges in self._edges.items()}
+
+    def nodes(self, relationship: str) -> Set[str]:
+        """Get all nodes incident to at least one edge of the given relationship type."""
+        return set(self._incident.get(relationship, {}))
+
+    def node_count(self, relationship: str) -> int:
+        """Count the nodes incident to at least one edge of the given relationship type."""
+        return len(self._incident.get(relationship, ()))
+
+    def neighbors(self, node: str, relationship: Optional[str] = None) -> Set[str]:
+        """Get the neighbours of a node, optionally restricted to one relationship type."""
+        node_adjacency = self._adjacency.get(node)
+        if not node_adjacency:
+            return set()
+
+        if relationship is not None:
+            return set(node_adjacency.get(relationship, ()))
+
+        neighbours = set()
+        for targets in node_adjacency.values():
+            neighbours.update(targets)
+        return neighbours
+
+    def relationship_of(self, source: str, target: str) -> Optional[str]:
+        """Get the relationship type recorded for an edge."""
+        return self._edge_types.get(frozenset((source, target)))
+
+
+def get_relationship_index(graph: nx.Graph) -> RelationshipIndex:
+    """Get the relationship index for a graph, building it if needed."""
+    return get_index(graph, RELATIONSHIP_INDEX, RelationshipIndex.from_graph)
@@ -0,0 +1,372 @@
+"""
+Incremental Statistics for IES4 Military Database Analysis Suite
+Statistics accumulators updated from graph change sets instead of being
+recomputed, with whole-graph sections cached and marked stale by changes.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+import weakref
+from collections import Counter
+from typing import Dict, List, Tuple, Iterable, Callable, Optional, Any
+
+try:
+    from .graph_index import GraphChangeSet, graph_version, mark_graph_changed
+    from .node_types import NODE_TYPES, ORGANIZATION_TYPES
+    from .facet_index import apply_facet_changes
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import GraphChangeSet, graph_version, mark_graph_changed
+    from node_types import NODE_TYPES, ORGANIZATION_TYPES
+    from facet_index import apply_facet_changes
+
+logger = logging.getLogger(__name__)
+
+# Entity breakdowns kept as accumulators: section -> (node types, {breakdown: node attribute})
+BREAKDOWNS = {
+    'vehicles': (('vehicle',), {'by_type': 'vehicle_type', 'by_country': 'owner', 'by_manufacturer': 'manufacturer'}),
+    'organizations': (ORGANIZATION_TYPES, {'by_type': 'organization_type', 'by_country': 'country'}),
+    'people': (('person',), {'by_nationality': 'nationality'}),
+    'areas': (('area',), {'by_type': 'area_type', 'by_country': 'country'})
+}
+
+# Incremental statistics are kept across graph versions and brought up to date by change sets or sync()
+_incremental_statistics = weakref.WeakKeyDictionary()
+
+
+class UnionFind:
+    """Disjoint sets with union by size and path halving."""
+
+    def __init__(self):
+        """Initialize an empty forest."""
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item: Any):
+        """Add an item as a singleton set if it is not already present."""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: Any) -> Any:
+        """Get the root of an item's set."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: Any, b: Any) -> bool:
+        """Merge the sets of two items; returns False if they were already together."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+        return True
+
+
+class IncrementalStatistics:
+    """Per-graph statistics maintained from change sets.
+
+    Node and edge counts, node type counts, entity breakdowns, the degree
+    distribution and edge relationship counts are updated exactly in
+    O(change). Components come from a union-find that absorbs added nodes
+    and edges; removals cannot split a union-find, so it is rebuilt the next
+    time components are needed. Sections that need the whole graph are
+    cached with cached() and marked stale by every change.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        # node -> (type name, {breakdown section: {breakdown: value}})
+        self.records = {}
+        # edge key -> (source, target, relationship, weight), and per-node neighbours for node removal
+        self.edges = {}
+        self.neighbors = {}
+        self.degrees = {}
+        # Insertion-ordered set of nodes without edges
+        self.isolated = {}
+
+        self.node_types = Counter()
+        self.degree_distribution = Counter()
+        self.relationship_types = Counter()
+        self.edge_weights = Counter()
+        self.breakdowns = {section: {breakdown: Counter() for breakdown in fields}
+                           for section, (_, fields) in BREAKDOWNS.items()}
+        self.breakdown_totals = Counter({section: 0 for section in BREAKDOWNS})
+        self.breakdown_codes = {section: set(NODE_TYPES.codes(types)) for section, (types, _) in BREAKDOWNS.items()}
+
+        self.components = UnionFind()
+        self.components_valid = True
+        self._component_sizes = None
+
+        # Whole-graph sections computed on demand: name -> value, and the names changes made stale
+        self.cache = {}
+        self.stale = set()
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'IncrementalStatistics':
+        """Build statistics for every node and edge of a graph."""
+        statistics = cls()
+        statistics.apply(graph, GraphChangeSet(added_nodes=graph.nodes, added_edges=graph.edges))
+        return statistics
+
+    def apply(self, graph: nx.Graph, changes: GraphChangeSet):
+        """Update the statistics with a change set already made to the graph."""
+        for source, target in changes.removed_edges:
+            self._remove_edge(source, target)
+        for node in changes.removed_nodes:
+            self._remove_node(node)
+        for node in changes.added_nodes:
+            self._add_node(graph, node)
+        for source, target in changes.added_edges:
+            self._add_edge(graph, source, target)
+
+        if changes:
+            self._component_sizes = None
+            self.stale.update(self.cache)
+        logger.debug(f"Applied {changes}; stale sections: {sorted(self.stale)}")
+
+    def sync(self, graph: nx.Graph):
+        """Bring the statistics up to date with a graph edited without a change set.
+
+        Nodes and edges are compared by membership in O(N + E); attribute
+        edits of existing nodes are not detected.
+        """
+        changes = GraphChangeSet(
+            added_nodes=[node for node in graph.nodes if node not in self.records],
+            removed_nodes=[node for node in self.records if node not in graph],
+            added_edges=[(u, v) for u, v in graph.edges if frozenset((u, v)) not in self.edges],
+            removed_edges=[(u, v) for u, v, _, _ in self.edges.values() if not graph.has_edge(u, v)]
+        )
+        self.apply(graph, changes)
+
+    def _add_node(self, graph: nx.Graph, node: str):
+        """Count a node, replacing its previous record if it was already counted."""
+        if node in self.records:
+            self._uncount_node(node)
+        else:
+            self.degrees[node] = 0
+            self.neighbors[node] = set()
+            self.degree_distribution[0] += 1
+            self.isolated[node] = None
+            self.components.add(node)
+
+        data = graph.nodes[node]
+        type_code = data.get('type_code')
+        if type_code is None:
+            type_code = NODE_TYPES.lookup(data.get('type'), NODE_TYPES.UNKNOWN)
+
+        node_type = data.get('type')
+        node_type = 'unknown' if node_type is None else node_type
+        breakdowns = {}
+        for section, (_, fields) in BREAKDOWNS.items():
+            if type_code in self.breakdown_codes[section]:
+                breakdowns[section] = {breakdown: self._value(data.get(attribute))
+                                       for breakdown, attribute in fields.items()}
+
+        self.records[node] = (node_type, breakdowns)
+        self.node_types[node_type] += 1
+        for section, values in breakdowns.items():
+            self.breakdown_totals[section] += 1
+            for breakdown, value in values.items():
+                self.breakdowns[section][breakdown][value] += 1
+
+    def _remove_node(self, node: str):
+        """Remove a node and its edges."""
+        if node not in self.records:
+            return
+        for neighbor in list(self.neighbors[node]):
+            self._remove_edge(node, neighbor)
+
+        self._uncount_node(node)
+        del self.records[node]
+        del self.neighbors[node]
+        self._decrement(self.degree_distribution, self.degrees.pop(node))
+        self.isolated.pop(node, None)
+        self.components_valid = False
+
+    def _uncount_node(self, node: str):
+        """Remove a node's type and breakdown values from the counters."""
+        node_type, breakdowns = self.records[node]
+        self._decrement(self.node_types, node_type)
+        for section, values in breakdowns.items():
+            self.breakdown_totals[section] -= 1
+            for breakdown, value in values.items():
+                self._decrement(self.breakdowns[section][breakdown], value)
+
+    def _add_edge(self, graph: nx.Graph, source: str, target: str):
+        """Count an edge of the graph between two counted nodes."""
+        key = frozenset((source, target))
+        if key in self.edges:
+            return
+
+        data = graph.edges[source, target]
+        relationship = data.get('relationship', 'unknown')
+        weight = data.get('weight', 1)
+        self.edges[key] = (source, target, relationship, weight)
+        self.relationship_types[relationship] += 1
+        self.edge_weights[weight] += 1
+
+        self.neighbors[source].add(target)
+        self.neighbors[target].add(source)
+        self._change_degree(source, 1)
+        self._change_degree(target, 1)
+        if self.components_valid:
+            self.components.union(source, target)
+
+    def _remove_edge(self, source: str, target: str):
+        """Remove a counted edge."""
+        key = frozenset((source, target))
+        if key not in self.edges:
+            return
+
+        _, _, relationship, weight = self.edges.pop(key)
+        self._decrement(self.relationship_types, relationship)
+        self._decrement(self.edge_weights, weight)
+
+        self.neighbors[source].discard(target)
+        self.neighbors[target].discard(source)
+        self._change_degree(source, -1)
+        self._change_degree(target, -1)
+        self.components_valid = False
+
+    def _change_degree(self, node: str, delta: int):
+        """Move a node to another degree bucket."""
+        degree = self.degrees[node]
+        self._decrement(self.degree_distribution, degree)
+        self.degrees[node] = degree + delta
+        self.degree_distribution[degree + delta] += 1
+
+        if degree + delta == 0:
+            self.isolated[node] = None
+        else:
+            self.isolated.pop(node, None)
+
+    @staticmethod
+    def _decrement(counter: Counter, key: Any):
+        """Decrement a count, dropping keys that reach zero."""
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        """Get a breakdown key, counting missing values as 'unknown'."""
+        return 'unknown' if value is None else value
+
+    def cached(self, name: str, compute: Callable[[], Any], refresh: bool = True) -> Any:
+        """Get a whole-graph section, computing it if missing, or if stale and refresh is set."""
+        if name not in self.cache or (refresh and name in self.stale):
+            self.cache[name] = compute()
+            self.stale.discard(name)
+        return self.cache[name]
+
+    def entity_counts(self) -> Dict[str, int]:
+        """Count nodes by type."""
+        return dict(self.node_types)
+
+    def node_statistics(self) -> Dict[str, Any]:
+        """Get node type counts and the degree distribution with summary statistics."""
+        distribution = Counter(dict(sorted(self.degree_distribution.items())))
+        node_stats = {
+            'total_nodes': len(self.records),
+            'node_types': Counter(self.node_types),
+            'degree_distribution': distribution,
+            'isolated_nodes': list(self.isolated)
+        }
+
+        if distribution:
+            degrees = np.fromiter(distribution.keys(), dtype=float)
+            counts = np.fromiter(distribution.values(), dtype=float)
+            mean = np.average(degrees, weights=counts)
+
+            # Median from the cumulative counts of the sorted degrees
+            total = int(counts.sum())
+            cumulative = np.cumsum(counts)
+            lower = degrees[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+            upper = degrees[np.searchsorted(cumulative, total // 2, side='right')]
+
+            node_stats['degree_stats'] = {
+                'mean': mean,
+                'median': (lower + upper) / 2,
+                'std': np.sqrt(np.average((degrees - mean) ** 2, weights=counts)),
+                'min': int(degrees[0]),
+                'max': int(degrees[-1])
+            }
+
+        return node_stats
+
+    def edge_statistics(self) -> Dict[str, Any]:
+        """Get edge counts by relationship type and weight."""
+        return {
+            'total_edges': len(self.edges),
+            'relationship_types': Counter(self.relationship_types),
+            'edge_weight_distribution': Counter(self.edge_weights)
+        }
+
+    def breakdown_sections(self) -> Dict[str, Dict[str, Any]]:
+        """Get the total count and breakdowns of each entity section."""
+        return {
+            section: {'total_count': self.breakdown_totals[section],
+                      **{breakdown: Counter(counts) for breakdown, counts in breakdowns.items()}}
+            for section, breakdowns in self.breakdowns.items()
+        }
+
+    def density(self) -> float:
+        """Get the edge density of the (undirected) graph."""
+        n = len(self.records)
+        if n <= 1:
+            return 0.0
+        return len(self.edges) / (n * (n - 1)) * 2
+
+    def component_sizes(self, graph: nx.Graph) -> List[int]:
+        """Get the connected component sizes, ordered like nx.connected_components."""
+        if not self.components_valid:
+            # Removals split components, which a union-find cannot undo
+            self.components = UnionFind()
+            for node in graph.nodes:
+                self.components.add(node)
+            for source, target in graph.edges:
+                self.components.union(source, target)
+            self.components_valid = True
+            self._component_sizes = None
+
+        if self._component_sizes is None:
+            sizes = {}
+            for node in graph.nodes:
+                root = self.components.find(node)
+                if root not in sizes:
+                    sizes[root] = self.components.size[root]
+            self._component_sizes = list(sizes.values())
+        return self._component_sizes
+
+
+def get_incremental_statistics(graph: nx.Graph) -> IncrementalStatistics:
+    """Get the incremental statistics for a graph, syncing them if the graph changed without a change set."""
+    version = graph_version(graph)
+    entry = _incremental_statistics.get(graph)
+
+    if entry is None:
+        entry = {'version': version, 'statistics': IncrementalStatistics.from_graph(graph)}
+        _incremental_statistics[graph] = entry
+    elif entry['version'] != version:
+        entry['statistics'].sync(graph)
+        entry['version'] = version
+
+    return entry['statistics']
+
+
+def apply_graph_changes(graph: nx.Graph, changes: GraphChangeSet):
+    """Record a change set already made to a graph: invalidate its indexes and update its statistics and facets."""
+    entry = _incremental_statistics.get(graph)
+    if entry is not None:
+        entry['statistics'].apply(graph, changes)
+
+    mark_graph_changed(graph)
+    if entry is not None:
+        entry['version'] = graph_version(graph)
+    apply_facet_changes(graph, changes)
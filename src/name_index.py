@@ -0,0 +1,252 @@
+"""
+Name Index for IES4 Military Database Analysis Suite
+Fuzzy matching of multilingual entity names with transliteration and a BK-tree.
+"""
+
+import networkx as nx
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple, Optional
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+NAME_INDEX = 'name_index'
+
+# Cyrillic (Ukrainian and Russian) to Latin; 'г' is handled separately because
+# Ukrainian romanises it as 'h' and Russian as 'g'
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'ґ': 'g', 'д': 'd', 'е': 'e', 'є': 'ye', 'ё': 'yo',
+    'ж': 'zh', 'з': 'z', 'и': 'y', 'і': 'i', 'ї': 'yi', 'й': 'i', 'к': 'k', 'л': 'l',
+    'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ъ': '', 'ы': 'y',
+    'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya'
+}
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9]+')
+
+# Words shorter than this are too ambiguous to be matched on their own
+MIN_WORD_LENGTH = 3
+
+
+def normalize_name(text: str) -> List[str]:
+    """Normalise a name to lowercase ASCII words, returning every transliteration variant."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+
+    variants = []
+    for g_letter in ('h', 'g') if 'г' in text else ('h',):
+        latin = ''.join(CYRILLIC_TO_LATIN.get(char, g_letter if char == 'г' else char) for char in text)
+        normalized = NON_ALPHANUMERIC.sub(' ', latin).strip()
+        if normalized and normalized not in variants:
+            variants.append(normalized)
+    return variants
+
+
+def pattern_masks(pattern: str) -> Dict[str, int]:
+    """Get the per-character position bitmasks of a pattern for bit-parallel edit distance."""
+    masks = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def pattern_distance(pattern: str, masks: Dict[str, int], text: str) -> int:
+    """Levenshtein distance from a pattern (with precomputed masks) to text.
+
+    Uses Myers' bit-parallel algorithm, which processes one text character
+    per step with a handful of integer operations instead of a DP row.
+    """
+    length = len(pattern)
+    if not length:
+        return len(text)
+    if not text:
+        return length
+
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = full, 0, length
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        plus = (negative | ~(horizontal | positive)) & full
+        minus = positive & horizontal
+        if plus & last:
+            score += 1
+        elif minus & last:
+            score -= 1
+        plus = ((plus << 1) | 1) & full
+        minus = (minus << 1) & full
+        positive = (minus | ~(vertical | plus)) & full
+        negative = plus & vertical
+    return score
+
+
+def edit_distance(first: str, second: str) -> int:
+    """Levenshtein distance between two strings."""
+    return pattern_distance(first, pattern_masks(first), second)
+
+
+def default_max_distance(query: str) -> int:
+    """Pick an edit distance tolerance that grows with the query length."""
+    length = len(query)
+    if length <= 3:
+        return 0
+    if length <= 6:
+        return 1
+    return 2
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings for edit-distance range queries."""
+
+    def __init__(self):
+        """Initialize an empty tree."""
+        self._root = None  # (key, {distance: child})
+        self._size = 0
+
+    def add(self, key: str):
+        """Add a key to the tree, ignoring duplicates."""
+        if self._root is None:
+            self._root = (key, {})
+            self._size = 1
+            return
+
+        masks = pattern_masks(key)
+        node = self._root
+        while True:
+            distance = pattern_distance(key, masks, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (key, {})
+                self._size += 1
+                return
+            node = child
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Get (distance, key) pairs for keys within max_distance of query.
+
+        The triangle inequality limits each step to children whose edge
+        distance lies within max_distance of the current node's distance,
+        so only a fraction of the keys are compared.
+        """
+        if self._root is None:
+            return []
+
+        masks = pattern_masks(query)
+        matches = []
+        stack = [self._root]
+        while stack:
+            key, children = stack.pop()
+            distance = pattern_distance(query, masks, key)
+            if distance <= max_distance:
+                matches.append((distance, key))
+
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for edge, child in children.items() if low <= edge <= high)
+        return matches
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class NameIndex:
+    """Fuzzy index over normalised, transliterated entity names and their individual words."""
+
+    def __init__(self):
+        """Initialize an empty name index."""
+        self.tree = BKTree()
+        self.key_nodes = defaultdict(set)  # normalised name or word -> nodes
+        self.key_names = {}                # normalised name or word -> an original name it came from
+        self.length_counts = defaultdict(int)  # key length -> total nodes of the keys of that length
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'NameIndex':
+        """Index the label, names and identifiers of every node in a graph."""
+        index = cls()
+        for node, data in graph.nodes(data=True):
+            for name in cls.extract_names(data):
+                index.add_name(node, name)
+
+        logger.debug(f"Indexed {len(index.key_nodes)} name keys in a BK-tree")
+        return index
+
+    @staticmethod
+    def extract_names(data: Dict) -> List[str]:
+        """Collect the names of a node: label, names and identifier values."""
+        names = [data['label']] if data.get('label') else []
+
+        entity_data = data.get('data', {})
+        for field in ('names', 'identifiers'):
+            for name_obj in entity_data.get(field, []):
+                if isinstance(name_obj, dict) and name_obj.get('value'):
+                    names.append(str(name_obj['value']))
+        return names
+
+    def add_name(self, node: str, name: str):
+        """Index a name as a whole and word by word, under every transliteration."""
+        for normalized in normalize_name(name):
+            words = normalized.split()
+            # The whole name, its words and the name without spaces, so "t 90" also matches "t90a"
+            keys = {normalized, ''.join(words)}
+            keys.update(word for word in words if len(word) >= MIN_WORD_LENGTH)
+
+            for key in keys:
+                if key not in self.key_nodes:
+                    self.tree.add(key)
+                    self.key_names[key] = name
+                if node not in self.key_nodes[key]:
+                    self.key_nodes[key].add(node)
+                    self.length_counts[len(key)] += 1
+
+    def closest(self, query: str, limit: int = 10,
+                max_distance: Optional[int] = None) -> List[Tuple[str, int, str]]:
+        """Get up to limit (node, distance, matched name) triples, closest first."""
+        best = {}
+        for variant in normalize_name(query):
+            distance_limit = default_max_distance(variant) if max_distance is None else max_distance
+            for distance, key in self.tree.search(variant, distance_limit):
+                for node in self.key_nodes[key]:
+                    if node not in best or distance < best[node][0]:
+                        best[node] = (distance, self.key_names[key])
+
+        ranked = sorted(best.items(), key=lambda item: (item[1][0], item[0]))
+        return [(node, distance, name) for node, (distance, name) in ranked[:limit]]
+
+    def matches(self, query: str, max_distance: Optional[int] = None) -> Set[str]:
+        """Get every node with a name or name word within max_distance of query."""
+        nodes = set()
+        for variant in normalize_name(query):
+            distance_limit = default_max_distance(variant) if max_distance is None else max_distance
+            for _, key in self.tree.search(variant, distance_limit):
+                nodes |= self.key_nodes[key]
+        return nodes
+
+
+    def estimate(self, query: str, max_distance: Optional[int] = None) -> int:
+        """Bound the matches of a query without searching the tree.
+
+        Keys within edit distance d of a query differ from it in length by at
+        most d, so the nodes of keys in that length range are counted; nodes
+        with several such keys are counted once per key.
+        """
+        total = 0
+        for variant in normalize_name(query):
+            distance_limit = default_max_distance(variant) if max_distance is None else max_distance
+            total += sum(self.length_counts.get(length, 0)
+                         for length in range(max(0, len(variant) - distance_limit), len(variant) + distance_limit + 1))
+        return total
+
+
+def get_name_index(graph: nx.Graph) -> NameIndex:
+    """Get the fuzzy name index for a graph, building it if needed."""
+    return get_index(graph, NAME_INDEX, NameIndex.from_graph)
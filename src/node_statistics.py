@@ -0,0 +1,301 @@
+"""
+Node Statistics for IES4 Military Database Analysis Suite
+Node statistics sections, each computed with vectorised group-bys over the
+columnar node table.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict, Counter
+from datetime import datetime
+from functools import partial
+from typing import Dict, Iterable, Optional, Type, Any
+
+try:
+    from .graph_index import get_relationship_index
+    from .node_types import ORGANIZATION_TYPES
+    from .node_table import NodeTable, get_node_table, truthy, value_counts
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_relationship_index
+    from node_types import ORGANIZATION_TYPES
+    from node_table import NodeTable, get_node_table, truthy, value_counts
+
+logger = logging.getLogger(__name__)
+
+
+class TableSection(ABC):
+    """One statistics section, computed with vectorised group-bys over the graph's node table.
+
+    Subclasses set node_types to the (canonical or alias) types whose rows
+    they need, or leave it as None to get every row.
+    """
+
+    node_types: Optional[Iterable[str]] = None
+
+    def __init__(self, graph: nx.Graph):
+        """Initialize the section for a graph."""
+        self.graph = graph
+
+    @abstractmethod
+    def compute(self, table: NodeTable) -> Any:
+        """Compute the section from the node table."""
+
+
+def decade_labels(years: pd.Series) -> pd.Series:
+    """Label numeric years with their decade, e.g. 1987 -> '1980s'."""
+    return ((years // 10) * 10).astype(str) + 's'
+
+
+def numeric_years(years: pd.Series) -> pd.Series:
+    """Get the truthy year values as numbers."""
+    return pd.to_numeric(years[truthy(years)], errors='coerce').dropna()
+
+
+class NodeSummarySection(TableSection):
+    """Node type counts and degree distribution."""
+
+    def compute(self, table: NodeTable) -> Dict:
+        frame = table.frame
+        degrees = frame['degree'].to_numpy()
+        node_stats = {
+            'total_nodes': len(self.graph.nodes),
+            'node_types': value_counts(frame['type'], 'unknown'),
+            'degree_distribution': table.degree_distribution(),
+            'isolated_nodes': frame['id'][degrees == 0].tolist()
+        }
+
+        if len(degrees):
+            node_stats['degree_stats'] = {
+                'mean': np.mean(degrees),
+                'median': np.median(degrees),
+                'std': np.std(degrees),
+                'min': int(degrees.min()),
+                'max': int(degrees.max())
+            }
+
+        return node_stats
+
+
+class EntityCountSection(TableSection):
+    """Entity counts by type."""
+
+    def compute(self, table: NodeTable) -> Dict[str, int]:
+        return dict(value_counts(table.frame['type'], 'unknown'))
+
+
+class CountrySection(TableSection):
+    """Assets owned by each country."""
+
+    node_types = ('country',)
+
+    def compute(self, table: NodeTable) -> Dict:
+        countries = table.rows(self.node_types)
+        relationship_index = get_relationship_index(self.graph)
+        nodes = self.graph.nodes
+
+        result = {}
+        for node, degree in zip(countries['id'], countries['degree']):
+            owned = relationship_index.neighbors(node, 'owner') | relationship_index.neighbors(node, 'owned_by')
+            result[nodes[node].get('label', node)] = {
+                'total_assets': len(owned),
+                'asset_types': dict(Counter(nodes[neighbor].get('type', 'unknown') for neighbor in owned)),
+                'connections': int(degree)
+            }
+        return result
+
+
+class VehicleSection(TableSection):
+    """Vehicle counts by type, owner, manufacturer, decade and age."""
+
+    node_types = ('vehicle',)
+
+    def compute(self, table: NodeTable) -> Dict:
+        vehicles = table.rows(self.node_types)
+        years = numeric_years(vehicles['year'])
+
+        # Age groups of ten years, e.g. '30-39 years'
+        age_groups = ((datetime.now().year - years) // 10) * 10
+        age_labels = age_groups.astype(str) + '-' + (age_groups + 9).astype(str) + ' years'
+
+        return {
+            'total_count': len(vehicles),
+            'by_type': value_counts(vehicles['vehicle_type'], 'unknown'),
+            'by_country': value_counts(vehicles['owner'], 'unknown'),
+            'by_manufacturer': value_counts(vehicles['manufacturer'], 'unknown'),
+            'by_decade': value_counts(decade_labels(years)),
+            'age_distribution': value_counts(age_labels)
+        }
+
+
+class OrganizationSection(TableSection):
+    """Organisation counts by type and country, with personnel strength statistics."""
+
+    node_types = ORGANIZATION_TYPES
+
+    def compute(self, table: NodeTable) -> Dict:
+        organizations = table.rows(self.node_types)
+        strengths = organizations['personnel_strength']
+        is_number = strengths.map(lambda value: isinstance(value, (int, float)))
+        personnel_numbers = strengths[truthy(strengths) & is_number].tolist()
+
+        result = {
+            'total_count': len(organizations),
+            'by_type': value_counts(organizations['organization_type'], 'unknown'),
+            'by_country': value_counts(organizations['country'], 'unknown'),
+            'personnel_stats': {}
+        }
+        if personnel_numbers:
+            result['personnel_stats'] = {
+                'total_personnel': sum(personnel_numbers),
+                'average_personnel': np.mean(personnel_numbers),
+                'median_personnel': np.median(personnel_numbers),
+                'largest_organization': max(personnel_numbers),
+                'smallest_organization': min(personnel_numbers)
+            }
+        return result
+
+
+class PeopleSection(TableSection):
+    """People counts by type, nationality and birth decade."""
+
+    node_types = ('person',)
+
+    def compute(self, table: NodeTable) -> Dict:
+        people = table.rows(self.node_types)
+
+        # Each listed person type counts once; a non-list value counts as 'unknown'
+        person_types = people['person_types']
+        is_list = person_types.map(lambda value: isinstance(value, list))
+        by_type = value_counts(person_types[is_list].explode().dropna())
+        unknown_types = int((~is_list & person_types.notna()).sum())
+        if unknown_types:
+            by_type['unknown'] += unknown_types
+
+        births = people['birth_date']
+        births = births[births.map(lambda value: isinstance(value, str) and len(value) >= 4)]
+        birth_years = pd.to_numeric(births.str[:4], errors='coerce').dropna().astype(int)
+
+        return {
+            'total_count': len(people),
+            'by_type': by_type,
+            'by_nationality': value_counts(people['nationality'], 'unknown'),
+            'birth_decades': value_counts(decade_labels(birth_years))
+        }
+
+
+class AreaSection(TableSection):
+    """Area counts by type, country and administrative level."""
+
+    node_types = ('area',)
+
+    def compute(self, table: NodeTable) -> Dict:
+        areas = table.rows(self.node_types)
+        return {
+            'total_count': len(areas),
+            'by_type': value_counts(areas['area_type'], 'unknown'),
+            'by_country': value_counts(areas['country'], 'unknown'),
+            'by_admin_level': value_counts(areas['admin_level'], 'unknown')
+        }
+
+
+class TemporalSection(TableSection):
+    """Technology timeline: assets per country per year."""
+
+    node_types = ('vehicle',) + ORGANIZATION_TYPES
+
+    def compute(self, table: NodeTable) -> Dict:
+        rows = table.rows(self.node_types)
+
+        # The first truthy of owner, country and nationality
+        country = rows['owner'].where(truthy(rows['owner']), rows['country'])
+        country = country.where(truthy(country), rows['nationality'])
+        dated = truthy(rows['year']) & truthy(country)
+
+        counts = pd.DataFrame({'country': country[dated], 'year': rows['year'][dated]}) \
+            .groupby(['country', 'year'], sort=False).size()
+
+        timeline = defaultdict(partial(defaultdict, int))
+        for (asset_country, year), count in counts.items():
+            timeline[asset_country][year] = int(count)
+
+        return {
+            'technology_timeline': timeline,
+            'service_periods': [],
+            'modernization_trends': {}
+        }
+
+
+class GeographicSection(TableSection):
+    """Vehicles per owner and military areas per country."""
+
+    node_types = ('vehicle', 'area')
+
+    def compute(self, table: NodeTable) -> Dict:
+        vehicles = table.rows(('vehicle',))
+        areas = table.rows(('area',))
+        owners = vehicles['owner'][truthy(vehicles['owner'])]
+        bases = areas['country'][(areas['area_type'] == 'military') & truthy(areas['country'])]
+
+        return {
+            'country_assets': defaultdict(int, value_counts(owners)),
+            'regional_distribution': {},
+            'base_locations': value_counts(bases)
+        }
+
+
+class TechnologySection(TableSection):
+    """Vehicle manufacturers."""
+
+    node_types = ('vehicle',)
+
+    def compute(self, table: NodeTable) -> Dict:
+        manufacturers = table.rows(self.node_types)['manufacturer']
+        return {
+            'manufacturers': value_counts(manufacturers[truthy(manufacturers)]),
+            'technology_generations': {},
+            'capability_gaps': {},
+            'modernization_patterns': {}
+        }
+
+
+class NodeAggregator:
+    """Computes node statistics sections from one shared node table per graph version."""
+
+    def __init__(self):
+        """Initialize the aggregator with no sections."""
+        self.sections = {}
+
+    def register(self, name: str, section_class: Type[TableSection]):
+        """Register (or replace) the table section class computing a section."""
+        self.sections[name] = section_class
+
+    def run(self, graph: nx.Graph, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Compute the requested sections (all registered ones by default)."""
+        names = list(self.sections) if sections is None else list(sections)
+        unknown = [name for name in names if name not in self.sections]
+        if unknown:
+            raise ValueError(f"Unknown statistics sections: {unknown}")
+        if not names:
+            return {}
+
+        table = get_node_table(graph)
+        return {name: self.sections[name](graph).compute(table) for name in names}
+
+
+def default_node_aggregator() -> NodeAggregator:
+    """Build an aggregator with the sections used by StatisticsGenerator."""
+    aggregator = NodeAggregator()
+    aggregator.register('node_statistics', NodeSummarySection)
+    aggregator.register('entity_counts', EntityCountSection)
+    aggregator.register('countries', CountrySection)
+    aggregator.register('vehicles', VehicleSection)
+    aggregator.register('organizations', OrganizationSection)
+    aggregator.register('people', PeopleSection)
+    aggregator.register('areas', AreaSection)
+    aggregator.register('temporal', TemporalSection)
+    aggregator.register('geographic', GeographicSection)
+    aggregator.register('technology', TechnologySection)
+    return aggregator
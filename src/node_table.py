@@ -0,0 +1,119 @@
+"""
+Node Table for IES4 Military Database Analysis Suite
+Columnar pandas view of a graph's nodes so that statistics can use vectorised
+group-bys instead of per-node Python loops.
+"""
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import logging
+from collections import Counter
+from typing import List, Iterable, Optional, Any
+
+try:
+    from .graph_index import get_index
+    from .node_types import NODE_TYPES
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+    from node_types import NODE_TYPES
+
+logger = logging.getLogger(__name__)
+
+NODE_TABLE = 'node_table'
+
+# Node attributes copied into object columns as-is (None where absent)
+ATTRIBUTE_COLUMNS = [
+    'type', 'label', 'country', 'owner', 'manufacturer', 'year', 'nationality',
+    'vehicle_type', 'organization_type', 'area_type', 'person_types'
+]
+
+# Columns read from the raw entity stored under the node's 'data' attribute
+ENTITY_COLUMNS = {
+    'birth_date': 'birthDate',
+    'admin_level': 'administrativeLevel',
+    'personnel_strength': 'personnelStrength'
+}
+
+
+def truthy(values: pd.Series) -> pd.Series:
+    """Get a boolean mask of values that are truthy in Python (None, '', 0 and [] are not)."""
+    return values.astype(bool)
+
+
+def value_counts(values: pd.Series, default: Any = None) -> Counter:
+    """Count the values of a column, in order of first appearance, with missing values counted as default."""
+    if default is not None:
+        values = values.where(values.notna(), default)
+    return Counter(values.value_counts(sort=False, dropna=False).to_dict())
+
+
+class NodeTable:
+    """One row per node in graph order, with columns for id, type code, degree,
+    connected component and the attributes statistics group by."""
+
+    def __init__(self, frame: pd.DataFrame):
+        """Initialize the table from a prepared frame."""
+        self.frame = frame
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'NodeTable':
+        """Build the table from the attributes, degrees and components of every node."""
+        n = graph.number_of_nodes()
+        ids = []
+        type_codes = np.empty(n, dtype=np.int16)
+        degrees = np.empty(n, dtype=np.int64)
+        columns = {name: [] for name in list(ATTRIBUTE_COLUMNS) + list(ENTITY_COLUMNS)}
+
+        degree = graph.degree
+        for position, (node, data) in enumerate(graph.nodes(data=True)):
+            ids.append(node)
+            type_code = data.get('type_code')
+            type_codes[position] = type_code if type_code is not None else NODE_TYPES.lookup(data.get('type'), NODE_TYPES.UNKNOWN)
+            degrees[position] = degree[node]
+
+            for name in ATTRIBUTE_COLUMNS:
+                columns[name].append(data.get(name))
+            entity = data.get('data')
+            entity = entity if isinstance(entity, dict) else {}
+            for name, field in ENTITY_COLUMNS.items():
+                columns[name].append(entity.get(field))
+
+        # Connected component ids in nx.connected_components order
+        positions = {node: position for position, node in enumerate(ids)}
+        components = np.empty(n, dtype=np.int64)
+        for component_id, component in enumerate(nx.connected_components(graph)):
+            components[[positions[node] for node in component]] = component_id
+
+        frame = pd.DataFrame({'id': pd.Series(ids, dtype=object), 'type_code': type_codes})
+        for name, values in columns.items():
+            frame[name] = pd.Series(values, dtype=object)
+        frame['degree'] = degrees
+        frame['component'] = components
+        return cls(frame)
+
+    def __len__(self) -> int:
+        """Get the number of nodes."""
+        return len(self.frame)
+
+    def rows(self, node_types: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Get the rows of the given (canonical or alias) node types, or all rows."""
+        if node_types is None:
+            return self.frame
+        return self.frame[self.frame['type_code'].isin(NODE_TYPES.codes(node_types))]
+
+    def degree_distribution(self) -> Counter:
+        """Count nodes by degree, in increasing degree order."""
+        counts = np.bincount(self.frame['degree'].to_numpy())
+        return Counter({degree: int(count) for degree, count in enumerate(counts) if count})
+
+    def fill_matrix(self, fields: List[str]) -> np.ndarray:
+        """Get a nodes x fields boolean matrix of which node attributes are present and truthy."""
+        if not fields:
+            return np.zeros((len(self.frame), 0), dtype=bool)
+        return np.column_stack([truthy(self.frame[field]).to_numpy() for field in fields])
+
+
+def get_node_table(graph: nx.Graph) -> NodeTable:
+    """Get the node table for a graph, building it if needed."""
+    return get_index(graph, NODE_TABLE, NodeTable.from_graph)
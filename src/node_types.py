@@ -0,0 +1,184 @@
+"""
+Node Type Registry for IES4 Military Database Analysis Suite
+Maps the different spellings of entity types onto canonical small-int codes.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+import re
+from typing import Dict, List, Iterable, Optional, Union
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+NODE_TYPE_INDEX = 'node_type_index'
+
+# Entity types that represent military or civilian organisations
+ORGANIZATION_TYPES = ('militaryOrganization', 'militaryUnit', 'organization')
+
+
+class NodeTypeRegistry:
+    """Central registry of canonical node types and their integer codes."""
+
+    # Canonical type names; the position in this list is the type code
+    CANONICAL_TYPES = [
+        'unknown', 'country', 'vehicle', 'vehicleType', 'person', 'peopleType',
+        'area', 'areaType', 'militaryUnit', 'unitType', 'militaryOrganization',
+        'organization', 'aircraft', 'weapon', 'representation'
+    ]
+
+    # Alternative spellings: database array names, IES4 'type' values and filter values
+    ALIASES = {
+        'countries': 'country',
+        'vehicles': 'vehicle',
+        'vehicleTypes': 'vehicleType',
+        'people': 'person',
+        'persons': 'person',
+        'peopleTypes': 'peopleType',
+        'personType': 'peopleType',
+        'personTypes': 'peopleType',
+        'areas': 'area',
+        'areaTypes': 'areaType',
+        'militaryUnits': 'militaryUnit',
+        'unit': 'militaryUnit',
+        'units': 'militaryUnit',
+        'unitTypes': 'unitType',
+        'militaryOrganizations': 'militaryOrganization',
+        'militaryOrganisation': 'militaryOrganization',
+        'militaryOrganisations': 'militaryOrganization',
+        'organizations': 'organization',
+        'organisation': 'organization',
+        'organisations': 'organization',
+        'weapons': 'weapon',
+        'representations': 'representation'
+    }
+
+    UNKNOWN = 0
+
+    def __init__(self):
+        """Initialize the registry with the canonical types and aliases."""
+        self._names = []
+        self._codes = {}
+
+        for name in self.CANONICAL_TYPES:
+            self._codes[self._normalize(name)] = len(self._names)
+            self._names.append(name)
+
+        for alias, name in self.ALIASES.items():
+            self._codes[self._normalize(alias)] = self._codes[self._normalize(name)]
+
+        self.builtin_count = len(self._names)
+
+    @staticmethod
+    def _normalize(type_name: str) -> str:
+        """Normalize a type name for alias lookup (case and separator insensitive)."""
+        return re.sub(r'[^a-z0-9]', '', str(type_name).lower())
+
+    def code(self, type_name: str) -> int:
+        """Get the integer code for a type name, registering unseen types.
+
+        Only the graph builder registers types; queries and filters use lookup,
+        so that type names from user input never grow the registry.
+        """
+        if not type_name:
+            return self.UNKNOWN
+
+        key = self._normalize(type_name)
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self._names)
+            self._names.append(str(type_name))
+            self._codes[key] = code
+            logger.debug(f"Registered new node type: {type_name} -> {code}")
+
+        return code
+
+    def lookup(self, type_name: str, default: Optional[int] = None) -> Optional[int]:
+        """Get the integer code for a type name, or default for an unseen type."""
+        if not type_name:
+            return self.UNKNOWN
+        return self._codes.get(self._normalize(type_name), default)
+
+    def codes(self, type_names: Iterable[str]) -> List[int]:
+        """Get the integer codes for several type names, skipping unseen types."""
+        return [code for code in map(self.lookup, type_names) if code is not None]
+
+    def name(self, code: int) -> str:
+        """Get the canonical type name for a code."""
+        if 0 <= code < len(self._names):
+            return self._names[code]
+        return self._names[self.UNKNOWN]
+
+    def canonical(self, type_name: str) -> str:
+        """Get the canonical name for any spelling of a type (an unseen type keeps its own name)."""
+        code = self.lookup(type_name)
+        return str(type_name) if code is None else self.name(code)
+
+    def is_builtin(self, code: Union[int, np.ndarray]) -> Union[bool, np.ndarray]:
+        """Check whether a code (or array of codes) is a known, non-unknown type."""
+        return (code > self.UNKNOWN) & (code < self.builtin_count)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Shared registry used by the graph builder, filters, statistics and visualizations
+NODE_TYPES = NodeTypeRegistry()
+
+
+def node_type_code(data: Dict, registry: NodeTypeRegistry = NODE_TYPES) -> int:
+    """Get a node's type code, looking up its type attribute when no code is stored."""
+    type_code = data.get('type_code')
+    return type_code if type_code is not None else registry.lookup(data.get('type'), registry.UNKNOWN)
+
+
+class NodeTypeIndex:
+    """Node type codes stored as a NumPy array aligned with graph node order."""
+
+    def __init__(self, nodes: List[str], codes: np.ndarray, registry: NodeTypeRegistry = NODE_TYPES):
+        """Initialize the index from aligned node and code sequences."""
+        self.nodes = nodes
+        self.codes = codes
+        self.registry = registry
+        # Number of nodes with each type code
+        self.type_counts = np.bincount(codes) if len(codes) else np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph, registry: NodeTypeRegistry = NODE_TYPES) -> 'NodeTypeIndex':
+        """Build the index from the type attributes of every node."""
+        nodes = []
+        codes = np.empty(graph.number_of_nodes(), dtype=np.int16)
+
+        for position, (node, data) in enumerate(graph.nodes(data=True)):
+            nodes.append(node)
+            codes[position] = node_type_code(data, registry)
+
+        return cls(nodes, codes, registry)
+
+    def mask(self, *type_names: str) -> np.ndarray:
+        """Get a boolean mask of nodes matching any of the given types."""
+        return np.isin(self.codes, self.registry.codes(type_names))
+
+    def nodes_of_type(self, *type_names: str) -> List[str]:
+        """Get the nodes matching any of the given types, in graph order."""
+        nodes = self.nodes
+        return [nodes[position] for position in np.flatnonzero(self.mask(*type_names))]
+
+    def count(self, *type_names: str) -> int:
+        """Count the nodes matching any of the given types, without building a mask."""
+        type_counts = self.type_counts
+        return int(sum(type_counts[code] for code in set(self.registry.codes(type_names)) if code < len(type_counts)))
+
+    def counts(self) -> Dict[str, int]:
+        """Count nodes by canonical type name."""
+        return {self.registry.name(code): int(count) for code, count in enumerate(self.type_counts) if count}
+
+
+def get_node_type_index(graph: nx.Graph) -> NodeTypeIndex:
+    """Get the node type index for a graph, building it if needed."""
+    return get_index(graph, NODE_TYPE_INDEX, NodeTypeIndex.from_graph)
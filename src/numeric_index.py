@@ -0,0 +1,148 @@
+"""
+Numeric Index for IES4 Military Database Analysis Suite
+Sorted NumPy arrays of node years and degrees for range filters.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+from numbers import Number
+from typing import List, Set, Tuple, Optional, Iterable, Union
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+YEAR_INDEX = 'year_index'
+DEGREE_INDEX = 'degree_index'
+
+Range = Tuple[Optional[float], Optional[float]]
+
+
+def parse_ranges(spec: Union[str, int, Iterable]) -> List[Range]:
+    """Parse a range specification into (low, high) pairs; None marks an open end.
+
+    Accepts '1990-2000', open-ended '1990-' and '-2000', a single value '1985',
+    comma-separated disjoint ranges '1960-1970,1990-' or a list of any of these.
+    Raises ValueError for malformed input.
+    """
+    if isinstance(spec, Number) and not isinstance(spec, bool):
+        return [(spec, spec)]
+    if isinstance(spec, str):
+        parts = spec.split(',')
+    else:
+        parts = [str(part) for part in spec]
+
+    ranges = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+
+        low, separator, high = part.partition('-')
+        if not separator:
+            value = int(low)
+            ranges.append((value, value))
+            continue
+
+        low = int(low) if low.strip() else None
+        high = int(high) if high.strip() else None
+        if low is None and high is None:
+            raise ValueError(f"Range has no bounds: {part!r}")
+        ranges.append((low, high))
+
+    if not ranges:
+        raise ValueError(f"Empty range specification: {spec!r}")
+    return ranges
+
+
+class SortedNumericIndex:
+    """Node values sorted in a NumPy array so range lookups cost O(log N + k) via searchsorted."""
+
+    def __init__(self, values: Iterable[float], nodes: Iterable[str]):
+        """Initialize the index from parallel sequences of values and nodes."""
+        values = np.asarray(list(values), dtype=np.float64)
+        nodes = np.asarray(list(nodes), dtype=object)
+
+        order = np.argsort(values, kind='stable')
+        self.values = values[order]
+        self.nodes = nodes[order]
+
+    def _span(self, low: Optional[float], high: Optional[float]) -> Tuple[int, int]:
+        """Get the (start, end) positions of the values in [low, high]."""
+        start = 0 if low is None else int(np.searchsorted(self.values, low, side='left'))
+        end = len(self.values) if high is None else int(np.searchsorted(self.values, high, side='right'))
+        return start, end
+
+    def between(self, low: Optional[float] = None, high: Optional[float] = None) -> Set[str]:
+        """Get nodes with a value in the inclusive range [low, high]; None leaves that end open."""
+        start, end = self._span(low, high)
+        if start >= end:
+            return set()
+        return set(self.nodes[start:end].tolist())
+
+    def count_between(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Count the values in [low, high] from the searchsorted span, without collecting nodes."""
+        start, end = self._span(low, high)
+        return max(0, end - start)
+
+    def equals(self, value: float) -> Set[str]:
+        """Get nodes with exactly the given value."""
+        return self.between(value, value)
+
+    def in_ranges(self, ranges: Iterable[Range]) -> Set[str]:
+        """Get nodes with a value in any of the given ranges."""
+        result = set()
+        for low, high in ranges:
+            result |= self.between(low, high)
+        return result
+
+    def count_in_ranges(self, ranges: Iterable[Range]) -> int:
+        """Count the values in any of the given ranges; overlapping ranges are counted twice."""
+        return sum(self.count_between(low, high) for low, high in ranges)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _is_numeric(value) -> bool:
+    """Check for a numeric value that can be compared with integer years."""
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def build_year_index(graph: nx.Graph) -> SortedNumericIndex:
+    """Index node years from the node 'year' attribute and the entity data 'year' field."""
+    values = []
+    nodes = []
+    for node, data in graph.nodes(data=True):
+        years = {data.get('year'), data.get('data', {}).get('year')}
+        for year in years:
+            if _is_numeric(year):
+                values.append(year)
+                nodes.append(node)
+
+    logger.debug(f"Indexed {len(values)} years")
+    return SortedNumericIndex(values, nodes)
+
+
+def build_degree_index(graph: nx.Graph) -> SortedNumericIndex:
+    """Index the degree of every node."""
+    nodes, degrees = zip(*graph.degree()) if len(graph) else ((), ())
+    return SortedNumericIndex(degrees, nodes)
+
+
+def get_year_index(graph: nx.Graph) -> SortedNumericIndex:
+    """Get the year index for a graph, building it if needed."""
+    return get_index(graph, YEAR_INDEX, build_year_index)
+
+
+def get_degree_index(graph: nx.Graph) -> SortedNumericIndex:
+    """Get the degree index for a graph, building it if needed.
+
+    Degrees change with edges, so code that edits edges in place must call
+    mark_graph_changed() for this index to be rebuilt.
+    """
+    return get_index(graph, DEGREE_INDEX, build_degree_index)
@@ -0,0 +1,176 @@
+"""
+Path Statistics for IES4 Military Database Analysis Suite
+Average shortest path length and diameter of a connected graph: exact from one
+BFS per node for small graphs, approximated with sampled BFS and iFUB diameter
+bounds above a node threshold.
+"""
+
+import logging
+import numpy as np
+import networkx as nx
+from statistics import NormalDist
+from typing import Dict, List, Tuple, Any
+
+try:
+    from .betweenness import adjacency_lists
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from betweenness import adjacency_lists
+
+logger = logging.getLogger(__name__)
+
+
+def bfs_distances(neighbors: List[List[int]], source: int) -> List[int]:
+    """Get hop distances from a source to every node (-1 where unreachable)."""
+    distance = [-1] * len(neighbors)
+    distance[source] = 0
+    frontier = [source]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for v in frontier:
+            for w in neighbors[v]:
+                if distance[w] < 0:
+                    distance[w] = level
+                    next_frontier.append(w)
+        frontier = next_frontier
+    return distance
+
+
+class PathStatistics:
+    """Average shortest path length and diameter of a connected graph.
+
+    Graphs with at most approximation_threshold nodes get exact values from a
+    BFS per node. Larger graphs get the mean path length from BFS at sampled
+    sources, with a normal confidence interval, and the diameter from iFUB
+    (seeded by a 4-sweep), which stops with lower and upper bounds after
+    max_diameter_bfs searches.
+    """
+
+    def __init__(self, approximation_threshold: int = 2000, samples: int = 200,
+                 max_diameter_bfs: int = 200, confidence: float = 0.95, seed: int = 42):
+        """Initialize the path statistics."""
+        self.approximation_threshold = approximation_threshold
+        self.samples = samples
+        self.max_diameter_bfs = max_diameter_bfs
+        self.confidence = confidence
+        self.seed = seed
+
+    def analyze(self, graph: nx.Graph) -> Tuple[float, int, Dict[str, Any]]:
+        """Get (average shortest path length, diameter, method info) for a connected graph."""
+        nodes, neighbors = adjacency_lists(graph)
+        n = len(nodes)
+        if n == 0:
+            raise nx.NetworkXPointlessConcept("Path statistics are undefined for the null graph")
+        if n == 1:
+            return 0, 0, {'exact': True, 'nodes': 1}
+
+        if n <= self.approximation_threshold:
+            average, diameter = self._exact(neighbors)
+            return average, diameter, {'exact': True, 'nodes': n}
+
+        average, interval, sampled = self._sampled_average(neighbors)
+        lower, upper, bfs_runs = self._diameter_bounds(neighbors)
+        info = {
+            'exact': False,
+            'nodes': n,
+            'sampled_sources': sampled,
+            'confidence': self.confidence,
+            'average_path_length_interval': interval,
+            'diameter_exact': lower == upper,
+            'diameter_bounds': [lower, upper],
+            'diameter_bfs_runs': bfs_runs
+        }
+        logger.info(f"Approximated path statistics for {n} nodes from {sampled} sources "
+                    f"and {bfs_runs} diameter searches")
+        return average, lower, info
+
+    @staticmethod
+    def _exact(neighbors: List[List[int]]) -> Tuple[float, int]:
+        """Get the exact average path length and diameter from a BFS per node."""
+        n = len(neighbors)
+        total = diameter = 0
+        for source in range(n):
+            distance = bfs_distances(neighbors, source)
+            if min(distance) < 0:
+                raise nx.NetworkXError("Graph is not connected.")
+            total += sum(distance)
+            diameter = max(diameter, max(distance))
+        return total / (n * (n - 1)), diameter
+
+    def _sampled_average(self, neighbors: List[List[int]]) -> Tuple[float, List[float], int]:
+        """Estimate the average path length from BFS at sampled sources, with a confidence interval."""
+        n = len(neighbors)
+        k = min(self.samples, n)
+        sources = np.random.default_rng(self.seed).choice(n, size=k, replace=False)
+
+        # Every source reaches the same n - 1 targets, so the mean of per-source means is unbiased
+        means = []
+        for source in sources.tolist():
+            distance = bfs_distances(neighbors, source)
+            if min(distance) < 0:
+                raise nx.NetworkXError("Graph is not connected.")
+            means.append(sum(distance) / (n - 1))
+        means = np.asarray(means)
+
+        average = float(means.mean())
+        if k < 2:
+            return average, [average, average], k
+
+        # Sources are drawn without replacement, hence the finite population correction
+        z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        standard_error = float(means.std(ddof=1) / np.sqrt(k) * np.sqrt((n - k) / (n - 1)))
+        return average, [average - z * standard_error, average + z * standard_error], k
+
+    def _diameter_bounds(self, neighbors: List[List[int]]) -> Tuple[int, int, int]:
+        """Bound the diameter with iFUB; returns (lower, upper, BFS runs), equal bounds being exact."""
+        bfs_runs = 0
+
+        def bfs(source):
+            nonlocal bfs_runs
+            bfs_runs += 1
+            return bfs_distances(neighbors, source)
+
+        def farthest(distance):
+            return max(range(len(distance)), key=distance.__getitem__)
+
+        def midpoint(a, distance_a):
+            # The middle of a shortest path from a to the node farthest from it
+            b = farthest(distance_a)
+            length = distance_a[b]
+            distance_b = bfs(b)
+            for v, (from_a, from_b) in enumerate(zip(distance_a, distance_b)):
+                if from_a == length // 2 and from_a + from_b == length:
+                    return v, max(length, max(distance_b))
+            return a, length
+
+        # 4-sweep: two double sweeps, the second starting from the middle of the first
+        start = max(range(len(neighbors)), key=lambda v: len(neighbors[v]))
+        a = farthest(bfs(start))
+        distance_a = bfs(a)
+        middle, lower = midpoint(a, distance_a)
+        a = farthest(bfs(middle))
+        distance_a = bfs(a)
+        center, sweep_lower = midpoint(a, distance_a)
+        lower = max(lower, sweep_lower)
+
+        # iFUB from the center: once the fringe at level i is done, no pair left can be farther than 2(i - 1)
+        distance_center = bfs(center)
+        eccentricity = max(distance_center)
+        lower = max(lower, eccentricity)
+        upper = 2 * eccentricity
+
+        levels = [[] for _ in range(eccentricity + 1)]
+        for v, level in enumerate(distance_center):
+            levels[level].append(v)
+
+        level = eccentricity
+        while lower < upper and level > 0:
+            for v in levels[level]:
+                if bfs_runs >= self.max_diameter_bfs:
+                    return lower, upper, bfs_runs
+                lower = max(lower, max(bfs(v)))
+            upper = min(upper, max(lower, 2 * (level - 1)))
+            level -= 1
+
+        return lower, upper, bfs_runs
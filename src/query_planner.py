@@ -0,0 +1,108 @@
+"""
+Query Planner for IES4 Military Database Analysis Suite
+Orders filters by estimated selectivity and evaluates them on surviving candidates.
+"""
+
+import networkx as nx
+import logging
+import time
+from typing import Dict, List, Set, Any, Optional, Tuple
+
+try:
+    from .streaming_filter import STREAMING_FILTERS
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from streaming_filter import STREAMING_FILTERS
+
+logger = logging.getLogger(__name__)
+
+
+class FilterPlanner:
+    """Plans and executes conjunctive filter sets for a FilterSystem.
+
+    The first step is an index lookup. Each later step that looks at one node
+    at a time (the streaming filters) checks the surviving candidates one by
+    one when there are fewer of them than its lookup is estimated to return;
+    otherwise its lookup result is intersected with the candidates.
+    """
+
+    def __init__(self, filter_system):
+        """Initialize the planner for a filter system."""
+        self.filter_system = filter_system
+
+    def plan(self, graph: nx.Graph, filters: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Order filters by estimated result size, most selective first.
+
+        Estimates come from index statistics (posting-list lengths, sorted
+        array spans, type counts) without building any match sets; a filter
+        with no estimator is assumed to match every node.
+        """
+        available_filters = self.filter_system.available_filters
+        estimators = self.filter_system.filter_estimators
+        node_count = graph.number_of_nodes()
+
+        steps = []
+        unknown_filters = []
+        for filter_name, filter_value in filters.items():
+            if filter_name not in available_filters:
+                logger.warning(f"Unknown filter: {filter_name}")
+                unknown_filters.append(filter_name)
+                continue
+
+            estimator = estimators.get(filter_name)
+            estimate = node_count if estimator is None else min(estimator(graph, filter_value), node_count)
+            steps.append({'filter': filter_name, 'value': filter_value, 'estimate': estimate})
+
+        # Stable, so equal estimates keep the order the filters were given in
+        steps.sort(key=lambda step: step['estimate'])
+        return steps, unknown_filters
+
+    def execute(self, graph: nx.Graph, filters: Dict[str, Any]) -> Tuple[Set[str], Dict[str, Any]]:
+        """Run the filters in planned order and return the matching nodes with an execution report."""
+        start = time.perf_counter()
+        steps, unknown_filters = self.plan(graph, filters)
+        planning_time = time.perf_counter() - start
+
+        available_filters = self.filter_system.available_filters
+        candidates: Optional[Set[str]] = None
+        short_circuited = False
+
+        for step in steps:
+            if candidates is not None and not candidates:
+                # Nothing left to filter, so the remaining steps are never evaluated
+                step['status'] = 'skipped'
+                short_circuited = True
+                continue
+
+            step_start = time.perf_counter()
+            filter_name, filter_value = step['filter'], step['value']
+            if candidates is not None and filter_name in STREAMING_FILTERS and len(candidates) < step['estimate']:
+                predicate = self.filter_system.streaming.compile({filter_name: filter_value})[0]
+                step['evaluation'] = 'candidates'
+                step['input_nodes'] = len(candidates)
+                nodes = graph.nodes
+                candidates = {node for node in candidates if predicate(node, nodes[node])}
+            else:
+                matches = available_filters[filter_name](graph, filter_value)
+                step['evaluation'] = 'index'
+                step['input_nodes'] = graph.number_of_nodes()
+                candidates = set(matches) if candidates is None else candidates.intersection(matches)
+
+            step['output_nodes'] = len(candidates)
+            step['status'] = 'executed'
+            step['time_ms'] = (time.perf_counter() - step_start) * 1000
+            logger.debug(f"Nodes after {step['filter']}: {len(candidates)}")
+
+        if candidates is None:
+            candidates = set(graph.nodes())
+
+        total_time = time.perf_counter() - start
+        report = {
+            'plan': steps,
+            'unknown_filters': unknown_filters,
+            'short_circuited': short_circuited,
+            'result_nodes': len(candidates),
+            'planning_time_ms': planning_time * 1000,
+            'execution_time_ms': (total_time - planning_time) * 1000,
+            'total_time_ms': total_time * 1000
+        }
+        return candidates, report
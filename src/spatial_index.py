@@ -0,0 +1,412 @@
+"""
+Spatial Index for IES4 Military Database Analysis Suite
+Packed STR bounding-box tree over GeoJSON geometries (EPSG:4326) for geographic filters.
+"""
+
+import networkx as nx
+import numpy as np
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple, Iterable, Any, Optional, Union
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_INDEX = 'spatial_index'
+
+# Entity fields holding GeoJSON geometries
+GEOMETRY_FIELDS = ['coordinates', 'geographicBounds']
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+BoundingBox = Tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+
+
+def parse_bbox(spec: Union[str, Iterable]) -> BoundingBox:
+    """Parse 'min_lon,min_lat,max_lon,max_lat' (GeoJSON bbox order) or a sequence of four numbers.
+
+    Raises ValueError for malformed input.
+    """
+    parts = spec.split(',') if isinstance(spec, str) else list(spec)
+    if len(parts) != 4:
+        raise ValueError(f"Bounding box needs four values: {spec!r}")
+
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in parts)
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError(f"Bounding box minimum exceeds maximum: {spec!r}")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def parse_near(spec: Union[str, Dict, Iterable]) -> Tuple[float, float, float]:
+    """Parse 'lat,lon,km', a {'lat', 'lon', 'km'} dict or a sequence of three numbers.
+
+    Raises ValueError for malformed input.
+    """
+    if isinstance(spec, dict):
+        parts = [spec.get('lat'), spec.get('lon'), spec.get('km')]
+    else:
+        parts = spec.split(',') if isinstance(spec, str) else list(spec)
+    if len(parts) != 3:
+        raise ValueError(f"Proximity filter needs lat, lon and km: {spec!r}")
+
+    lat, lon, km = (float(part) for part in parts)
+    if not -90 <= lat <= 90 or km < 0:
+        raise ValueError(f"Invalid proximity filter: {spec!r}")
+    return lat, lon, km
+
+
+def extract_shapes(geometry: Any) -> List[Tuple[str, Any]]:
+    """Split a GeoJSON geometry (or list of geometries) into ('point', xy) and ('polygon', rings) shapes.
+
+    Malformed geometries are skipped.
+    """
+    if isinstance(geometry, list):
+        return [shape for item in geometry for shape in extract_shapes(item)]
+    if not isinstance(geometry, dict):
+        return []
+
+    geometry_type = geometry.get('type')
+    coordinates = geometry.get('coordinates')
+    try:
+        if geometry_type == 'Point':
+            points = [coordinates]
+            polygons = []
+        elif geometry_type == 'MultiPoint':
+            points = coordinates
+            polygons = []
+        elif geometry_type == 'Polygon':
+            points = []
+            polygons = [coordinates]
+        elif geometry_type == 'MultiPolygon':
+            points = []
+            polygons = coordinates
+        elif geometry_type == 'GeometryCollection':
+            return extract_shapes(geometry.get('geometries', []))
+        else:
+            return []
+
+        shapes = []
+        for point in points:
+            point = np.asarray(point, dtype=np.float64)[:2]
+            if point.shape == (2,) and np.isfinite(point).all():
+                shapes.append(('point', point))
+        for polygon in polygons:
+            rings = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon if len(ring) >= 3]
+            if rings and all(np.isfinite(ring).all() for ring in rings):
+                shapes.append(('polygon', rings))
+    except (TypeError, ValueError, IndexError):
+        logger.debug(f"Skipping malformed {geometry_type} geometry")
+        return []
+
+    return shapes
+
+
+def shape_bounds(kind: str, shape: Any) -> BoundingBox:
+    """Get the bounding box of a shape."""
+    if kind == 'point':
+        return shape[0], shape[1], shape[0], shape[1]
+    outer = shape[0]
+    return outer[:, 0].min(), outer[:, 1].min(), outer[:, 0].max(), outer[:, 1].max()
+
+
+def points_in_polygon(points: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """Test (lon, lat) points against a polygon with holes using the even-odd ray casting rule."""
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    inside = np.zeros(len(points), dtype=bool)
+
+    for ring in rings:
+        x1, y1 = ring[:, 0], ring[:, 1]
+        x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+
+        # Edges straddling each point's latitude, crossed to the right of the point
+        straddles = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= (np.count_nonzero(straddles & (x < crossing_x), axis=1) % 2).astype(bool)
+
+    return inside
+
+
+def segments_cross_box(start: np.ndarray, end: np.ndarray, box: BoundingBox) -> np.ndarray:
+    """Test which segments touch an axis-aligned box, by Liang-Barsky clipping."""
+    min_x, min_y, max_x, max_y = box
+    delta = end - start
+    low = np.zeros(len(start))
+    high = np.ones(len(start))
+    hit = np.ones(len(start), dtype=bool)
+
+    for p, q in ((-delta[:, 0], start[:, 0] - min_x), (delta[:, 0], max_x - start[:, 0]),
+                 (-delta[:, 1], start[:, 1] - min_y), (delta[:, 1], max_y - start[:, 1])):
+        parallel = p == 0
+        hit &= ~(parallel & (q < 0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = q / p
+        low = np.where(~parallel & (p < 0), np.maximum(low, ratio), low)
+        high = np.where(~parallel & (p > 0), np.minimum(high, ratio), high)
+
+    return hit & (low <= high)
+
+
+def polygon_intersects_box(rings: List[np.ndarray], box: BoundingBox) -> bool:
+    """Test whether a polygon and an axis-aligned box overlap."""
+    for ring in rings:
+        if segments_cross_box(ring, np.roll(ring, -1, axis=0), box).any():
+            return True
+
+    # The box may lie entirely inside the polygon
+    corner = np.array([[box[0], box[1]]])
+    return bool(points_in_polygon(corner, rings)[0])
+
+
+def near_box(lat: float, lon: float, km: float) -> BoundingBox:
+    """Get a bounding box containing every point within km of a point."""
+    # Degrees spanned by km, widened towards the poles; clamped rather than wrapped at the antimeridian
+    lat_span = km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(min(abs(lat) + lat_span, 90.0)))
+    lon_span = 180.0 if cos_lat < 1e-9 else min(km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return lon - lon_span, lat - lat_span, lon + lon_span, lat + lat_span
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points."""
+    lat1, lat2 = np.radians(lat), np.radians(lats)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlon = np.radians(lons - lon) / 2
+    a = np.sin(half_dlat) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(half_dlon) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def polygon_distance_km(lat: float, lon: float, rings: List[np.ndarray]) -> float:
+    """Approximate distance in km from a point to a polygon (0 inside), in a local equirectangular projection."""
+    if points_in_polygon(np.array([[lon, lat]]), rings)[0]:
+        return 0.0
+
+    scale = np.array([KM_PER_DEGREE * math.cos(math.radians(lat)), KM_PER_DEGREE])
+    distance = math.inf
+    for ring in rings:
+        start = (ring - (lon, lat)) * scale
+        segment = (np.roll(ring, -1, axis=0) - ring) * scale
+        length = (segment ** 2).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.clip(np.where(length > 0, -(start * segment).sum(axis=1) / length, 0), 0, 1)
+        closest = start + t[:, None] * segment
+        distance = min(distance, float(np.sqrt((closest ** 2).sum(axis=1)).min()))
+    return distance
+
+
+class STRTree:
+    """Bounding-box tree bulk-loaded with Sort-Tile-Recursive packing, stored as NumPy arrays per level."""
+
+    def __init__(self, bounds: np.ndarray, node_capacity: int = 16):
+        """Pack entry bounds (an N x 4 array of min_x, min_y, max_x, max_y) into a tree."""
+        self.node_capacity = node_capacity
+        self.order = self._str_order(bounds, node_capacity)
+
+        # levels[0] holds the entry boxes in packed order; each level above holds the
+        # boxes of consecutive groups of node_capacity children from the level below
+        level = bounds[self.order] if len(bounds) else np.empty((0, 4))
+        self.levels = [level]
+        while len(level) > node_capacity:
+            starts = np.arange(0, len(level), node_capacity)
+            level = np.hstack([
+                np.minimum.reduceat(level[:, :2], starts, axis=0),
+                np.maximum.reduceat(level[:, 2:], starts, axis=0)
+            ])
+            self.levels.append(level)
+
+    @staticmethod
+    def _str_order(bounds: np.ndarray, node_capacity: int) -> np.ndarray:
+        """Order entries into vertical slices by x centre, then by y centre within each slice."""
+        count = len(bounds)
+        if not count:
+            return np.empty(0, dtype=np.intp)
+
+        leaves = math.ceil(count / node_capacity)
+        slice_size = math.ceil(math.sqrt(leaves)) * node_capacity
+        centre_x = (bounds[:, 0] + bounds[:, 2]) / 2
+        centre_y = (bounds[:, 1] + bounds[:, 3]) / 2
+
+        by_x = np.argsort(centre_x, kind='stable')
+        slices = np.arange(count) // slice_size
+        return by_x[np.lexsort((centre_y[by_x], slices))]
+
+    def query(self, box: BoundingBox) -> np.ndarray:
+        """Get the indices of entries whose bounds intersect box."""
+        min_x, min_y, max_x, max_y = box
+        candidates = np.arange(len(self.levels[-1]))
+
+        for depth in range(len(self.levels) - 1, -1, -1):
+            level = self.levels[depth][candidates]
+            hit = candidates[(level[:, 0] <= max_x) & (level[:, 2] >= min_x) &
+                             (level[:, 1] <= max_y) & (level[:, 3] >= min_y)]
+            if depth == 0:
+                return self.order[hit]
+
+            # Descend into the children of every intersecting node
+            children = (hit[:, None] * self.node_capacity + np.arange(self.node_capacity)).ravel()
+            candidates = children[children < len(self.levels[depth - 1])]
+
+        return np.empty(0, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class SpatialIndex:
+    """Node geometries in an STR tree, refined exactly after the bounding-box prefilter.
+
+    Entities without coordinates whose 'location' names a matching node (as
+    in the OP oblast files, where units are located "Odesa Oblast") match too.
+    """
+
+    def __init__(self, nodes: List[str], shapes: List[Tuple[str, Any]],
+                 located: Dict[str, Set[str]], node_names: Dict[str, List[str]]):
+        """Initialize the index from parallel node and shape lists."""
+        self.nodes = nodes
+        self.shapes = shapes
+        self.located = located        # lowercased location name -> nodes located there
+        self.node_names = node_names  # node with a geometry -> lowercased names
+        self.node_shapes = defaultdict(list)
+        for entry, node in enumerate(nodes):
+            self.node_shapes[node].append(entry)
+
+        bounds = np.array([shape_bounds(kind, shape) for kind, shape in shapes], dtype=np.float64)
+        self.tree = STRTree(bounds.reshape(-1, 4))
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'SpatialIndex':
+        """Index the geometries of every node of a graph."""
+        nodes = []
+        shapes = []
+        located = defaultdict(set)
+        node_names = {}
+
+        for node, data in graph.nodes(data=True):
+            entity_data = data.get('data', {})
+
+            location = entity_data.get('location')
+            if isinstance(location, str) and location:
+                located[location.lower()].add(node)
+
+            node_shapes = [shape for field in GEOMETRY_FIELDS for shape in extract_shapes(entity_data.get(field))]
+            if not node_shapes:
+                continue
+
+            nodes.extend([node] * len(node_shapes))
+            shapes.extend(node_shapes)
+            names = {str(data.get('label', node)).lower()}
+            names.update(str(name_obj['value']).lower() for name_obj in entity_data.get('names', [])
+                         if isinstance(name_obj, dict) and name_obj.get('value'))
+            node_names[node] = sorted(names)
+
+        logger.debug(f"Indexed {len(shapes)} geometries for {len(node_names)} nodes")
+        return cls(nodes, shapes, dict(located), node_names)
+
+    def _with_located(self, nodes: Set[str]) -> Set[str]:
+        """Add entities whose location names one of the matched nodes."""
+        result = set(nodes)
+        for node in nodes:
+            for name in self.node_names.get(node, []):
+                result |= self.located.get(name, set())
+        return result
+
+    def _match_points(self, entries: np.ndarray, rings: List[np.ndarray]) -> Set[str]:
+        """Get the nodes of point entries lying inside a polygon."""
+        if not len(entries):
+            return set()
+        points = np.array([self.shapes[entry][1] for entry in entries])
+        return {self.nodes[entry] for entry in entries[points_in_polygon(points, rings)]}
+
+    def in_bbox(self, box: BoundingBox) -> Set[str]:
+        """Get nodes whose geometry intersects a bounding box."""
+        matches = set()
+        for entry in self.tree.query(box):
+            kind, shape = self.shapes[entry]
+            # Point bounds are exact; polygons need the exact overlap test
+            if kind == 'point' or polygon_intersects_box(shape, box):
+                matches.add(self.nodes[entry])
+        return self._with_located(matches)
+
+    def estimate(self, box: BoundingBox) -> int:
+        """Count the geometries whose bounding boxes intersect a box, before any exact test."""
+        return len(self.tree.query(box))
+
+    def estimate_within_area(self, area: str) -> int:
+        """Count the geometries in the bounding boxes of an area's polygons, plus entities located there."""
+        area = self.find_area(area)
+        if area is None:
+            return 0
+        shapes = [self.shapes[entry] for entry in self.node_shapes.get(area, [])]
+        located = sum(len(self.located.get(name, ())) for name in self.node_names.get(area, []))
+        return sum(self.estimate(shape_bounds(kind, rings)) for kind, rings in shapes if kind == 'polygon') + located
+
+    def find_area(self, area: str) -> Optional[str]:
+        """Resolve an area given by node id or by one of its names."""
+        if area in self.node_shapes:
+            return area
+        name = str(area).lower()
+        for node, names in self.node_names.items():
+            if name in names:
+                return node
+        return None
+
+    def within_area(self, area: str) -> Set[str]:
+        """Get nodes inside the polygon(s) of an area node, excluding the area itself.
+
+        Points are tested exactly; polygons count as inside when all their
+        vertices are, which is exact for convex areas.
+        """
+        area = self.find_area(area)
+        if area is None:
+            return set()
+
+        matches = set()
+        for area_entry in self.node_shapes.get(area, []):
+            kind, rings = self.shapes[area_entry]
+            if kind != 'polygon':
+                continue
+
+            candidates = self.tree.query(shape_bounds(kind, rings))
+            candidates = candidates[candidates != area_entry]
+            is_point = np.array([self.shapes[entry][0] == 'point' for entry in candidates], dtype=bool)
+            matches |= self._match_points(candidates[is_point], rings)
+
+            for entry in candidates[~is_point]:
+                vertices = np.vstack(self.shapes[entry][1])
+                if points_in_polygon(vertices, rings).all():
+                    matches.add(self.nodes[entry])
+
+        # Entities located in the area itself are inside it too
+        matches = self._with_located(matches | {area})
+        matches.discard(area)
+        return matches
+
+    def near(self, lat: float, lon: float, km: float) -> Set[str]:
+        """Get nodes whose geometry lies within km of a point."""
+        candidates = self.tree.query(near_box(lat, lon, km))
+        is_point = np.array([self.shapes[entry][0] == 'point' for entry in candidates], dtype=bool)
+
+        matches = set()
+        point_entries = candidates[is_point]
+        if len(point_entries):
+            points = np.array([self.shapes[entry][1] for entry in point_entries])
+            distances = haversine_km(lat, lon, points[:, 1], points[:, 0])
+            matches.update(self.nodes[entry] for entry in point_entries[distances <= km])
+
+        for entry in candidates[~is_point]:
+            if polygon_distance_km(lat, lon, self.shapes[entry][1]) <= km:
+                matches.add(self.nodes[entry])
+
+        return self._with_located(matches)
+
+
+def get_spatial_index(graph: nx.Graph) -> SpatialIndex:
+    """Get the spatial index for a graph, building it if needed."""
+    return get_index(graph, SPATIAL_INDEX, SpatialIndex.from_graph)
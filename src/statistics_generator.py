@@ -7,14 +7,58 @@ import networkx as nx
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Iterable, Optional, Any
 from collections import defaultdict, Counter
 from datetime import datetime
 import json
 import csv
 
+try:
+    from .graph_index import get_relationship_index
+    from .node_types import NODE_TYPES, get_node_type_index
+    from .node_statistics import default_node_aggregator
+    from .node_table import get_node_table
+    from .country_comparison import CountryComparison
+    from .betweenness import BetweennessEstimator
+    from .path_statistics import PathStatistics
+    from .component_analytics import ComponentAnalytics
+    from .sparse_centrality import SparseCentrality
+    from .incremental_statistics import GraphChangeSet, get_incremental_statistics, apply_graph_changes
+    from .statistics_store import StatisticsStore
+    from .community_detection import get_community_index
+    from .report_pipeline import ReportPipeline
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_relationship_index
+    from node_types import NODE_TYPES, get_node_type_index
+    from node_statistics import default_node_aggregator
+    from node_table import get_node_table
+    from country_comparison import CountryComparison
+    from betweenness import BetweennessEstimator
+    from path_statistics import PathStatistics
+    from component_analytics import ComponentAnalytics
+    from sparse_centrality import SparseCentrality
+    from incremental_statistics import GraphChangeSet, get_incremental_statistics, apply_graph_changes
+    from statistics_store import StatisticsStore
+    from community_detection import get_community_index
+    from report_pipeline import ReportPipeline
+
 logger = logging.getLogger(__name__)
 
+# Node aggregation sections reported under entity analysis
+ENTITY_SECTIONS = ['countries', 'vehicles', 'organizations', 'people', 'areas']
+
+# Node aggregation sections that are recomputed from the whole graph after changes
+GRAPH_NODE_SECTIONS = ENTITY_SECTIONS + ['temporal', 'geographic', 'technology']
+
+# Sections of generate_statistics besides metadata, in output order
+STATISTICS_SECTIONS = [
+    'node_statistics', 'edge_statistics', 'connectivity', 'centrality',
+    'entity_analysis', 'temporal_analysis', 'geographic_analysis', 'technology_analysis'
+]
+
+# Version of the generate_statistics output; bump it whenever a section changes so stored results are not reused
+STATISTICS_VERSION = 3
+
 class StatisticsGenerator:
     """Generates statistics and analysis reports from military database graphs."""
     
@@ -24,142 +68,184 @@ class StatisticsGenerator:
             'countries', 'vehicles', 'vehicleTypes', 'people', 'peopleTypes',
             'areas', 'militaryOrganizations', 'representations'
         ]
+        
+        # Node statistics sections, computed together from one shared node table
+        self.node_aggregator = default_node_aggregator()
+        
+        # Sampled betweenness, grown until the top 10 is stable
+        self.betweenness_estimator = BetweennessEstimator(top_n=10)
+        
+        # Path length and diameter, approximated above a node threshold
+        self.path_statistics = PathStatistics()
+        
+        # Clustering, betweenness, closeness and path metrics per connected component
+        self.component_analytics = ComponentAnalytics(self.betweenness_estimator, self.path_statistics)
+        
+        # Eigenvector, PageRank and Katz centrality on a sparse adjacency matrix
+        self.sparse_centrality = SparseCentrality()
+        
+        # Threads running independent comprehensive report sections (None for the executor default)
+        self.report_workers = None
     
-    def generate_statistics(self, graph: nx.Graph, database: Dict) -> Dict:
-        """Generate comprehensive statistics for a graph and database."""
+    def generate_statistics(self, graph: nx.Graph, database: Dict, refresh_stale: bool = True,
+                            sections: Optional[Iterable[str]] = None) -> Dict:
+        """Generate comprehensive statistics for a graph and database.
+
+        Counts, breakdowns, degree distribution and components come from the
+        graph's incremental statistics. Whole-graph sections are cached
+        between changes; once a change has made them stale they are recomputed
+        here, unless refresh_stale is False, in which case the cached values
+        are returned and listed under metadata['stale_sections']. Only the
+        requested sections (all by default) are computed, besides metadata.
+        """
         logger.info("Generating comprehensive statistics")
         
-        stats = {
-            'metadata': self._get_metadata(graph, database),
-            'node_statistics': self._analyze_nodes(graph),
-            'edge_statistics': self._analyze_edges(graph),
-            'connectivity': self._analyze_connectivity(graph),
-            'centrality': self._analyze_centrality(graph),
-            'entity_analysis': self._analyze_entities(graph),
-            'temporal_analysis': self._analyze_temporal_data(graph),
-            'geographic_analysis': self._analyze_geographic_data(graph),
-            'technology_analysis': self._analyze_technology_data(graph)
+        names = list(STATISTICS_SECTIONS) if sections is None else list(sections)
+        unknown = [name for name in names if name not in STATISTICS_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown statistics sections: {unknown}")
+        
+        incremental = get_incremental_statistics(graph)
+        
+        def node_sections():
+            return incremental.cached(
+                'node_sections', lambda: self.node_aggregator.run(graph, GRAPH_NODE_SECTIONS), refresh_stale)
+        
+        def component_metrics():
+            return incremental.cached(
+                'component_metrics', lambda: self.component_analytics.analyze(graph), refresh_stale)
+        
+        builders = {
+            'node_statistics': incremental.node_statistics,
+            'edge_statistics': lambda: self._analyze_edges(graph),
+            'connectivity': lambda: self._analyze_connectivity(graph, component_metrics()),
+            'centrality': lambda: incremental.cached(
+                'centrality', lambda: self._analyze_centrality(graph, component_metrics()), refresh_stale),
+            'entity_analysis': lambda: self._analyze_entities(node_sections(), incremental.breakdown_sections()),
+            'temporal_analysis': lambda: node_sections()['temporal'],
+            'geographic_analysis': lambda: node_sections()['geographic'],
+            'technology_analysis': lambda: node_sections()['technology']
         }
         
+        stats = {'metadata': self._get_metadata(graph, database, incremental.entity_counts())}
+        for name in STATISTICS_SECTIONS:
+            if name in names:
+                stats[name] = builders[name]()
+        
+        if incremental.stale:
+            stats['metadata']['stale_sections'] = sorted(incremental.stale)
+        
         return stats
     
-    def _get_metadata(self, graph: nx.Graph, database: Dict) -> Dict:
+    def stored_statistics(self, graph: nx.Graph, database: Dict, store: StatisticsStore, checksum: str,
+                          filters: Optional[Dict[str, Any]] = None, refresh: Iterable[str] = ()) -> Dict:
+        """Get statistics for a graph built from a database with a checksum, reusing stored sections.
+
+        Sections missing from the store, or listed in refresh, are generated
+        and stored; metadata is always generated. Sections come back as the
+        store returns them (JSON types, string keys) whether or not they were
+        just generated. The graph must be the one the checksummed database
+        and filters produce, not one edited since.
+        """
+        key = store.make_key(checksum, filters)
+        refresh = set(refresh)
+        stored = store.load(key, [name for name in STATISTICS_SECTIONS if name not in refresh])
+        
+        missing = [name for name in STATISTICS_SECTIONS if name not in stored]
+        stats = self.generate_statistics(graph, database, sections=missing)
+        stats.update(store.save(key, {name: stats[name] for name in missing}))
+        
+        logger.info(f"Statistics: {len(stored)} sections from the store, {len(missing)} generated")
+        stats.update(stored)
+        return {name: stats[name] for name in ['metadata'] + STATISTICS_SECTIONS}
+    
+    def apply_changes(self, graph: nx.Graph, changes: GraphChangeSet):
+        """Update a graph's statistics after nodes or edges were added to or removed from it in place.
+        
+        Counts are updated from the change set alone; whole-graph sections are
+        only marked stale, and recomputed by the next generate_statistics call.
+        """
+        apply_graph_changes(graph, changes)
+    
+    def _get_metadata(self, graph: nx.Graph, database: Dict, entity_counts: Dict[str, int]) -> Dict:
         """Get metadata about the graph and database."""
         return {
             'generated_at': datetime.now().isoformat(),
             'node_count': len(graph.nodes),
             'edge_count': len(graph.edges),
             'database_info': graph.graph.get('database_info', {}),
-            'entity_counts': self._count_entities_by_type(graph)
+            'entity_counts': entity_counts
         }
     
-    def _analyze_nodes(self, graph: nx.Graph) -> Dict:
-        """Analyze node-related statistics."""
-        node_stats = {
-            'total_nodes': len(graph.nodes),
-            'node_types': Counter(),
-            'degree_distribution': Counter(),
-            'isolated_nodes': []
-        }
-        
-        for node, data in graph.nodes(data=True):
-            node_type = data.get('type', 'unknown')
-            node_stats['node_types'][node_type] += 1
-            
-            degree = graph.degree(node)
-            node_stats['degree_distribution'][degree] += 1
-            
-            if degree == 0:
-                node_stats['isolated_nodes'].append(node)
-        
-        # Calculate degree statistics
-        degrees = [graph.degree(node) for node in graph.nodes()]
-        if degrees:
-            node_stats['degree_stats'] = {
-                'mean': np.mean(degrees),
-                'median': np.median(degrees),
-                'std': np.std(degrees),
-                'min': min(degrees),
-                'max': max(degrees)
-            }
-        
-        return node_stats
-    
     def _analyze_edges(self, graph: nx.Graph) -> Dict:
         """Analyze edge-related statistics."""
-        edge_stats = {
-            'total_edges': len(graph.edges),
-            'relationship_types': Counter(),
-            'edge_weight_distribution': Counter()
-        }
-        
-        for source, target, data in graph.edges(data=True):
-            relationship = data.get('relationship', 'unknown')
-            edge_stats['relationship_types'][relationship] += 1
-            
-            weight = data.get('weight', 1)
-            edge_stats['edge_weight_distribution'][weight] += 1
-        
-        return edge_stats
+        return get_incremental_statistics(graph).edge_statistics()
     
-    def _analyze_connectivity(self, graph: nx.Graph) -> Dict:
+    def _analyze_connectivity(self, graph: nx.Graph, component_metrics: Optional[Dict] = None) -> Dict:
         """Analyze graph connectivity properties."""
+        incremental = get_incremental_statistics(graph)
+        component_sizes = incremental.component_sizes(graph)
         connectivity = {
-            'is_connected': nx.is_connected(graph),
-            'number_of_components': nx.number_connected_components(graph),
-            'density': nx.density(graph)
+            'is_connected': len(component_sizes) == 1,
+            'number_of_components': len(component_sizes),
+            'density': incremental.density()
         }
         
         if len(graph.nodes) > 0:
+            component_metrics = component_metrics or self.component_analytics.analyze(graph)
+            
             # Component analysis
-            components = list(nx.connected_components(graph))
-            connectivity['component_sizes'] = [len(comp) for comp in components]
-            connectivity['largest_component_size'] = len(max(components, key=len)) if components else 0
+            connectivity['component_sizes'] = component_sizes
+            connectivity['largest_component_size'] = max(component_sizes)
             
             # Clustering
-            connectivity['average_clustering'] = nx.average_clustering(graph)
+            connectivity['average_clustering'] = component_metrics['average_clustering']
             
             # Path lengths (for largest component only if disconnected)
-            if nx.is_connected(graph):
-                connectivity['average_shortest_path_length'] = nx.average_shortest_path_length(graph)
-                connectivity['diameter'] = nx.diameter(graph)
-            else:
+            path_lengths = component_metrics['path_lengths']
+            if connectivity['is_connected']:
+                average, diameter, method = path_lengths
+                connectivity['average_shortest_path_length'] = average
+                connectivity['diameter'] = diameter
+                connectivity['path_statistics'] = method
+            elif connectivity['largest_component_size'] > 1:
                 # Analyze largest component
-                largest_component = max(components, key=len) if components else set()
-                if len(largest_component) > 1:
-                    subgraph = graph.subgraph(largest_component)
-                    connectivity['largest_component_avg_path'] = nx.average_shortest_path_length(subgraph)
-                    connectivity['largest_component_diameter'] = nx.diameter(subgraph)
+                average, diameter, method = path_lengths
+                connectivity['largest_component_avg_path'] = average
+                connectivity['largest_component_diameter'] = diameter
+                connectivity['path_statistics'] = method
         
         return connectivity
     
-    def _analyze_centrality(self, graph: nx.Graph) -> Dict:
+    def _analyze_centrality(self, graph: nx.Graph, component_metrics: Optional[Dict] = None) -> Dict:
         """Analyze centrality measures for important nodes."""
         centrality = {}
         
         if len(graph.nodes) == 0:
             return centrality
         
+        component_metrics = component_metrics or self.component_analytics.analyze(graph)
+        
         # Degree centrality
         degree_centrality = nx.degree_centrality(graph)
         centrality['top_degree_centrality'] = self._get_top_n(degree_centrality, 10)
         
-        # Betweenness centrality (sample for large graphs)
-        k = min(100, len(graph.nodes)) if len(graph.nodes) > 100 else None
-        betweenness_centrality = nx.betweenness_centrality(graph, k=k)
-        centrality['top_betweenness_centrality'] = self._get_top_n(betweenness_centrality, 10)
+        # Betweenness centrality (per component, adaptively sampled for large components)
+        centrality['top_betweenness_centrality'] = self._get_top_n(component_metrics['betweenness'], 10)
+        centrality['betweenness_sampling'] = component_metrics['betweenness_sampling']
         
         # Closeness centrality (for connected components)
-        if nx.is_connected(graph):
-            closeness_centrality = nx.closeness_centrality(graph)
-            centrality['top_closeness_centrality'] = self._get_top_n(closeness_centrality, 10)
+        if component_metrics['closeness'] is not None:
+            centrality['top_closeness_centrality'] = self._get_top_n(component_metrics['closeness'], 10)
         
-        # Eigenvector centrality
+        # Eigenvector, PageRank and Katz centrality
         try:
-            eigenvector_centrality = nx.eigenvector_centrality(graph, max_iter=1000)
-            centrality['top_eigenvector_centrality'] = self._get_top_n(eigenvector_centrality, 10)
+            spectral = self.sparse_centrality.compute(graph)
+            centrality['top_eigenvector_centrality'] = self._get_top_n(spectral['eigenvector'], 10)
+            centrality['top_pagerank_centrality'] = self._get_top_n(spectral['pagerank'], 10)
+            centrality['top_katz_centrality'] = self._get_top_n(spectral['katz'], 10)
         except (nx.NetworkXError, nx.PowerIterationFailedConvergence):
-            logger.warning("Could not compute eigenvector centrality")
+            logger.warning("Could not compute spectral centrality")
         
         return centrality
     
@@ -167,268 +253,11 @@ class StatisticsGenerator:
         """Get top N nodes by centrality score."""
         return sorted(centrality_dict.items(), key=lambda x: x[1], reverse=True)[:n]
     
-    def _analyze_entities(self, graph: nx.Graph) -> Dict:
-        """Analyze entity-specific statistics."""
-        entity_analysis = {
-            'countries': self._analyze_countries(graph),
-            'vehicles': self._analyze_vehicles(graph),
-            'organizations': self._analyze_organizations(graph),
-            'people': self._analyze_people(graph),
-            'areas': self._analyze_areas(graph)
-        }
-        
-        return entity_analysis
-    
-    def _analyze_countries(self, graph: nx.Graph) -> Dict:
-        """Analyze country-specific statistics."""
-        countries = {}
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'country':
-                country_id = node
-                country_name = data.get('label', country_id)
-                
-                # Count assets owned by this country
-                owned_assets = 0
-                asset_types = Counter()
-                
-                for neighbor in graph.neighbors(node):
-                    neighbor_data = graph.nodes[neighbor]
-                    edge_data = graph.edges[node, neighbor]
-                    
-                    if edge_data.get('relationship') in ['owner', 'owned_by']:
-                        owned_assets += 1
-                        asset_type = neighbor_data.get('type', 'unknown')
-                        asset_types[asset_type] += 1
-                
-                countries[country_name] = {
-                    'total_assets': owned_assets,
-                    'asset_types': dict(asset_types),
-                    'connections': graph.degree(node)
-                }
-        
-        return countries
-    
-    def _analyze_vehicles(self, graph: nx.Graph) -> Dict:
-        """Analyze vehicle-specific statistics."""
-        vehicles = {
-            'total_count': 0,
-            'by_type': Counter(),
-            'by_country': Counter(),
-            'by_manufacturer': Counter(),
-            'by_decade': Counter(),
-            'age_distribution': Counter()
-        }
-        
-        current_year = datetime.now().year
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'vehicle':
-                vehicles['total_count'] += 1
-                
-                # Vehicle type
-                vehicle_type = data.get('vehicle_type', 'unknown')
-                vehicles['by_type'][vehicle_type] += 1
-                
-                # Country (owner)
-                owner = data.get('owner', 'unknown')
-                vehicles['by_country'][owner] += 1
-                
-                # Manufacturer
-                manufacturer = data.get('manufacturer', 'unknown')
-                vehicles['by_manufacturer'][manufacturer] += 1
-                
-                # Year analysis
-                year = data.get('year')
-                if year:
-                    decade = (year // 10) * 10
-                    vehicles['by_decade'][f"{decade}s"] += 1
-                    
-                    age = current_year - year
-                    age_group = f"{(age // 10) * 10}-{(age // 10) * 10 + 9} years"
-                    vehicles['age_distribution'][age_group] += 1
-        
-        return vehicles
-    
-    def _analyze_organizations(self, graph: nx.Graph) -> Dict:
-        """Analyze military organization statistics."""
-        organizations = {
-            'total_count': 0,
-            'by_type': Counter(),
-            'by_country': Counter(),
-            'personnel_stats': {}
-        }
-        
-        personnel_numbers = []
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'militaryOrganization':
-                organizations['total_count'] += 1
-                
-                # Organization type
-                org_type = data.get('organization_type', 'unknown')
-                organizations['by_type'][org_type] += 1
-                
-                # Country
-                country = data.get('country', 'unknown')
-                organizations['by_country'][country] += 1
-                
-                # Personnel strength
-                entity_data = data.get('data', {})
-                personnel = entity_data.get('personnelStrength')
-                if personnel and isinstance(personnel, (int, float)):
-                    personnel_numbers.append(personnel)
-        
-        # Personnel statistics
-        if personnel_numbers:
-            organizations['personnel_stats'] = {
-                'total_personnel': sum(personnel_numbers),
-                'average_personnel': np.mean(personnel_numbers),
-                'median_personnel': np.median(personnel_numbers),
-                'largest_organization': max(personnel_numbers),
-                'smallest_organization': min(personnel_numbers)
-            }
-        
-        return organizations
-    
-    def _analyze_people(self, graph: nx.Graph) -> Dict:
-        """Analyze people-related statistics."""
-        people = {
-            'total_count': 0,
-            'by_type': Counter(),
-            'by_nationality': Counter(),
-            'birth_decades': Counter()
-        }
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'person':
-                people['total_count'] += 1
-                
-                # Person types
-                person_types = data.get('person_types', [])
-                if isinstance(person_types, list):
-                    for ptype in person_types:
-                        people['by_type'][ptype] += 1
-                else:
-                    people['by_type']['unknown'] += 1
-                
-                # Nationality
-                nationality = data.get('nationality', 'unknown')
-                people['by_nationality'][nationality] += 1
-                
-                # Birth decade
-                entity_data = data.get('data', {})
-                birth_date = entity_data.get('birthDate')
-                if birth_date:
-                    try:
-                        if isinstance(birth_date, str) and len(birth_date) >= 4:
-                            birth_year = int(birth_date[:4])
-                            birth_decade = (birth_year // 10) * 10
-                            people['birth_decades'][f"{birth_decade}s"] += 1
-                    except (ValueError, TypeError):
-                        pass
-        
-        return people
-    
-    def _analyze_areas(self, graph: nx.Graph) -> Dict:
-        """Analyze area-related statistics."""
-        areas = {
-            'total_count': 0,
-            'by_type': Counter(),
-            'by_country': Counter(),
-            'by_admin_level': Counter()
-        }
-        
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'area':
-                areas['total_count'] += 1
-                
-                # Area type
-                area_type = data.get('area_type', 'unknown')
-                areas['by_type'][area_type] += 1
-                
-                # Country
-                country = data.get('country', 'unknown')
-                areas['by_country'][country] += 1
-                
-                # Administrative level
-                entity_data = data.get('data', {})
-                admin_level = entity_data.get('administrativeLevel', 'unknown')
-                areas['by_admin_level'][admin_level] += 1
-        
-        return areas
-    
-    def _analyze_temporal_data(self, graph: nx.Graph) -> Dict:
-        """Analyze temporal patterns in the data."""
-        temporal = {
-            'technology_timeline': defaultdict(lambda: defaultdict(int)),
-            'service_periods': [],
-            'modernization_trends': {}
-        }
-        
-        for node, data in graph.nodes(data=True):
-            # Extract year information
-            year = data.get('year')
-            entity_type = data.get('type')
-            country = data.get('owner') or data.get('country') or data.get('nationality')
-            
-            if year and country and entity_type in ['vehicle', 'militaryOrganization']:
-                temporal['technology_timeline'][country][year] += 1
-        
-        return temporal
-    
-    def _analyze_geographic_data(self, graph: nx.Graph) -> Dict:
-        """Analyze geographic distribution of assets."""
-        geographic = {
-            'country_assets': defaultdict(int),
-            'regional_distribution': {},
-            'base_locations': Counter()
-        }
-        
-        for node, data in graph.nodes(data=True):
-            entity_type = data.get('type')
-            
-            if entity_type == 'vehicle':
-                owner = data.get('owner')
-                if owner:
-                    geographic['country_assets'][owner] += 1
-            
-            elif entity_type == 'area':
-                area_type = data.get('area_type')
-                if area_type == 'military':
-                    country = data.get('country')
-                    if country:
-                        geographic['base_locations'][country] += 1
-        
-        return geographic
-    
-    def _analyze_technology_data(self, graph: nx.Graph) -> Dict:
-        """Analyze technology and modernization trends."""
-        technology = {
-            'manufacturers': Counter(),
-            'technology_generations': {},
-            'capability_gaps': {},
-            'modernization_patterns': {}
-        }
-        
-        # Manufacturer analysis
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'vehicle':
-                manufacturer = data.get('manufacturer')
-                if manufacturer:
-                    technology['manufacturers'][manufacturer] += 1
-        
-        return technology
-    
-    def _count_entities_by_type(self, graph: nx.Graph) -> Dict[str, int]:
-        """Count entities by type."""
-        counts = Counter()
-        
-        for node, data in graph.nodes(data=True):
-            entity_type = data.get('type', 'unknown')
-            counts[entity_type] += 1
-        
-        return dict(counts)
+    def _analyze_entities(self, node_sections: Dict[str, Any],
+                          breakdowns: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict:
+        """Collect the entity-specific sections of a node aggregation, with up-to-date breakdowns if given."""
+        breakdowns = breakdowns or {}
+        return {name: {**node_sections[name], **breakdowns.get(name, {})} for name in ENTITY_SECTIONS}
     
     def compare_countries(self, graph: nx.Graph, countries: List[str], 
                          databases: List[str]) -> Dict:
@@ -444,9 +273,9 @@ class StatisticsGenerator:
             'organization_types': Counter()
         }
         
-        # Analyze each country
-        for country in countries:
-            comparison['countries'][country] = self._analyze_single_country(graph, country)
+        # Per-country statistics, technology timelines and asset types in one pass over the nodes
+        country_sections = CountryComparison(countries).compare(graph)
+        comparison['countries'] = country_sections['countries']
         
         # Generate comparative metrics
         comparison['comparison_metrics'] = self._generate_comparison_metrics(comparison['countries'])
@@ -455,69 +284,13 @@ class StatisticsGenerator:
         comparison['relative_strengths'] = self._analyze_relative_strengths(comparison['countries'])
         
         # Technology timeline comparison
-        comparison['technology_timeline'] = self._compare_technology_timelines(graph, countries)
+        comparison['technology_timeline'] = country_sections['technology_timeline']
         
         # Asset types distribution
-        comparison['asset_types'] = self._compare_asset_types(graph, countries)
+        comparison['asset_types'] = country_sections['asset_types']
         
         return comparison
     
-    def _analyze_single_country(self, graph: nx.Graph, country: str) -> Dict:
-        """Analyze a single country's military capabilities."""
-        country_stats = {
-            'total_assets': 0,
-            'vehicles': 0,
-            'organizations': 0,
-            'areas': 0,
-            'people': 0,
-            'vehicle_types': Counter(),
-            'organization_types': Counter(),
-            'manufacturers': Counter(),
-            'timeline': defaultdict(int)
-        }
-        
-        for node, data in graph.nodes(data=True):
-            # Check if entity belongs to this country
-            belongs_to_country = False
-            entity_type = data.get('type')
-            
-            if data.get('owner', '').lower().find(country.lower()) != -1:
-                belongs_to_country = True
-            elif data.get('country', '').lower().find(country.lower()) != -1:
-                belongs_to_country = True
-            elif data.get('nationality', '').lower().find(country.lower()) != -1:
-                belongs_to_country = True
-            elif entity_type == 'country' and data.get('label', '').lower().find(country.lower()) != -1:
-                belongs_to_country = True
-            
-            if belongs_to_country:
-                country_stats['total_assets'] += 1
-                
-                if entity_type == 'vehicle':
-                    country_stats['vehicles'] += 1
-                    vehicle_type = data.get('vehicle_type', 'unknown')
-                    country_stats['vehicle_types'][vehicle_type] += 1
-                    manufacturer = data.get('manufacturer', 'unknown')
-                    country_stats['manufacturers'][manufacturer] += 1
-                    
-                elif entity_type == 'militaryOrganization':
-                    country_stats['organizations'] += 1
-                    org_type = data.get('organization_type', 'unknown')
-                    country_stats['organization_types'][org_type] += 1
-                    
-                elif entity_type == 'area':
-                    country_stats['areas'] += 1
-                    
-                elif entity_type == 'person':
-                    country_stats['people'] += 1
-                
-                # Timeline data
-                year = data.get('year')
-                if year:
-                    country_stats['timeline'][year] += 1
-        
-        return country_stats
-    
     def _generate_comparison_metrics(self, countries_data: Dict) -> Dict:
         """Generate comparative metrics between countries."""
         metrics = {
@@ -581,97 +354,62 @@ class StatisticsGenerator:
         
         return strengths
     
-    def _compare_technology_timelines(self, graph: nx.Graph, countries: List[str]) -> Dict:
-        """Compare technology development timelines between countries."""
-        timelines = {}
-        
-        for country in countries:
-            timeline = defaultdict(int)
-            
-            for node, data in graph.nodes(data=True):
-                # Check if entity belongs to this country
-                belongs_to_country = False
-                if data.get('owner', '').lower().find(country.lower()) != -1:
-                    belongs_to_country = True
-                elif data.get('country', '').lower().find(country.lower()) != -1:
-                    belongs_to_country = True
-                
-                if belongs_to_country:
-                    year = data.get('year')
-                    if year and data.get('type') in ['vehicle', 'militaryOrganization']:
-                        timeline[year] += 1
-            
-            timelines[country] = dict(timeline)
-        
-        return timelines
-    
-    def _compare_asset_types(self, graph: nx.Graph, countries: List[str]) -> Dict:
-        """Compare asset type distributions between countries."""
-        asset_types = {}
-        
-        for country in countries:
-            types = Counter()
-            
-            for node, data in graph.nodes(data=True):
-                # Check if entity belongs to this country
-                belongs_to_country = False
-                if data.get('owner', '').lower().find(country.lower()) != -1:
-                    belongs_to_country = True
-                elif data.get('country', '').lower().find(country.lower()) != -1:
-                    belongs_to_country = True
-                
-                if belongs_to_country:
-                    entity_type = data.get('type', 'unknown')
-                    types[entity_type] += 1
-            
-            asset_types[country] = dict(types)
-        
-        return asset_types
-    
     def generate_comprehensive_report(self, graph: nx.Graph, databases: Dict, 
                                     selected_databases: List[str]) -> Dict:
-        """Generate a comprehensive analysis report across multiple databases."""
-        logger.info("Generating comprehensive analysis report")
+        """Generate a comprehensive analysis report across multiple databases.
         
-        report = {
-            'executive_summary': {},
-            'database_overview': {},
-            'entity_statistics': {},
-            'relationship_analysis': {},
-            'country_comparison': {},
-            'technology_analysis': {},
-            'timeline_analysis': {},
-            'recommendations': {}
-        }
-        
-        # Executive summary
-        report['executive_summary'] = self._generate_executive_summary(graph, databases)
-        
-        # Database overview
-        report['database_overview'] = self._analyze_database_coverage(databases, selected_databases)
-        
-        # Entity statistics
-        report['entity_statistics'] = self._analyze_entities(graph)
-        
-        # Relationship analysis
-        report['relationship_analysis'] = self._analyze_relationship_patterns(graph)
+        Sections and the intermediates they share run as a dependency graph
+        on a thread pool; per-step timings are reported under 'report_timings'.
+        """
+        logger.info("Generating comprehensive analysis report")
         
-        # Country comparison
         major_countries = ['UK', 'USA', 'Russia', 'China', 'Iran', 'Poland', 'Sweden', 'Finland']
-        report['country_comparison'] = self.compare_countries(graph, major_countries, selected_databases)
-        
-        # Technology analysis
-        report['technology_analysis'] = self._analyze_technology_trends(graph)
-        
-        # Timeline analysis
-        report['timeline_analysis'] = self._analyze_temporal_data(graph)
-        
-        # Recommendations
-        report['recommendations'] = self._generate_recommendations(report)
-        
+        pipeline = ReportPipeline(self.report_workers)
+        
+        # Shared intermediates, each computed once. Per-graph indexes are built up front so
+        # that concurrent sections do not each build them
+        pipeline.add('graph_indexes', lambda: self._build_report_indexes(graph), section=False)
+        pipeline.add('node_sections', lambda: self.node_aggregator.run(
+            graph, ['entity_counts', 'temporal'] + ENTITY_SECTIONS), after=['graph_indexes'], section=False)
+        pipeline.add('data_quality_score', lambda: self._calculate_data_quality_score(graph),
+                     after=['graph_indexes'], section=False)
+        
+        # Report sections, in report order
+        pipeline.add('executive_summary', lambda node_sections, quality_score: self._generate_executive_summary(
+            graph, databases, node_sections['entity_counts'], quality_score),
+            inputs=['node_sections', 'data_quality_score'])
+        pipeline.add('database_overview', lambda: self._analyze_database_coverage(databases, selected_databases))
+        pipeline.add('entity_statistics', self._analyze_entities, inputs=['node_sections'])
+        pipeline.add('relationship_analysis', lambda: self._analyze_relationship_patterns(graph),
+                     after=['graph_indexes'])
+        # Communities (formations and clusters) with summaries of the largest
+        pipeline.add('community_analysis', lambda: get_community_index(graph).summaries(graph),
+                     after=['graph_indexes'])
+        pipeline.add('country_comparison', lambda: self.compare_countries(graph, major_countries, selected_databases),
+                     after=['graph_indexes'])
+        pipeline.add('technology_analysis', lambda: self._analyze_technology_trends(graph), after=['graph_indexes'])
+        pipeline.add('timeline_analysis', lambda node_sections: node_sections['temporal'], inputs=['node_sections'])
+        pipeline.add('recommendations', lambda summary, overview, entities: self._generate_recommendations({
+            'executive_summary': summary, 'database_overview': overview, 'entity_statistics': entities
+        }), inputs=['executive_summary', 'database_overview', 'entity_statistics'])
+        
+        report, timings = pipeline.run()
+        report['report_timings'] = timings
         return report
     
-    def _generate_executive_summary(self, graph: nx.Graph, databases: Dict) -> Dict:
+    def _build_report_indexes(self, graph: nx.Graph):
+        """Build the per-graph indexes that report sections share.
+        
+        Community detection writes node and graph attributes, so it runs
+        here, before any section reads the graph from another thread.
+        """
+        get_node_table(graph)
+        get_node_type_index(graph)
+        get_relationship_index(graph)
+        get_community_index(graph)
+    
+    def _generate_executive_summary(self, graph: nx.Graph, databases: Dict, entity_counts: Dict[str, int],
+                                    data_quality_score: Optional[float] = None) -> Dict:
         """Generate an executive summary of the analysis."""
         summary = {
             'total_entities': len(graph.nodes),
@@ -682,14 +420,14 @@ class StatisticsGenerator:
         }
         
         # Key findings
-        entity_counts = self._count_entities_by_type(graph)
-        
         if entity_counts:
             largest_category = max(entity_counts.items(), key=lambda x: x[1])
             summary['key_findings'].append(f"Largest entity category: {largest_category[0]} ({largest_category[1]} entities)")
         
-        # Calculate data quality score
-        summary['data_quality_score'] = self._calculate_data_quality_score(graph)
+        # Data quality score, unless already calculated
+        if data_quality_score is None:
+            data_quality_score = self._calculate_data_quality_score(graph)
+        summary['data_quality_score'] = data_quality_score
         
         return summary
     
@@ -721,14 +459,13 @@ class StatisticsGenerator:
         # Create relationship matrix
         relationship_counts = defaultdict(lambda: defaultdict(int))
         
-        for source, target, edge_data in graph.edges(data=True):
+        for source, target in graph.edges():
             source_type = graph.nodes[source].get('type', 'unknown')
             target_type = graph.nodes[target].get('type', 'unknown')
-            relationship = edge_data.get('relationship', 'unknown')
-            
             relationship_counts[source_type][target_type] += 1
         
         patterns['relationship_matrix'] = dict(relationship_counts)
+        patterns['relationship_strength'] = get_relationship_index(graph).counts()
         
         return patterns
     
@@ -742,11 +479,10 @@ class StatisticsGenerator:
         }
         
         # Top manufacturers
-        for node, data in graph.nodes(data=True):
-            if data.get('type') == 'vehicle':
-                manufacturer = data.get('manufacturer')
-                if manufacturer:
-                    trends['top_manufacturers'][manufacturer] += 1
+        for node in get_node_type_index(graph).nodes_of_type('vehicle'):
+            manufacturer = graph.nodes[node].get('manufacturer')
+            if manufacturer:
+                trends['top_manufacturers'][manufacturer] += 1
         
         return trends
     
@@ -767,32 +503,21 @@ class StatisticsGenerator:
     
     def _calculate_completeness_score(self, graph: nx.Graph) -> float:
         """Calculate completeness score based on filled fields."""
-        total_fields = 0
-        filled_fields = 0
-        
         required_fields = ['type', 'label']
         optional_fields = ['year', 'country', 'manufacturer', 'owner']
         
-        for node, data in graph.nodes(data=True):
-            for field in required_fields + optional_fields:
-                total_fields += 1
-                if field in data and data[field]:
-                    filled_fields += 1
+        # Nodes x fields matrix of filled (present and truthy) attributes
+        filled = get_node_table(graph).fill_matrix(required_fields + optional_fields)
         
-        return filled_fields / max(1, total_fields)
+        return int(filled.sum()) / max(1, filled.size)
     
     def _calculate_consistency_score(self, graph: nx.Graph) -> float:
         """Calculate consistency score based on data format uniformity."""
-        # Simple consistency check - could be expanded
-        consistent_items = 0
-        total_items = 0
-        
-        for node, data in graph.nodes(data=True):
-            total_items += 1
-            if 'type' in data and data['type'] in ['country', 'vehicle', 'person', 'area', 'militaryOrganization']:
-                consistent_items += 1
+        # Simple consistency check - nodes whose type resolves to a known entity type
+        type_codes = get_node_type_index(graph).codes
+        consistent_items = int(np.count_nonzero(NODE_TYPES.is_builtin(type_codes)))
         
-        return consistent_items / max(1, total_items)
+        return consistent_items / max(1, len(type_codes))
     
     def _generate_recommendations(self, report: Dict) -> List[str]:
         """Generate recommendations based on the analysis."""
@@ -823,19 +548,8 @@ class StatisticsGenerator:
         rows = []
         
         for node, data in graph.nodes(data=True):
-            row = {
-                'id': node,
-                'type': data.get('type', ''),
-                'label': data.get('label', ''),
-                'country': data.get('country', ''),
-                'owner': data.get('owner', ''),
-                'manufacturer': data.get('manufacturer', ''),
-                'year': data.get('year', ''),
-                'vehicle_type': data.get('vehicle_type', ''),
-                'organization_type': data.get('organization_type', ''),
-                'area_type': data.get('area_type', ''),
-                'connections': graph.degree(node)
-            }
+            row = self._node_row(node, data)
+            row['connections'] = graph.degree(node)
             rows.append(row)
         
         # Write to CSV
@@ -848,6 +562,40 @@ class StatisticsGenerator:
         
         logger.info(f"Exported {len(rows)} entities to {filename}")
     
+    @staticmethod
+    def _node_row(node: str, data: Dict) -> Dict[str, Any]:
+        """Get the CSV columns describing one node."""
+        return {
+            'id': node,
+            'type': data.get('type', ''),
+            'label': data.get('label', ''),
+            'country': data.get('country', ''),
+            'owner': data.get('owner', ''),
+            'manufacturer': data.get('manufacturer', ''),
+            'year': data.get('year', ''),
+            'vehicle_type': data.get('vehicle_type', ''),
+            'organization_type': data.get('organization_type', ''),
+            'area_type': data.get('area_type', '')
+        }
+    
+    def export_nodes_to_csv(self, nodes: Iterable[Tuple[str, Dict]], filename: str) -> int:
+        """Export (node id, attributes) pairs to CSV as they arrive, e.g. from a streaming filter."""
+        logger.info(f"Exporting nodes to {filename}")
+        
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = None
+            for node, data in nodes:
+                row = self._node_row(node, data)
+                if writer is None:
+                    writer = csv.DictWriter(csvfile, fieldnames=row.keys())
+                    writer.writeheader()
+                writer.writerow(row)
+                count += 1
+        
+        logger.info(f"Exported {count} entities to {filename}")
+        return count
+    
     def export_edges_to_csv(self, graph: nx.Graph, filename: str):
         """Export graph edges to CSV format."""
         logger.info(f"Exporting graph edges to {filename}")
@@ -0,0 +1,137 @@
+"""
+Statistics Store for IES4 Military Database Analysis Suite
+Persistent SQLite store of generated statistics sections keyed by database
+checksum, filter spec and statistics version.
+"""
+
+import json
+import sqlite3
+import time
+import logging
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Any, Tuple
+
+try:
+    from .filter_cache import canonical_filter_spec
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from filter_cache import canonical_filter_spec
+
+logger = logging.getLogger(__name__)
+
+# (database checksum, canonical filter spec, statistics version)
+StatisticsKey = Tuple[str, str, int]
+
+
+class StatisticsStore:
+    """Statistics sections stored on disk, one row per section.
+
+    Sections are stored as JSON, converted the way the statistics JSON files
+    are written (json.dump with default=str), so they come back as plain
+    dicts and lists with string keys, as if read from those files. A key
+    only matches results generated from the same database content, filters
+    and statistics version, so stored sections never go stale; sections are
+    stored separately so that some can be refreshed without the others.
+    """
+
+    def __init__(self, path: Path, version: int):
+        """Initialize the store, creating the database file if needed."""
+        self.path = Path(path)
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sections ("
+                " checksum TEXT NOT NULL, filters TEXT NOT NULL, version INTEGER NOT NULL,"
+                " section TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL,"
+                " PRIMARY KEY (checksum, filters, version, section))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per operation, so the store can be shared between threads."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    def make_key(self, checksum: str, filters: Optional[Dict[str, Any]] = None) -> StatisticsKey:
+        """Build the key for statistics of a database with a filter spec.
+
+        Filter specs are canonicalised like filter cache keys, so specs that
+        differ only in the order of set-valued filters share a key, and
+        positional values such as bbox coordinates do not.
+        """
+        return checksum, canonical_filter_spec(filters or {}), self.version
+
+    def load(self, key: StatisticsKey, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Get the stored sections for a key (all of them, or the requested ones that are stored)."""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT section, payload FROM sections WHERE checksum = ? AND filters = ? AND version = ?", key
+            ).fetchall()
+
+        stored = {section: payload for section, payload in rows}
+        names = list(stored) if sections is None else [name for name in sections if name in stored]
+        self.hits += len(names)
+        if sections is not None:
+            self.misses += sum(1 for name in sections if name not in stored)
+
+        return {name: json.loads(stored[name]) for name in names}
+
+    def save(self, key: StatisticsKey, sections: Dict[str, Any]) -> Dict[str, Any]:
+        """Store sections for a key, replacing any stored versions of them.
+
+        Returns the sections as load will return them, so callers can hand
+        out freshly generated and stored sections in the same shape.
+        """
+        if not sections:
+            return {}
+
+        created_at = time.time()
+        payloads = {name: json.dumps(value, default=str) for name, value in sections.items()}
+        rows = [key + (name, payload, created_at) for name, payload in payloads.items()]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?, ?)", rows)
+        logger.debug(f"Stored statistics sections {sorted(sections)} for checksum {key[0]}")
+        return {name: json.loads(payload) for name, payload in payloads.items()}
+
+    def invalidate(self, checksum: Optional[str] = None, sections: Optional[Iterable[str]] = None) -> int:
+        """Delete stored sections, for one checksum and/or some sections only; returns the rows removed."""
+        conditions, parameters = [], []
+        if checksum is not None:
+            conditions.append("checksum = ?")
+            parameters.append(checksum)
+        if sections is not None:
+            sections = list(sections)
+            conditions.append(f"section IN ({', '.join('?' * len(sections))})")
+            parameters.extend(sections)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with closing(self._connect()) as connection, connection:
+            removed = connection.execute(f"DELETE FROM sections{where}", parameters).rowcount
+        return removed
+
+    def prune(self):
+        """Delete sections stored by other statistics versions."""
+        with closing(self._connect()) as connection, connection:
+            removed = connection.execute("DELETE FROM sections WHERE version != ?", (self.version,)).rowcount
+        logger.info(f"Pruned {removed} statistics sections of old versions")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and size metrics."""
+        with closing(self._connect()) as connection:
+            entries, keys = connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT checksum || char(0) || filters) FROM sections WHERE version = ?",
+                (self.version,)
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'path': str(self.path),
+            'version': self.version,
+            'sections': entries,
+            'keys': keys,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
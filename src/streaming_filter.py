@@ -0,0 +1,281 @@
+"""
+Streaming Filter for IES4 Military Database Analysis Suite
+Evaluates attribute filters against entities as they are parsed from a database file,
+without loading the whole file or building a graph.
+"""
+
+import json
+import logging
+from numbers import Number
+from pathlib import Path
+from typing import Dict, List, Tuple, Iterator, Iterable, Callable, Any, Optional, Union
+
+try:
+    from .graph_builder import GraphBuilder
+    from .node_types import NODE_TYPES, node_type_code
+    from .attribute_index import AttributeIndex, normalize_value
+    from .text_index import TextIndex
+    from .numeric_index import parse_ranges
+    from .equipment_categories import EquipmentClassifier
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_builder import GraphBuilder
+    from node_types import NODE_TYPES, node_type_code
+    from attribute_index import AttributeIndex, normalize_value
+    from text_index import TextIndex
+    from numeric_index import parse_ranges
+    from equipment_categories import EquipmentClassifier
+
+logger = logging.getLogger(__name__)
+
+# Filters that only look at one entity; the rest need edges, degrees or other nodes
+STREAMING_FILTERS = [
+    'type', 'year', 'year_range', 'country', 'manufacturer', 'owner', 'vehicle_type',
+    'organization_type', 'area_type', 'equipment_category', 'keyword'
+]
+
+Predicate = Callable[[str, Dict[str, Any]], bool]
+
+
+class JsonEntityStream:
+    """Incremental reader yielding the elements of top-level entity arrays of a JSON object.
+
+    The file is read in chunks and each entity is decoded on its own, so memory
+    use is bounded by the largest single entity rather than the file size.
+    """
+
+    WHITESPACE = ' \t\n\r'
+
+    def __init__(self, file, chunk_size: int = 64 * 1024):
+        """Initialize the reader over an open text file."""
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping consumed text; returns False at end of file."""
+        if self.eof:
+            return False
+        # Grow reads with the pending text so that very large values are decoded in linear time
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.position))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self) -> str:
+        """Get the next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in self.WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer) or not self._fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def _expect(self, characters: str) -> str:
+        """Consume the next non-whitespace character, which must be one of characters."""
+        char = self._peek()
+        if not char or char not in characters:
+            raise ValueError(f"Invalid JSON: expected one of {characters!r}, found {char or 'end of file'!r}")
+        self.position += 1
+        return char
+
+    def _decode(self) -> Any:
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise ValueError(f"Invalid JSON: {e}")
+                continue
+
+            # A number ending exactly at the buffer end may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.position = end
+            return value
+
+    def entities(self, entity_types: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (array name, entity) for each object in the given top-level arrays; other values are skipped."""
+        entity_types = set(entity_types)
+
+        self._expect('{')
+        if self._peek() == '}':
+            return
+
+        while True:
+            key = self._decode()
+            self._expect(':')
+
+            if key in entity_types and self._peek() == '[':
+                self._expect('[')
+                if self._peek() == ']':
+                    self._expect(']')
+                else:
+                    while True:
+                        entity = self._decode()
+                        if isinstance(entity, dict):
+                            yield key, entity
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self._decode()
+
+            if self._expect(',}') == '}':
+                return
+
+
+def iter_database_entities(file_path: Union[str, Path], entity_types: Iterable[str],
+                           chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield (array name, entity) for the entities of a database file as they are parsed."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from JsonEntityStream(f, chunk_size).entities(entity_types)
+
+
+class StreamingFilter:
+    """Matches entities of a database file against a FilterSystem's attribute filters without a graph.
+
+    Entities get the same node attributes GraphBuilder would give them and
+    each filter applies the same matching rules as its index-backed version,
+    so results equal apply_filters() on the built graph for these filters.
+    """
+
+    def __init__(self, filter_system, graph_builder: Optional[GraphBuilder] = None):
+        """Initialize the streaming filter for a filter system."""
+        self.filter_system = filter_system
+        self.graph_builder = graph_builder or GraphBuilder()
+
+    def compile(self, filters: Dict[str, Any]) -> List[Predicate]:
+        """Turn a filter dict into per-node predicates, cheapest first.
+
+        Raises ValueError for filters that need the graph, so callers can fall
+        back to apply_filters().
+        """
+        unsupported = [name for name in filters if name not in STREAMING_FILTERS]
+        if unsupported:
+            raise ValueError(f"Filters need a graph and cannot be streamed: {unsupported}")
+
+        predicates = []
+        for name in sorted(filters, key=STREAMING_FILTERS.index):
+            compile_filter = getattr(self, f'_compile_{name}', None)
+            if compile_filter is not None:
+                predicates.append(compile_filter(filters[name]))
+            else:
+                predicates.append(self._compile_attribute_filter(name, filters[name]))
+        return predicates
+
+    def stream(self, file_path: Union[str, Path], filters: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (node id, node attributes) for entities matching all filters, in file order."""
+        predicates = self.compile(filters)
+
+        scanned = matched = 0
+        for entity_type, entity in iter_database_entities(file_path, self.graph_builder.entity_types):
+            node_id = entity.get('id')
+            if not node_id:
+                continue
+
+            scanned += 1
+            data = self.graph_builder.node_attributes(entity, entity_type)
+            if all(predicate(node_id, data) for predicate in predicates):
+                matched += 1
+                yield node_id, data
+
+        logger.info(f"Streamed {scanned} entities from {file_path}: {matched} matched {len(filters)} filters")
+
+    def _compile_type(self, entity_type: str) -> Predicate:
+        """Match any spelling of an entity type; an unseen type matches nothing."""
+        code = NODE_TYPES.lookup(entity_type)
+        return lambda node, data: node_type_code(data) == code
+
+    def _compile_year(self, year: Union[int, str]) -> Predicate:
+        """Match an exact year."""
+        try:
+            target = int(year)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid year format: {year}")
+            return lambda node, data: False
+        return self._year_predicate([(target, target)])
+
+    def _compile_year_range(self, year_range: Union[str, List[str]]) -> Predicate:
+        """Match years in any of the given ranges."""
+        try:
+            ranges = parse_ranges(year_range)
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid year range format: {year_range}")
+            return lambda node, data: False
+        return self._year_predicate(ranges)
+
+    @staticmethod
+    def _year_predicate(ranges) -> Predicate:
+        """Match nodes whose node or entity year falls in a range, like the year index."""
+        def predicate(node, data):
+            for year in {data.get('year'), data.get('data', {}).get('year')}:
+                if isinstance(year, Number) and not isinstance(year, bool):
+                    if any((low is None or year >= low) and (high is None or year <= high) for low, high in ranges):
+                        return True
+            return False
+        return predicate
+
+    def _compile_attribute_filter(self, name: str, value: Any) -> Predicate:
+        """Match the filter system's (indexed attribute, operation) rules for an attribute filter."""
+        target = normalize_value(value)
+        rules = []
+        for attribute, operation in self.filter_system.attribute_filters[name]:
+            spec = self.filter_system.indexed_attributes[attribute]
+            scope = set(NODE_TYPES.codes(spec.get('node_types', ()))) or None
+            rules.append((spec, scope, operation))
+
+        def matches(key: str, operation: str) -> bool:
+            if operation == 'equals':
+                return key == target
+            if operation == 'startswith':
+                return key.startswith(target)
+            if operation == 'endswith':
+                return key.endswith(target)
+            return target in key
+
+        def predicate(node, data):
+            type_code = node_type_code(data)
+            for spec, scope, operation in rules:
+                if scope is not None and type_code not in scope:
+                    continue
+                # An empty pattern matches every node in scope, as the index does
+                if not target and operation != 'equals':
+                    return True
+                values = AttributeIndex.extract_values(data, spec.get('fields', ()), spec.get('entity_fields', ()),
+                                                       spec.get('entity_names', False))
+                if any(matches(normalize_value(value), operation) for value in values):
+                    return True
+            return False
+
+        return predicate
+
+    def _compile_equipment_category(self, categories: Union[str, List[str]]) -> Predicate:
+        """Match nodes classified into any of the given equipment categories."""
+        if isinstance(categories, str):
+            categories = [categories]
+
+        classifier = EquipmentClassifier(self.filter_system.equipment_categories)
+        mask = 0
+        for category in categories:
+            mask |= classifier.bits.get(category, 0)
+        if not mask:
+            logger.warning(f"No keywords found for categories: {categories}")
+
+        return lambda node, data: bool(mask and classifier.classify(data) & mask)
+
+    def _compile_keyword(self, keyword: str) -> Predicate:
+        """Match a substring of the label, id, names and descriptive fields."""
+        keyword = str(keyword).lower()
+
+        def predicate(node, data):
+            fields = [(field, text.lower()) for field, text in TextIndex.extract_fields(node, data)]
+            return keyword in TextIndex.document_text(fields)
+
+        return predicate
@@ -0,0 +1,266 @@
+"""
+Text Index for IES4 Military Database Analysis Suite
+Tokenised full-text and trigram indexes over entity labels, names and descriptions,
+with BM25 ranking for top-k search.
+"""
+
+import networkx as nx
+import heapq
+import logging
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Set, Iterable, Tuple
+
+try:
+    from .graph_index import get_index
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_index
+
+logger = logging.getLogger(__name__)
+
+TEXT_INDEX = 'text_index'
+
+# Raw entity fields searched in addition to the label, id and names
+TEXT_FIELDS = ['description', 'title', 'model', 'make']
+
+# Separates fields in a node document so substrings never span two fields
+FIELD_SEPARATOR = '\x1f'
+
+# BM25 weight of each field; a term in a label counts three times one in a description
+FIELD_WEIGHTS = {
+    'label': 3.0,
+    'name': 2.0,
+    'identifier': 2.0,
+    'id': 1.0,
+    'title': 1.5,
+    'model': 1.5,
+    'make': 1.0,
+    'description': 1.0
+}
+
+# Fields used for ranking only, so keyword filtering keeps its original scope
+RANKING_ONLY_FIELDS = {'identifier'}
+
+# BM25 term frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score added when the whole query equals a node id or identifier value
+EXACT_MATCH_BOOST = 100.0
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (Unicode aware, so Cyrillic names work)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Get the set of character trigrams in a string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TextIndex:
+    """Inverted token index with prefix search, plus a trigram index for substring queries."""
+
+    def __init__(self):
+        """Initialize an empty text index."""
+        self.documents = {}        # node -> lowercased fields joined by FIELD_SEPARATOR
+        self.postings = {}         # token -> set of nodes
+        self.trigram_postings = {}  # trigram -> set of nodes
+        self.vocabulary = []       # sorted tokens for prefix lookups
+        self.term_weights = defaultdict(dict)  # token -> node -> field-weighted term frequency
+        self.document_lengths = {}  # node -> field-weighted token count
+        self.total_length = 0.0
+        self.exact_keys = defaultdict(set)  # lowercased id or identifier -> nodes
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'TextIndex':
+        """Build the index from every node in a graph."""
+        index = cls()
+        for node, data in graph.nodes(data=True):
+            index.add_document(node, cls.extract_fields(node, data))
+        index.vocabulary = sorted(index.postings)
+
+        logger.debug(f"Indexed {len(index.documents)} documents, {len(index.postings)} tokens, "
+                     f"{len(index.trigram_postings)} trigrams")
+        return index
+
+    @staticmethod
+    def extract_fields(node: str, data: Dict) -> List[Tuple[str, str]]:
+        """Collect the searchable (field, text) pairs of a node: label, id, names, identifiers and descriptive fields."""
+        fields = [('label', str(data.get('label', ''))), ('id', str(node))]
+
+        entity_data = data.get('data', {})
+        for name_obj in entity_data.get('names', []):
+            if isinstance(name_obj, dict) and name_obj.get('value'):
+                fields.append(('name', str(name_obj['value'])))
+
+        for identifier in entity_data.get('identifiers', []):
+            if isinstance(identifier, dict) and identifier.get('value'):
+                fields.append(('identifier', str(identifier['value'])))
+
+        for field in TEXT_FIELDS:
+            if entity_data.get(field):
+                fields.append((field, str(entity_data[field])))
+
+        return fields
+
+    @staticmethod
+    def document_text(fields: Iterable[Tuple[str, str]]) -> str:
+        """Join lowercased (field, text) pairs into the document searched by keyword filters."""
+        return FIELD_SEPARATOR.join(text for field, text in fields if field not in RANKING_ONLY_FIELDS)
+
+    def add_document(self, node: str, fields: Iterable[Tuple[str, str]]):
+        """Index the text fields of one node."""
+        fields = [(field, text.lower()) for field, text in fields]
+        document = self.document_text(fields)
+        self.documents[node] = document
+
+        for token in set(tokenize(document)):
+            self.postings.setdefault(token, set()).add(node)
+
+        for text in document.split(FIELD_SEPARATOR):
+            for trigram in trigrams(text):
+                self.trigram_postings.setdefault(trigram, set()).add(node)
+
+        # Field-weighted term frequencies and document length for BM25
+        length = 0.0
+        for field, text in fields:
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for token in tokenize(text):
+                node_weights = self.term_weights[token]
+                node_weights[node] = node_weights.get(node, 0.0) + weight
+                length += weight
+
+            if field in ('id', 'identifier'):
+                self.exact_keys[text.strip()].add(node)
+
+        self.document_lengths[node] = length
+        self.total_length += length
+
+    def substring(self, text: str) -> Set[str]:
+        """Get nodes whose label, id, names or descriptive fields contain text."""
+        text = text.lower()
+        documents = self.documents
+
+        if len(text) < 3:
+            return {node for node, document in documents.items() if text in document}
+
+        # Intersect trigram postings, smallest first, then verify the candidates
+        postings = sorted((self.trigram_postings.get(t, ()) for t in trigrams(text)), key=len)
+        if not postings or not postings[0]:
+            return set()
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+
+        return {node for node in candidates if text in documents[node]}
+
+    def estimate_substring(self, text: str) -> int:
+        """Bound the number of substring matches by the shortest trigram posting, without verifying candidates."""
+        text = text.lower()
+        if len(text) < 3:
+            return len(self.documents)
+
+        trigram_postings = self.trigram_postings
+        return min((len(trigram_postings.get(t, ())) for t in trigrams(text)), default=0)
+
+    def token(self, token: str, prefix: bool = False) -> Set[str]:
+        """Get nodes containing a token, or any token starting with it when prefix is True."""
+        token = token.lower()
+        if not prefix:
+            return set(self.postings.get(token, ()))
+
+        result = set()
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, token)
+        while position < len(vocabulary) and vocabulary[position].startswith(token):
+            result.update(self.postings[vocabulary[position]])
+            position += 1
+        return result
+
+    def rank(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Tuple[str, float]]]:
+        """Rank nodes for a free-text query with BM25, best first.
+
+        Exact matches of the whole query against a node id or identifier get
+        EXACT_MATCH_BOOST on top of their text score. Only offset + limit
+        results are selected, using a heap, and the total number of matching
+        nodes is returned alongside the requested page.
+        """
+        scores = defaultdict(float)
+
+        document_count = len(self.document_lengths)
+        if document_count:
+            average_length = self.total_length / document_count or 1.0
+            for token in set(tokenize(query)):
+                node_weights = self.term_weights.get(token)
+                if not node_weights:
+                    continue
+
+                frequency = len(node_weights)
+                idf = math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))
+                for node, weight in node_weights.items():
+                    normaliser = BM25_K1 * (1 - BM25_B + BM25_B * self.document_lengths[node] / average_length)
+                    scores[node] += idf * weight * (BM25_K1 + 1) / (weight + normaliser)
+
+        for node in self.exact_keys.get(query.strip().lower(), ()):
+            scores[node] += EXACT_MATCH_BOOST
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+        return len(scores), top[offset:]
+
+    def search(self, terms: Iterable[str], operator: str = 'AND', prefix: bool = False) -> Set[str]:
+        """Search for terms combined with AND/OR.
+
+        Each term is tokenised and all of its tokens must match, so 'T-80' finds
+        documents containing both 't' and '80'. With prefix=True the last token of
+        each term matches as a prefix, which suits search-as-you-type boxes.
+        """
+        term_results = []
+        for term in terms:
+            tokens = tokenize(term)
+            if not tokens:
+                continue
+
+            matches = None
+            for position, token in enumerate(tokens):
+                is_last = position == len(tokens) - 1
+                token_nodes = self.token(token, prefix=prefix and is_last)
+                matches = token_nodes if matches is None else matches & token_nodes
+                if not matches:
+                    break
+            term_results.append(matches)
+
+        return combine_node_sets(term_results, operator)
+
+
+def combine_node_sets(node_sets: List[Set[str]], operator: str = 'AND') -> Set[str]:
+    """Combine node sets by intersection (AND) or union (OR)."""
+    if not node_sets:
+        return set()
+
+    if operator.upper() == 'OR':
+        result = set()
+        for node_set in node_sets:
+            result |= node_set
+        return result
+
+    ordered = sorted(node_sets, key=len)
+    result = set(ordered[0])
+    for node_set in ordered[1:]:
+        if not result:
+            break
+        result &= node_set
+    return result
+
+
+def get_text_index(graph: nx.Graph) -> TextIndex:
+    """Get the text index for a graph, building it if needed."""
+    return get_index(graph, TEXT_INDEX, TextIndex.from_graph)
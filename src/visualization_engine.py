@@ -14,6 +14,13 @@ import logging
 from collections import defaultdict, Counter
 import math
 
+try:
+    from .graph_index import get_relationship_index
+    from .node_types import NODE_TYPES
+except ImportError:  # Imported as a top-level module with src/ on sys.path
+    from graph_index import get_relationship_index
+    from node_types import NODE_TYPES
+
 logger = logging.getLogger(__name__)
 
 class VisualizationEngine:
@@ -128,7 +135,7 @@ class VisualizationEngine:
         
         pos = {}
         for node_type, nodes in node_types.items():
-            y = y_positions.get(node_type, 0)
+            y = y_positions.get(NODE_TYPES.canonical(node_type), 0)
             
             # Arrange nodes of same type horizontally
             if len(nodes) == 1:
@@ -143,13 +150,8 @@ class VisualizationEngine:
     
     def _create_edge_traces(self, graph: nx.Graph, pos: Dict) -> List[go.Scatter]:
         """Create edge traces for the graph."""
-        # Group edges by relationship type
-        edge_groups = defaultdict(list)
-        
-        for edge in graph.edges(data=True):
-            source, target, data = edge
-            relationship = data.get('relationship', 'unknown')
-            edge_groups[relationship].append((source, target))
+        # Edges grouped by relationship type
+        edge_groups = get_relationship_index(graph).edge_groups()
         
         traces = []
         
@@ -223,7 +225,7 @@ class VisualizationEngine:
                 })
             
             # Create trace
-            color = self.entity_colors.get(node_type, '#808080')
+            color = self.entity_colors.get(NODE_TYPES.canonical(node_type), '#808080')
             trace = go.Scatter(
                 x=x_coords, y=y_coords,
                 mode='markers+text' if show_labels else 'markers',
@@ -260,7 +262,7 @@ class VisualizationEngine:
             'peopleType': 12,
             'representation': 10
         }
-        return size_map.get(node_type, 12)
+        return size_map.get(NODE_TYPES.canonical(node_type), 12)
     
     def _create_hover_text(self, node_id: str, node_data: Dict, graph: nx.Graph) -> str:
         """Create detailed hover text for a node."""
@@ -274,16 +276,21 @@ class VisualizationEngine:
             f"Connections: {len(list(graph.neighbors(node_id)))}"
         ]
         
+        if 'community' in node_data:
+            hover_parts.append(f"Community: {node_data['community']}")
+        
         # Add type-specific information
         entity_data = node_data.get('data', {})
         
-        if node_type == 'country':
+        canonical_type = NODE_TYPES.canonical(node_type)
+        
+        if canonical_type == 'country':
             if 'currency' in entity_data:
                 hover_parts.append(f"Currency: {entity_data['currency']}")
             if 'languages' in entity_data:
                 hover_parts.append(f"Languages: {', '.join(entity_data['languages'])}")
         
-        elif node_type == 'vehicle':
+        elif canonical_type == 'vehicle':
             if 'make' in entity_data:
                 hover_parts.append(f"Manufacturer: {entity_data['make']}")
             if 'model' in entity_data:
@@ -291,19 +298,19 @@ class VisualizationEngine:
             if 'year' in entity_data:
                 hover_parts.append(f"Year: {entity_data['year']}")
         
-        elif node_type == 'person':
+        elif canonical_type == 'person':
             if 'birthDate' in entity_data:
                 hover_parts.append(f"Born: {entity_data['birthDate']}")
             if 'nationality' in entity_data:
                 hover_parts.append(f"Nationality: {entity_data['nationality']}")
         
-        elif node_type == 'militaryOrganization':
+        elif canonical_type in ['militaryOrganization', 'militaryUnit']:
             if 'personnelStrength' in entity_data:
                 hover_parts.append(f"Personnel: {entity_data['personnelStrength']:,}")
             if 'organizationType' in entity_data:
                 hover_parts.append(f"Type: {entity_data['organizationType']}")
         
-        elif node_type == 'area':
+        elif canonical_type == 'area':
             if 'areaType' in entity_data:
                 hover_parts.append(f"Area Type: {entity_data['areaType']}")
             if 'country' in entity_data:
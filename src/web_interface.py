@@ -475,6 +475,9 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
         try:
             database_name = request.args.get('database')
             force_reload = request.args.get('force_reload', 'false').lower() == 'true'
+            query = request.args.get('q', '').strip()
+            filters = json.loads(request.args.get('filters', '{}') or '{}')
+            graph = None
             
             if database_name and database_name in analyzer.databases:
                 # Force reload if requested
@@ -483,18 +486,18 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
                         del analyzer.databases[database_name]
                     analyzer.load_database(database_name)
                 
-                # Build graph for the specific database
-                database = analyzer.databases[database_name]
-                graph = analyzer.graph_builder.build_graph(database)
+                # Graph for the specific database, rebuilt only after a reload
+                graph = analyzer.get_database_graph(database_name)
                 suggestions = analyzer.filter_system.get_filter_suggestions(graph)
             else:
                 # Use combined graph if available
                 if analyzer.combined_graph and not force_reload:
+                    graph = analyzer.combined_graph
                     suggestions = analyzer.filter_system.get_filter_suggestions(analyzer.combined_graph)
                 else:
                     # Build a combined graph from all loaded databases
                     if analyzer.databases:
-                        analyzer.build_combined_graph()
+                        graph = analyzer.build_combined_graph()
                         suggestions = analyzer.filter_system.get_filter_suggestions(analyzer.combined_graph)
                     else:
                         # Provide default suggestions if no databases are loaded
@@ -510,9 +513,19 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
                             'equipment_categories': list(analyzer.filter_system.equipment_categories.keys())
                         }
             
+            # Search-as-you-type entity matches served from the text index
+            if query and graph is not None:
+                suggestions['entities'] = analyzer.filter_system.suggest_entities(graph, query)
+            
+            # Per-value counts, restricted to the current filters if any are given
+            facet_counts = {}
+            if graph is not None:
+                facet_counts = analyzer.filter_system.get_facet_counts(graph, filters)
+            
             return jsonify({
                 'status': 'success',
                 'suggestions': suggestions,
+                'facet_counts': facet_counts,
                 'force_reloaded': force_reload
             })
             
@@ -537,6 +550,40 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
                 'fallback': True
             })
     
+    @app.route('/api/search')
+    def search_entities():
+        """Ranked entity search returning one page of the best matches."""
+        try:
+            query = request.args.get('q', '').strip()
+            database_name = request.args.get('database')
+            limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+            offset = max(int(request.args.get('offset', 0)), 0)
+            
+            if not query:
+                return jsonify({'status': 'error', 'message': 'Search query required'}), 400
+            
+            if database_name and database_name in analyzer.DATABASE_CONFIGS:
+                graph = analyzer.get_database_graph(database_name)
+            else:
+                graph = analyzer.combined_graph
+                if graph is None:
+                    if not analyzer.databases:
+                        analyzer.load_all_databases()
+                    graph = analyzer.build_combined_graph()
+            
+            results = analyzer.filter_system.rank_entities(graph, query, limit=limit, offset=offset)
+            
+            # Fall back to fuzzy name matching for misspelt or transliterated queries
+            if request.args.get('fuzzy', '').lower() == 'true' or not results['total']:
+                results['similar_names'] = analyzer.filter_system.find_similar_names(graph, query, limit=limit)
+            
+            results['status'] = 'success'
+            return jsonify(results)
+            
+        except Exception as e:
+            logger.error(f"Error searching entities: {e}")
+            return jsonify({'status': 'error', 'message': str(e)}), 500
+    
     @app.route('/api/dashboard_data')
     def get_dashboard_data():
         """Get basic dashboard data without full comprehensive report."""
@@ -599,7 +646,7 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
     def get_equipment_categories():
         """Get available equipment categories for filtering."""
         try:
-            category_info = analyzer.filter_system.get_equipment_category_info()
+            category_info = analyzer.filter_system.get_equipment_category_info(analyzer.combined_graph)
             return jsonify({
                 'status': 'success',
                 'categories': category_info
@@ -637,7 +684,7 @@ def launch_web_interface(analyzer, host='127.0.0.1', port=8080, debug=True):
                 if format == 'csv':
                     analyzer.statistics_generator.export_to_csv(graph, temp_file.name)
                 elif format == 'json':
-                    stats = analyzer.statistics_generator.generate_statistics(graph, database)
+                    stats = analyzer.get_statistics(database_name, graph)
                     json.dump(stats, temp_file, indent=2, default=str)
                 else:
                     return jsonify({'status': 'error', 'message': 'Unsupported format'}), 400
@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+"""
+Test script for the IES4 graph indexes
+Verifies that indexes built alongside the graph agree with full scans.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import numpy as np
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+import networkx as nx
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from graph_builder import GraphBuilder
+from filter_system import FilterSystem
+from graph_index import get_relationship_index, graph_version, mark_graph_changed
+from node_types import NODE_TYPES, get_node_type_index
+from attribute_index import AttributeIndex
+from filter_cache import canonical_filter_spec
+from numeric_index import get_degree_index
+from text_index import get_text_index
+from equipment_categories import KeywordMatcher
+from facet_index import FACET_FILTERS, FacetIndex, get_facet_index
+from name_index import BKTree, edit_distance, normalize_name
+from spatial_index import STRTree, points_in_polygon
+from streaming_filter import iter_database_entities
+from node_statistics import TableSection, default_node_aggregator
+from node_table import get_node_table
+from country_comparison import CountryComparison, CountryMatcher
+from betweenness import BetweennessEstimator
+from path_statistics import PathStatistics
+from component_analytics import ComponentAnalytics
+from sparse_centrality import SparseCentrality
+from statistics_generator import StatisticsGenerator, STATISTICS_SECTIONS
+from statistics_store import StatisticsStore
+from community_detection import CommunityDetector, get_community_index
+from report_pipeline import ReportPipeline
+from incremental_statistics import GraphChangeSet, IncrementalStatistics, apply_graph_changes
+
+
+def build_sample_database():
+    """Build a small database covering several entity types and relationships."""
+    return {
+        'countries': [
+            {'id': 'country-uk', 'names': [{'value': 'United Kingdom', 'nameType': 'official'}]}
+        ],
+        'vehicleTypes': [
+            {'id': 'vt-mbt', 'name': 'Main Battle Tank'}
+        ],
+        'vehicles': [
+            {'id': 'vehicle-challenger', 'names': [{'value': 'Challenger 2'}], 'make': 'Vickers',
+             'model': 'Challenger 2', 'year': 1998, 'owner': 'country-uk', 'vehicleType': 'vt-mbt'},
+            {'id': 'vehicle-warrior', 'names': [{'value': 'Warrior'}], 'make': 'GKN',
+             'year': 1988, 'owner': 'country-uk', 'vehicleType': 'vt-ifv'}
+        ],
+        'areas': [
+            {'id': 'area-salisbury', 'names': [{'value': 'Salisbury Plain'}], 'areaType': 'military',
+             'country': 'country-uk'}
+        ]
+    }
+
+
+def build_sample_graph():
+    """Build a small graph covering several entity types and relationships."""
+    return GraphBuilder().build_graph(build_sample_database())
+
+
+def test_relationship_index():
+    """Relationship index lookups match a scan over the edges."""
+    graph = build_sample_graph()
+    index = get_relationship_index(graph)
+
+    for relationship in index.relationship_types():
+        scanned = {frozenset((s, t)) for s, t, r in graph.edges(data='relationship') if r == relationship}
+        assert {frozenset(edge) for edge in index.edges(relationship)} == scanned
+
+    assert index.neighbors('country-uk', 'owner') == {'vehicle-challenger', 'vehicle-warrior'}
+    assert FilterSystem()._filter_by_relationship(graph, 'vehicleType') == {'vehicle-challenger', 'vt-mbt'}
+
+    # Filtered subgraphs get their own index
+    subgraph = graph.subgraph(['country-uk', 'vehicle-challenger']).copy()
+    assert get_relationship_index(subgraph).counts() == {'owner': 1}
+
+
+def test_node_type_registry():
+    """Plural array names and singular type names share one code."""
+    assert NODE_TYPES.code('vehicles') == NODE_TYPES.code('vehicle') == NODE_TYPES.code('Vehicle')
+    assert NODE_TYPES.canonical('people') == 'person'
+    assert NODE_TYPES.canonical('militaryUnits') == 'militaryUnit'
+
+    graph = build_sample_graph()
+    type_index = get_node_type_index(graph)
+    assert list(type_index.nodes) == list(graph.nodes())
+    assert set(type_index.nodes_of_type('vehicle')) == {'vehicle-challenger', 'vehicle-warrior'}
+    assert FilterSystem()._filter_by_type(graph, 'vehicle') == FilterSystem()._filter_by_type(graph, 'vehicles')
+    assert graph.nodes['vehicle-challenger']['vehicle_type'] == 'vt-mbt'
+
+    # Type names from queries are looked up, never registered
+    registered = len(NODE_TYPES)
+    assert NODE_TYPES.lookup('no-such-type') is None
+    assert FilterSystem().apply_filters(graph, {'type': 'no-such-type'}).number_of_nodes() == 0
+    assert type_index.nodes_of_type('vehicle', 'no-such-type') == type_index.nodes_of_type('vehicle')
+    assert NODE_TYPES.canonical('no-such-type') == 'no-such-type'
+    assert len(NODE_TYPES) == registered
+
+
+def test_attribute_index():
+    """Attribute index lookups match the substring, prefix and suffix semantics of a scan."""
+    index = AttributeIndex({'country-uk': {'a'}, 'country-ukraine': {'b'}, 'bae systems': {'c'}}, ['a', 'b', 'c', 'd'])
+    assert index.equals('COUNTRY-UK') == {'a'}
+    assert index.startswith('country-uk') == {'a', 'b'}
+    assert index.endswith('uk') == {'a'}
+    assert index.contains('systems') == {'c'}
+    assert index.contains('') == {'a', 'b', 'c', 'd'}
+
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    assert filters._filter_by_manufacturer(graph, 'vick') == {'vehicle-challenger'}
+    assert filters._filter_by_owner(graph, 'UK') == {'vehicle-challenger', 'vehicle-warrior'}
+    assert filters._filter_by_country(graph, 'kingdom') == {'country-uk'}
+    assert filters._filter_by_area_type(graph, 'milit') == {'area-salisbury'}
+
+
+def test_text_index():
+    """Keyword filtering keeps substring semantics; token search supports AND/OR and prefixes."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    assert filters._filter_by_keyword(graph, 'llenger') == {'vehicle-challenger'}
+    assert filters._filter_by_keyword(graph, 'GKN') == {'vehicle-warrior'}
+    assert filters.search_entities(graph, ['challenger', 'warrior'], 'any') == {'vehicle-challenger', 'vehicle-warrior'}
+    assert filters.search_entities(graph, ['challenger', 'warrior'], 'all') == set()
+
+    text_index = get_text_index(graph)
+    assert text_index.search(['chall'], prefix=True) == {'vehicle-challenger'}
+    assert text_index.search(['salisbury', 'warrior'], operator='OR') == {'area-salisbury', 'vehicle-warrior'}
+
+    # Ranked search: label matches outrank others, exact ids are boosted, pages do not overlap
+    ranked = filters.rank_entities(graph, 'challenger', limit=1)
+    assert ranked['total'] == 1 and ranked['results'][0]['id'] == 'vehicle-challenger'
+    assert filters.rank_entities(graph, 'vehicle-warrior')['results'][0]['id'] == 'vehicle-warrior'
+    first_page = filters.rank_entities(graph, 'vehicle', limit=1)['results']
+    second_page = filters.rank_entities(graph, 'vehicle', limit=1, offset=1)['results']
+    assert first_page[0]['score'] >= second_page[0]['score'] and first_page != second_page
+
+
+def test_filter_planner():
+    """Planned filtering matches a plain intersection and short-circuits on empty results."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    spec = {'type': 'vehicle', 'year_range': '1990-2000', 'owner': 'uk'}
+    assert set(filters.apply_filters(graph, spec).nodes()) == {'vehicle-challenger'}
+
+    report = filters.explain(graph, {'equipment_category': 'vehicles', 'keyword': 'challenger'})
+    assert [step['filter'] for step in report['plan']] == ['keyword', 'equipment_category']
+    # Few candidates survive the keyword, so the categories are checked on those candidates alone
+    assert report['plan'][-1]['input_nodes'] == 1 and report['plan'][-1]['evaluation'] == 'candidates'
+    assert report['plan'][0]['evaluation'] == 'index' and report['result_nodes'] == 1
+
+    report = filters.explain(graph, {'keyword': 'nothing-matches', 'degree_min': 1})
+    assert report['short_circuited'] and report['plan'][-1]['status'] == 'skipped'
+
+    # Estimates come from index statistics, and skipped steps are never run
+    evaluated = []
+
+    def recording(name):
+        run = filters.available_filters[name]
+        return lambda graph, value: evaluated.append(name) or run(graph, value)
+
+    for name in ('type', 'degree_min'):
+        filters.available_filters[name] = recording(name)
+    report = filters.explain(graph, {'degree_min': 1, 'type': 'no-such-type'})
+    assert [(step['filter'], step['estimate']) for step in report['plan']] == [
+        ('type', 0), ('degree_min', len(get_degree_index(graph).between(low=1)))]
+    assert evaluated == ['type'] and 'time_ms' not in report['plan'][-1]
+    assert filters.explain(graph, {'type': 'vehicle'})['plan'][0]['estimate'] == 2
+
+    # Spatial and fuzzy name filters are estimated from their indexes rather than at every node
+    report = filters.explain(graph, {'near': '0,0,1', 'bbox': '100,10,101,11', 'fuzzy_name': 'z' * 30 + '~0',
+                                     'within_area': 'nowhere'})
+    assert [step['estimate'] for step in report['plan']] == [0, 0, 0, 0]
+
+
+def test_numeric_index():
+    """Year and degree filters support open-ended and disjoint ranges."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    assert filters._filter_by_year_range(graph, '1990-') == {'vehicle-challenger'}
+    assert filters._filter_by_year_range(graph, '-1990') == {'vehicle-warrior'}
+    assert filters._filter_by_year_range(graph, '1980-1989,1995-2000') == {'vehicle-challenger', 'vehicle-warrior'}
+    assert filters._filter_by_year_range(graph, 'not-a-range') == set()
+    assert filters._filter_by_year(graph, '1988') == {'vehicle-warrior'}
+    assert filters._filter_by_min_degree(graph, 3) == {'country-uk'}
+    assert filters._filter_by_max_degree(graph, 1) == {'vt-mbt', 'vehicle-warrior', 'area-salisbury'}
+
+
+def test_filter_result_cache():
+    """Equivalent filter specs share a cache entry, which is invalidated when the graph changes."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    first = filters.apply_filters(graph, {'degree_min': 1, 'equipment_category': ['vehicles', 'geographic']})
+    second = filters.apply_filters(graph, {'equipment_category': ['geographic', 'vehicles'], 'degree_min': '1'})
+    assert set(first) == set(second)
+    assert filters.result_cache.get_stats()['hits'] == 1
+
+    graph.add_node('vehicle-new', type='vehicles', label='New Vehicle')
+    assert 'vehicle-new' in filters.apply_filters(graph, {'type': 'vehicle'})
+
+
+def test_filter_cache_key_order():
+    """Only set-valued filters and expression conditions ignore the order of their lists."""
+    assert canonical_filter_spec({'near': [50, 30, 10]}) != canonical_filter_spec({'near': [30, 50, 10]})
+    assert canonical_filter_spec({'bbox': [10, 20, 30, 40]}) != canonical_filter_spec({'bbox': [10, 30, 20, 40]})
+    assert canonical_filter_spec({'community': [1, 2]}) == canonical_filter_spec({'community': ['2', 1]})
+    first, second = {'filter': {'type': 'vehicle'}}, {'filter': {'keyword': 'uk'}}
+    assert (canonical_filter_spec({'logic': 'OR', 'conditions': [first, second]})
+            == canonical_filter_spec({'logic': 'OR', 'conditions': [second, first]}))
+
+    # A cached result for one coordinate order is not served for the other
+    graph = build_sample_graph()
+    graph.nodes['area-salisbury']['data']['coordinates'] = {'type': 'Point', 'coordinates': [-1.8, 51.2]}
+    mark_graph_changed(graph)
+    filters = FilterSystem()
+    assert filters.match_nodes(graph, {'near': [51.2, -1.8, 5]}) >= {'area-salisbury'}
+    assert 'area-salisbury' not in filters.match_nodes(graph, {'near': [-1.8, 51.2, 5]})
+
+
+def test_equipment_categories():
+    """The keyword matcher reports overlapping keywords; category filters and counts use the bitmasks."""
+    matcher = KeywordMatcher({'car': 1, 'carrier': 2, 'rier': 4, 'tank': 8})
+    assert matcher.match('aircraft carrier') == 7
+    assert matcher.match('tan') == 0
+
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    assert filters._filter_by_equipment_category(graph, 'vehicles') == {'vehicle-challenger', 'vehicle-warrior', 'vt-mbt'}
+    assert filters._filter_by_equipment_category(graph, ['geographic']) == {'area-salisbury'}
+    assert filters._filter_by_equipment_category(graph, 'unknown-category') == set()
+    assert filters.get_equipment_category_info(graph)['vehicles']['count'] == 3
+
+
+def test_filter_expressions():
+    """Nested AND/OR/NOT expressions evaluate over bitsets."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    expression = {'logic': 'AND', 'conditions': [
+        {'logic': 'OR', 'conditions': [{'filter': {'type': 'vehicle'}}, {'filter': {'type': 'area'}}]},
+        {'logic': 'NOT', 'conditions': [{'filter': {'keyword': 'warrior'}}]}
+    ]}
+    result = filters.create_advanced_filter(graph, expression)
+    assert set(result.nodes()) == {'vehicle-challenger', 'area-salisbury'}
+
+    negated = {'logic': 'OR', 'conditions': [{'filter': {'type': 'vehicle'}, 'not': True}]}
+    assert set(filters.create_advanced_filter(graph, negated).nodes()) == {'country-uk', 'vt-mbt', 'area-salisbury'}
+
+
+def test_filter_results_are_copies():
+    """Plain and logical filter results are independent, editable copies rather than views of the graph."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    expression = {'logic': 'OR', 'conditions': [{'filter': {'type': 'vehicle'}}, {'filter': {'type': 'country'}}]}
+
+    for result in (filters.apply_filters(graph, {'type': 'vehicle'}), filters.create_advanced_filter(graph, expression)):
+        assert not nx.is_frozen(result)
+        result.add_node('scratch')
+        result.nodes['vehicle-challenger']['label'] = 'Edited'
+        result.remove_node('vehicle-warrior')
+        assert 'scratch' not in graph and 'vehicle-warrior' in graph
+        assert graph.nodes['vehicle-challenger']['label'] == 'Challenger 2'
+
+
+def test_facet_index():
+    """Facet counts match the filters they are offered for and follow change sets and edits."""
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    counts = filters.get_facet_counts(graph)
+    assert counts['types']['vehicles'] == 2
+    for facet, filter_name in FACET_FILTERS.items():
+        for value, count in counts[facet].items():
+            assert count == len(filters.match_nodes(graph, {filter_name: value})), (facet, value)
+    assert counts['countries'] == {'United Kingdom': 1}
+    assert filters.get_facet_counts(graph, {'year_range': '1990-'})['types'] == {'vehicles': 1}
+    assert filters.get_filter_suggestions(graph)['years'] == ['1988', '1998']
+
+    # Manufacturer filters match substrings, so a longer name also counts towards the shorter one
+    facet_index = get_facet_index(graph, filters)
+    graph.add_node('vehicle-new', type='vehicles', label='New Vehicle', year=2020, owner='country-uk',
+                   manufacturer='Vickers Defence Systems')
+    graph.add_edge('vehicle-new', 'country-uk', relationship='owner')
+    apply_graph_changes(graph, GraphChangeSet(added_nodes=['vehicle-new'],
+                                              added_edges=[('vehicle-new', 'country-uk')]))
+    assert get_facet_index(graph, filters) is facet_index
+    counts = filters.get_facet_counts(graph)
+    assert counts['manufacturers'] == {'Vickers': 2, 'Vickers Defence Systems': 1, 'GKN': 1}
+    assert counts['manufacturers']['Vickers'] == len(filters.match_nodes(graph, {'manufacturer': 'Vickers'}))
+    assert counts == FacetIndex.from_graph(graph, filters).counts()
+
+    # Edits made without a change set are picked up by membership
+    graph.remove_node('vehicle-warrior')
+    mark_graph_changed(graph)
+    assert get_facet_index(graph, filters) is facet_index
+    assert 'GKN' not in facet_index.values('manufacturers')
+    assert facet_index.counts() == FacetIndex.from_graph(graph, filters).counts()
+
+
+def test_name_index():
+    """Fuzzy name matching tolerates typos and transliteration."""
+    assert normalize_name('Одеська область') == ['odeska oblast']
+    assert normalize_name('Т-80') == ['t 80']
+    assert edit_distance('kitten', 'sitting') == 3
+
+    tree = BKTree()
+    for word in ['odesa', 'odeska', 'kherson', 'kyiv']:
+        tree.add(word)
+    assert sorted(tree.search('odessa', 1)) == [(1, 'odesa'), (1, 'odeska')]
+
+    graph = build_sample_graph()
+    filters = FilterSystem()
+    assert filters.find_similar_names(graph, 'Chalenger')[0]['id'] == 'vehicle-challenger'
+    assert filters.apply_filters(graph, {'fuzzy_name': 'Salsbury'}).number_of_nodes() == 1
+    assert filters.apply_filters(graph, {'fuzzy_name': 'Warier~0'}).number_of_nodes() == 0
+
+
+def test_spatial_index():
+    """Geographic filters prefilter with the STR tree and refine exactly."""
+    bounds = np.array([[x, y, x + 1, y + 1] for x in range(20) for y in range(20)], dtype=float)
+    tree = STRTree(bounds, node_capacity=4)
+    assert sorted(tree.query((2.5, 2.5, 3.5, 3.5)).tolist()) == [42, 43, 62, 63]
+
+    square = np.array([[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]], dtype=float)
+    hole = np.array([[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]], dtype=float)
+    inside = points_in_polygon(np.array([[1.0, 1.0], [5.0, 5.0], [11.0, 5.0]]), [square, hole])
+    assert inside.tolist() == [True, False, False]
+
+    database = {
+        'areas': [
+            {'id': 'area-region', 'names': [{'value': 'Test Region'}],
+             'coordinates': {'type': 'Polygon', 'coordinates': [[[30, 46], [31, 46], [31, 47], [30, 47], [30, 46]]]}},
+            {'id': 'area-town', 'coordinates': {'type': 'Point', 'coordinates': [30.5, 46.5]}},
+            {'id': 'area-far', 'coordinates': {'type': 'Point', 'coordinates': [35.0, 50.0]}}
+        ],
+        'vehicles': [{'id': 'vehicle-located', 'location': 'Test Region'}]
+    }
+    graph = GraphBuilder().build_graph(database)
+    filters = FilterSystem()
+    assert set(filters.apply_filters(graph, {'within_area': 'area-region'})) == {'area-town', 'vehicle-located'}
+    assert set(filters.apply_filters(graph, {'near': '50.1,35.0,20'})) == {'area-far'}
+    assert set(filters.apply_filters(graph, {'bbox': '30.9,46.9,32,48'})) == {'area-region', 'vehicle-located'}
+
+
+def test_streaming_filter():
+    """Streaming filters over the raw file match the graph filters without building a graph."""
+    database = build_sample_database()
+    database['title'] = 'Sample'
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(database, f, indent=2)
+    try:
+        streamed = [entity['id'] for _, entity in iter_database_entities(f.name, ['vehicles', 'areas'], chunk_size=5)]
+        assert streamed == ['vehicle-challenger', 'vehicle-warrior', 'area-salisbury']
+
+        graph = build_sample_graph()
+        filters = FilterSystem()
+        for spec in [{'country': 'uk'}, {'type': 'vehicle', 'year_range': '1990-'}, {'keyword': 'plain'},
+                     {'manufacturer': 'gkn'}, {'equipment_category': 'vehicles'}]:
+            expected = set(filters.apply_filters(graph, spec))
+            assert {node for node, _ in filters.stream_filter(f.name, spec)} == expected, spec
+    finally:
+        os.remove(f.name)
+
+
+def test_node_aggregation():
+    """All statistics sections come from one node table, with rows selected by type."""
+    class VehicleYears(TableSection):
+        node_types = ('vehicles',)
+
+        def compute(self, table):
+            return sorted(table.rows(self.node_types)['year'])
+
+    class Incomplete(TableSection):
+        pass
+
+    try:
+        Incomplete(nx.Graph())
+        assert False, "sections must implement compute()"
+    except TypeError:
+        pass
+
+    graph = build_sample_graph()
+    aggregator = default_node_aggregator()
+    aggregator.register('vehicle_years', VehicleYears)
+    sections = aggregator.run(graph)
+
+    assert sections['vehicle_years'] == [1988, 1998]
+    assert sections['entity_counts'] == {'countries': 1, 'vehicleTypes': 1, 'vehicles': 2, 'areas': 1}
+    assert sections['node_statistics']['degree_stats']['max'] == max(degree for _, degree in graph.degree())
+    assert sections['vehicles']['by_manufacturer'] == {'Vickers': 1, 'GKN': 1}
+    assert sections['countries']['United Kingdom']['total_assets'] == 2
+    assert list(aggregator.run(graph, ['areas'])) == ['areas']
+
+
+def test_node_table():
+    """The node table holds one row per node with degrees, components and fill flags."""
+    graph = build_sample_graph()
+    table = get_node_table(graph)
+    frame = table.frame
+
+    assert frame['id'].tolist() == list(graph.nodes)
+    assert frame['degree'].tolist() == [degree for _, degree in graph.degree()]
+    assert frame['component'].nunique() == nx.number_connected_components(graph)
+    assert table.rows(['vehicles'])['manufacturer'].tolist() == ['Vickers', 'GKN']
+    assert table.degree_distribution() == Counter(degree for _, degree in graph.degree())
+
+    filled = table.fill_matrix(['label', 'year'])
+    assert filled.shape == (len(graph), 2)
+    assert filled[:, 1].tolist() == [bool(data.get('year')) for _, data in graph.nodes(data=True)]
+
+
+def test_country_comparison():
+    """One pass assigns nodes to every country whose name occurs in their owner, country or label."""
+    matcher = CountryMatcher(['UK', 'uk', 'Kingdom', ''])
+    assert matcher.match('country-uk') == 0b1011
+    assert matcher.match('United Kingdom') == 0b1100
+    assert matcher.match(None) == 0b1000
+
+    sections = CountryComparison(['uk', 'Kingdom', 'France']).compare(build_sample_graph())
+    uk = sections['countries']['uk']
+    assert (uk['total_assets'], uk['vehicles'], uk['areas']) == (3, 2, 1)
+    assert uk['manufacturers'] == {'Vickers': 1, 'GKN': 1} and uk['timeline'] == {1998: 1, 1988: 1}
+    assert sections['countries']['Kingdom']['total_assets'] == 1
+    assert sections['countries']['France']['total_assets'] == 0
+    assert sections['technology_timeline']['uk'] == {1998: 1, 1988: 1}
+    assert sections['asset_types'] == {'uk': {'vehicles': 2, 'areas': 1}, 'Kingdom': {}, 'France': {}}
+
+
+def test_betweenness_estimator():
+    """Sampled betweenness is exact with every source and the pool merges the same sums."""
+    graph = nx.gnp_random_graph(80, 0.06, seed=3)
+    expected = nx.betweenness_centrality(graph)
+
+    scores, info = BetweennessEstimator(min_samples=100).compute(graph)
+    assert info['exact'] and info['sources_sampled'] == 80
+    assert max(abs(scores[node] - expected[node]) for node in graph) < 1e-12
+
+    sampled, info = BetweennessEstimator(min_samples=20, round_size=10, max_samples=40, tolerance=0).compute(graph)
+    # A zero threshold forces the process pool even on this small graph
+    pooled, pooled_info = BetweennessEstimator(min_samples=20, round_size=10, max_samples=40, tolerance=0,
+                                               parallel_threshold=0, max_workers=2).compute(graph)
+    assert not info['exact'] and info['sources_sampled'] == 40 and info['rounds'] == 3
+    assert info['workers'] == 1 and pooled_info['workers'] == 2
+    assert pooled_info['sources_sampled'] == 40
+    assert max(abs(sampled[node] - pooled[node]) for node in graph) < 1e-12
+
+
+def test_path_statistics():
+    """Exact path statistics match networkx and the approximation bounds contain the exact values."""
+    graph = nx.connected_watts_strogatz_graph(150, 4, 0.05, seed=7)
+    average = nx.average_shortest_path_length(graph)
+    diameter = nx.diameter(graph)
+
+    assert PathStatistics().analyze(graph) == (average, diameter, {'exact': True, 'nodes': 150})
+
+    estimate, lower, info = PathStatistics(approximation_threshold=100, samples=150,
+                                           max_diameter_bfs=1000).analyze(graph)
+    assert not info['exact'] and info['sampled_sources'] == 150
+    assert abs(estimate - average) < 1e-9
+    assert info['diameter_exact'] and lower == diameter and info['diameter_bounds'] == [diameter, diameter]
+
+    _, lower, info = PathStatistics(approximation_threshold=100, samples=30, max_diameter_bfs=5).analyze(graph)
+    low, high = info['diameter_bounds']
+    assert low == lower <= diameter <= high
+
+
+def test_component_analytics():
+    """Per-component metrics merge into whole-graph values, in-process or on a pool."""
+    graph = nx.disjoint_union_all([nx.karate_club_graph(), nx.path_graph(6), nx.complete_graph(2), nx.empty_graph(1)])
+    expected = nx.betweenness_centrality(graph)
+
+    metrics = ComponentAnalytics().analyze(graph)
+    # A zero threshold forces the batches onto the process pool even on this small graph
+    pooled = ComponentAnalytics(parallel_threshold=0, max_workers=2, batch_nodes=5).analyze(graph)
+    assert metrics['betweenness_sampling']['workers'] == 1 and pooled['betweenness_sampling']['batches'] > 1
+
+    assert metrics['component_sizes'] == [34, 6, 2, 1] and metrics['largest_component_size'] == 34
+    assert abs(metrics['average_clustering'] - nx.average_clustering(graph)) < 1e-12
+    assert metrics['betweenness_sampling']['exact'] and metrics['closeness'] is None
+    assert max(abs(metrics['betweenness'][node] - expected[node]) for node in graph) < 1e-12
+    assert pooled['betweenness'] == metrics['betweenness'] and pooled['betweenness_sampling']['workers'] == 2
+    assert pooled['average_clustering'] == metrics['average_clustering']
+    assert pooled['path_lengths'] == metrics['path_lengths']
+    assert metrics['path_lengths'][:2] == (nx.average_shortest_path_length(nx.karate_club_graph()),
+                                           nx.diameter(nx.karate_club_graph()))
+
+    connected = ComponentAnalytics().analyze(nx.karate_club_graph())
+    assert connected['closeness'] == nx.closeness_centrality(nx.karate_club_graph())
+
+
+def test_sparse_centrality():
+    """Sparse eigenvector, PageRank and Katz centrality agree with networkx."""
+    graph = nx.disjoint_union_all([nx.gnp_random_graph(300, 0.02, seed=5), nx.path_graph(5), nx.empty_graph(2)])
+    largest = max(nx.connected_components(graph), key=len)
+    graph.remove_nodes_from([node for node in graph if node not in largest and node < 300])
+    eigenvalue = max(np.linalg.eigvalsh(nx.to_numpy_array(graph, weight=None)))
+
+    scores = SparseCentrality(dense_threshold=50).compute(graph)
+    expected = {
+        'eigenvector': nx.eigenvector_centrality(graph, max_iter=5000, tol=1e-12),
+        'pagerank': nx.pagerank(graph, weight=None),
+        'katz': nx.katz_centrality_numpy(graph, alpha=0.5 / eigenvalue, weight=None)
+    }
+    for measure, values in expected.items():
+        assert max(abs(scores[measure][node] - values[node]) for node in graph) < 1e-6, measure
+
+
+def test_incremental_statistics():
+    """Counts follow change sets exactly while whole-graph sections stay cached until refreshed."""
+    graph = build_sample_graph()
+    generator = StatisticsGenerator()
+    before = generator.generate_statistics(graph, {})
+
+    graph.add_node('vehicle-scimitar', type='vehicles', type_code=NODE_TYPES.code('vehicle'), label='Scimitar',
+                   manufacturer='Alvis', owner='country-uk', vehicle_type='vt-cvrt')
+    graph.add_node('area-otterburn', type='areas', type_code=NODE_TYPES.code('area'), area_type='training')
+    graph.add_edge('vehicle-scimitar', 'vt-mbt', relationship='vehicleType', weight=1.0)
+    graph.remove_edge('vehicle-challenger', 'vt-mbt')
+    generator.apply_changes(graph, GraphChangeSet(added_nodes=['vehicle-scimitar', 'area-otterburn'],
+                                                  added_edges=[('vehicle-scimitar', 'vt-mbt')],
+                                                  removed_edges=[('vehicle-challenger', 'vt-mbt')]))
+
+    stale = generator.generate_statistics(graph, {}, refresh_stale=False)
+    assert stale['metadata']['stale_sections'] == ['centrality', 'component_metrics', 'node_sections']
+    assert stale['centrality'] is before['centrality']
+    assert stale['metadata']['entity_counts'] == {'vehicles': 3, 'vehicleTypes': 1, 'areas': 2, 'countries': 1}
+    assert stale['entity_analysis']['vehicles']['by_manufacturer'] == {'Vickers': 1, 'GKN': 1, 'Alvis': 1}
+    assert stale['entity_analysis']['areas']['by_country'] == {'country-uk': 1, 'unknown': 1}
+    assert stale['connectivity']['component_sizes'] == [4, 2, 1]
+
+    # Refreshed statistics equal those of a graph built with the same nodes and edges from scratch
+    fresh = generator.generate_statistics(graph, {})
+    rebuilt = generator.generate_statistics(nx.Graph(graph), {})
+    assert 'stale_sections' not in fresh['metadata']
+    for section in ['node_statistics', 'edge_statistics', 'connectivity', 'entity_analysis', 'temporal_analysis']:
+        assert fresh[section] == rebuilt[section], section
+    assert fresh['centrality']['top_degree_centrality'] == rebuilt['centrality']['top_degree_centrality']
+
+    # Removing a node drops its edges, and sync() finds changes made without a change set
+    statistics = IncrementalStatistics.from_graph(graph)
+    graph.remove_node('country-uk')
+    graph.add_edge('area-otterburn', 'area-salisbury', relationship='adjacent')
+    statistics.sync(graph)
+    expected = IncrementalStatistics.from_graph(graph)
+    assert statistics.node_statistics()['degree_distribution'] == expected.node_statistics()['degree_distribution']
+    assert statistics.edge_statistics() == expected.edge_statistics()
+    assert statistics.breakdown_sections() == expected.breakdown_sections()
+    assert statistics.component_sizes(graph) == [1, 1, 2, 2] == expected.component_sizes(graph)
+
+
+def test_statistics_store():
+    """Stored sections are served for the same checksum, filters and version, and refreshed one by one."""
+    generator = StatisticsGenerator()
+    with tempfile.TemporaryDirectory() as directory:
+        store = StatisticsStore(os.path.join(directory, 'statistics.sqlite'), version=1)
+        filters = {'type': ['vehicles', 'areas']}
+        first = generator.stored_statistics(build_sample_graph(), {}, store, 'abc', filters)
+        assert store.get_stats()['sections'] == len(STATISTICS_SECTIONS)
+
+        # A new graph for the same file would recompute everything, so any analysis here is a store miss
+        def fail(graph):
+            raise AssertionError('component metrics recomputed')
+        generator.component_analytics.analyze = fail
+
+        graph = build_sample_graph()
+        second = generator.stored_statistics(graph, {}, store, 'abc', {'type': ['areas', 'vehicles']},
+                                             refresh=['node_statistics'])
+        # Sections have the same JSON shape whether generated or stored, like the written statistics files
+        assert all(second[name] == first[name] for name in STATISTICS_SECTIONS)
+        for stats in (first, second):
+            assert stats == json.loads(json.dumps(stats, default=str))
+        assert store.hits == len(STATISTICS_SECTIONS) - 1
+
+        assert store.load(store.make_key('abc', {'type': 'areas'})) == {}
+        store.save(store.make_key('bbox', {'bbox': [-2, 50, -1, 52]}), {'centrality': {}})
+        assert store.load(store.make_key('bbox', {'bbox': [-2, -1, 50, 52]})) == {}
+        upgraded = StatisticsStore(store.path, version=2)
+        assert upgraded.load(upgraded.make_key('abc', filters)) == {}
+        assert store.invalidate('abc', ['centrality']) == 1
+        assert 'centrality' not in store.load(store.make_key('abc', filters))
+
+
+def test_statistics_store_json_payloads():
+    """Sections are stored as JSON text, not pickles, and read back as the statistics files would be."""
+    section = {'generated_at': datetime(2024, 1, 2), 'by_year': {1998: 2}, 'pair': (1, 2),
+               'score': np.float64(0.5), 'count': np.int64(3)}
+    expected = json.loads(json.dumps(section, default=str))
+    assert expected['by_year'] == {'1998': 2} and expected['pair'] == [1, 2]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = StatisticsStore(os.path.join(directory, 'statistics.sqlite'), version=1)
+        key = store.make_key('abc')
+        assert store.save(key, {'metadata': section}) == {'metadata': expected}
+        assert store.load(key) == {'metadata': expected}
+
+        with closing(sqlite3.connect(store.path)) as connection:
+            (payload, kind), = connection.execute("SELECT payload, typeof(payload) FROM sections").fetchall()
+        assert kind == 'text' and json.loads(payload) == expected
+
+
+def test_community_detection():
+    """Both methods split joined cliques reproducibly, and communities back the filter and report summaries."""
+    graph = nx.disjoint_union_all([nx.complete_graph(6), nx.complete_graph(5), nx.empty_graph(1)])
+    graph.add_edge(0, 6)
+    for method in CommunityDetector.METHODS:
+        membership, score = CommunityDetector(method, seed=7).detect(graph)
+        assert membership == CommunityDetector(method, seed=7).detect(graph)[0]
+        assert [membership[node] for node in graph] == [0] * 6 + [1] * 5 + [2], method
+        expected = nx.community.modularity(graph, [set(range(6)), set(range(6, 11)), {11}], weight=None)
+        assert abs(score - expected) < 1e-12
+
+    graph = build_sample_graph()
+    filter_system = FilterSystem()
+    index = get_community_index(graph)
+    uk = index.community_of('country-uk')
+    assert graph.nodes['vehicle-warrior']['community'] == uk
+    assert filter_system.match_nodes(graph, {'community': 'country-uk'}) == set(index.members[uk])
+    assert filter_system.match_nodes(graph, {'community': str(uk)}) == set(index.members[uk])
+
+    subgraph = filter_system.apply_filters(graph, {'type': 'vehicles'})
+    assert get_community_index(subgraph).membership == {node: index.membership[node] for node in subgraph}
+
+    # Ids stored on copies not made by a filter, or before the graph changed, are not reused
+    for node in graph:
+        graph.nodes[node]['community'] = 99
+    assert 99 not in get_community_index(graph.subgraph(list(subgraph)).copy()).membership.values()
+    mark_graph_changed(graph)
+    assert get_community_index(graph).membership == index.membership
+
+    summary = index.summaries(graph)
+    assert summary['community_count'] == len(index) and summary['method'] == 'louvain'
+    assert sum(community['size'] for community in summary['largest_communities']) == graph.number_of_nodes()
+    assert summary['largest_communities'][0]['hub'] == 'country-uk'
+
+
+def test_community_ids_follow_graph_version():
+    """Stored community ids are reused only for the version they were detected on, or its filtered copies."""
+    graph = build_sample_graph()
+    filter_system = FilterSystem()
+    index = get_community_index(graph)
+
+    # Overwrite the stored ids so that any reuse of them is visible
+    nx.set_node_attributes(graph, 99, 'community')
+    current = filter_system.apply_filters(graph, {'type': 'vehicles'})
+    assert set(get_community_index(current).membership.values()) == {99}
+
+    mark_graph_changed(graph)
+    stale = filter_system.apply_filters(graph, {'type': 'vehicles'})
+    assert 99 not in get_community_index(stale).membership.values()
+    assert get_community_index(graph).membership == index.membership
+
+    # Nodes added through a change set are placed in a community and written back to the graph
+    graph.add_node('vehicle-new', type='vehicles', label='New Vehicle', owner='country-uk')
+    graph.add_edge('vehicle-new', 'country-uk', relationship='owner')
+    apply_graph_changes(graph, GraphChangeSet(added_nodes=['vehicle-new'],
+                                              added_edges=[('vehicle-new', 'country-uk')]))
+    changed = get_community_index(graph)
+    assert changed is not index and changed.community_of('vehicle-new') == changed.community_of('country-uk')
+    assert graph.nodes['vehicle-new']['community'] == changed.community_of('vehicle-new')
+
+
+def test_report_pipeline():
+    """Steps run after their dependencies, shared intermediates run once and sections keep their order."""
+    calls = Counter()
+
+    def step(name, value):
+        def run(*inputs):
+            calls[name] += 1
+            return value + sum(inputs)
+        return run
+
+    pipeline = ReportPipeline(max_workers=4)
+    pipeline.add('total', step('total', 0), inputs=['left', 'right'])
+    pipeline.add('shared', step('shared', 1), section=False)
+    pipeline.add('left', step('left', 10), inputs=['shared'])
+    pipeline.add('right', step('right', 100), inputs=['shared'], after=['left'])
+    sections, timings = pipeline.run()
+    assert sections == {'total': 112, 'left': 11, 'right': 101}
+    assert list(sections) == ['total', 'left', 'right'] and set(calls.values()) == {1}
+    assert set(timings['steps']) == {'total', 'shared', 'left', 'right'}
+
+    pipeline.add('cycle', step('cycle', 0), inputs=['cycle'])
+    try:
+        pipeline.run()
+        assert False, 'cyclic steps should be rejected'
+    except ValueError:
+        pass
+
+    graph = build_sample_graph()
+    report = StatisticsGenerator().generate_comprehensive_report(graph, {}, [])
+    assert list(report) == ['executive_summary', 'database_overview', 'entity_statistics', 'relationship_analysis',
+                            'community_analysis', 'country_comparison', 'technology_analysis', 'timeline_analysis',
+                            'recommendations', 'report_timings']
+    assert report['entity_statistics']['vehicles']['total_count'] == 2
+    assert report['report_timings']['steps']['node_sections'] >= 0
+
+
+def test_report_detects_communities_first():
+    """Communities are detected before the report's graph-reading sections fan out across threads."""
+    graph = build_sample_graph()
+    generator = StatisticsGenerator()
+    generator.report_workers = 4
+    detected = {}
+
+    # Record whether communities were in place when each section started reading the graph
+    def recording(name, method):
+        def run(*args, **kwargs):
+            detected[name] = graph.graph.get('community_version') == graph_version(graph)
+            return method(*args, **kwargs)
+        return run
+
+    for name in ['_calculate_data_quality_score', '_analyze_relationship_patterns', 'compare_countries',
+                 '_analyze_technology_trends']:
+        setattr(generator, name, recording(name, getattr(generator, name)))
+    generator.node_aggregator.run = recording('node_sections', generator.node_aggregator.run)
+
+    report = generator.generate_comprehensive_report(graph, {}, [])
+    assert len(detected) == 5 and all(detected.values()), detected
+    assert 'communities' not in report['report_timings']['steps']
+    assert all('community' in data for _, data in graph.nodes(data=True))
+
+
+def main():
+    """Run all tests."""
+    tests = [name for name in sorted(globals()) if name.startswith('test_')]
+
+    failed = 0
+    for name in tests:
+        try:
+            globals()[name]()
+            print(f"✓ {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"✗ {name}: {e}")
+
+    print(f"\nResults: {len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())